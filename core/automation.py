@@ -3,8 +3,6 @@ import sys
 import time
 import subprocess
 import re
-import unicodedata
-import random
 import socket
 import traceback
 
@@ -22,15 +20,45 @@ from core.constants import (
     URLS_ABERTURA,
     URL_ALVO,
     MESES_DEFESO_PADRAO,
-    MESES_PRODUCAO_PADRAO
+    MESES_PRODUCAO_PADRAO,
+    TRACES_DIR,
+    TRACES_MAX
+)
+from core.dom_wait import DomWaiter
+from core.production_solver import ProductionSolver, formatar_producao
+from core.year_plan import YearPlan, YearPlanner, fluxo_aleatorio
+from services.run_journal import RunJournal
+from services.config_manager import normalizar_texto
+from services.combination_cache import CombinationCache, impressao_digital
+from services.event_log import contexto_evento, contexto_atual, definir_contexto, novo_id_execucao
+from services.tracer import Tracer, span, medir, instrumentar_driver, podar_traces
+from services.driver_profiler import DriverProfiler
+from core.js_scripts import (
+    JS_SELECIONAR_COMBO,
+    JS_RECONCILIAR_CHECKBOX_GROUP,
+    JS_RECONCILIAR_SELECAO_UNICA,
+    JS_IDENTIFICAR_PESCADOR,
+    JS_SNAPSHOT_TABELA
 )
 
 class AutomationLogic:
-    def __init__(self, logger, stop_event, config_manager):
+    def __init__(self, logger, stop_event, config_manager, porta_debug=CHROME_DEBUG_PORT, perfil_path=CHROME_PROFILE_PATH):
         self.logger = logger
         self.stop_event = stop_event
         self.driver = None
         self.cfg = config_manager
+        # Cada sessão do pool tem sua própria instância do Chrome (porta + perfil)
+        self.porta_debug = porta_debug
+        self.perfil_path = perfil_path
+        self.esperas = DomWaiter(self)
+        self.journal = None # RunJournal do ano em execução (checkpoints)
+        self.plano = None # YearPlan do ano em execução
+        self.pescador_id = None # CPF (dígitos) do pescador do ano em execução, semente dos sorteios
+        self.ano_atual = None
+        self.conf = None # ConfigSnapshot fixado no início de cada ano
+        self.motivo_falha = "" # Por que o último executar_ano retornou False (mensagem para a UI)
+        self.status_falha = "" # Status do lote correspondente ("incompleto", "inviavel")
+        self.abas_modo_leve = set() # Handles onde o bloqueio de recursos já foi aplicado
         try:
             import psutil
             self.psutil_ref = psutil
@@ -48,10 +76,11 @@ class AutomationLogic:
             time.sleep(seconds)
 
     def normalize_text(self, text):
-        if not text: return ""
-        text = unicodedata.normalize("NFKD", str(text))
-        text = text.replace("R$", "").replace("\u00a0", "").strip()
-        return text.lower()
+        return normalizar_texto(text)
+
+    def config(self):
+        """Snapshot da execução em andamento, ou um novo snapshot fora de uma execução."""
+        return self.conf or self.cfg.snapshot()
 
     # --- CHROME ENGINE ---
     def is_port_in_use(self, port):
@@ -70,12 +99,23 @@ class AutomationLogic:
         return None
 
     def fechar_chrome_brutalmente(self):
+        # Com psutil, encerra apenas o Chrome desta sessão (outras sessões do pool continuam vivas)
+        if self.psutil_ref:
+            marcador = f"--remote-debugging-port={self.porta_debug}"
+            encontrou = False
+            for proc in self.psutil_ref.process_iter(["name", "cmdline"]):
+                try:
+                    if marcador in " ".join(proc.info.get("cmdline") or []):
+                        proc.kill()
+                        encontrou = True
+                except Exception: pass
+            if encontrou: return
         try:
             subprocess.run("taskkill /f /im chrome.exe", shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         except: pass
 
     def garantir_chrome_aberto(self):
-        if self.is_port_in_use(CHROME_DEBUG_PORT):
+        if self.is_port_in_use(self.porta_debug):
             self.logger.info("Chrome já está rodando na porta de debug. Conectando...", extra={'tags': 'SUCCESS'})
             return True
 
@@ -83,14 +123,14 @@ class AutomationLogic:
         chrome_exe = self.encontrar_executavel_chrome()
 
         if chrome_exe:
-            if not os.path.exists(CHROME_PROFILE_PATH):
-                try: os.makedirs(CHROME_PROFILE_PATH, exist_ok=True)
+            if not os.path.exists(self.perfil_path):
+                try: os.makedirs(self.perfil_path, exist_ok=True)
                 except: pass
 
             cmd = [
                 chrome_exe,
-                f"--remote-debugging-port={CHROME_DEBUG_PORT}",
-                rf"--user-data-dir={CHROME_PROFILE_PATH}",
+                f"--remote-debugging-port={self.porta_debug}",
+                rf"--user-data-dir={self.perfil_path}",
                 "--no-first-run", "--no-default-browser-check", "--start-maximized",
                 "--disable-popup-blocking"
             ] + URLS_ABERTURA
@@ -100,18 +140,31 @@ class AutomationLogic:
                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
                 stdin=subprocess.DEVNULL, close_fds=True
             )
-            for i in range(20):
-                time.sleep(0.5)
-                if self.is_port_in_use(CHROME_DEBUG_PORT):
-                    return True
+            return self.esperas.aguardar_ate(lambda: self.is_port_in_use(self.porta_debug), timeout=10, intervalo=0.1)
         return False
 
     def conectar_selenium(self):
         self.logger.info("Tentando conectar Selenium ao navegador...")
         opts = Options()
-        opts.add_experimental_option("debuggerAddress", f"127.0.0.1:{CHROME_DEBUG_PORT}")
+        opts.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.porta_debug}")
+        if self.modo_leve_ativo():
+            # Libera o driver no DOMContentLoaded, sem esperar imagens/fontes
+            opts.page_load_strategy = "eager"
         try:
-            self.driver = webdriver.Chrome(options=opts)
+            # Sessão principal: reaproveita o chromedriver pré-aquecido durante a splash
+            servico = None
+            if self.porta_debug == CHROME_DEBUG_PORT:
+                from core.prewarm import obter_preaquecimento
+                prewarmer = obter_preaquecimento()
+                if prewarmer:
+                    servico = prewarmer.obter_servico()
+
+            if servico:
+                self.driver = webdriver.Chrome(service=servico, options=opts)
+            else:
+                self.driver = webdriver.Chrome(options=opts)
+            # Comandos do WebDriver viram spans/contagens quando há Tracer/Profiler ativos (executar_ano)
+            instrumentar_driver(self.driver)
             # Teste de vida
             _ = self.driver.current_window_handle
             self.logger.info("Conexão Selenium ESTABELECIDA com sucesso!", extra={'tags': 'SUCCESS'})
@@ -121,7 +174,7 @@ class AutomationLogic:
             return None
 
     def obter_driver_robusto(self):
-        if not self.is_port_in_use(CHROME_DEBUG_PORT):
+        if not self.is_port_in_use(self.porta_debug):
             self.garantir_chrome_aberto()
 
         driver = self.conectar_selenium()
@@ -152,6 +205,84 @@ class AutomationLogic:
             self.driver.switch_to.window(self.driver.current_window_handle)
         except: pass
 
+    def identificar_pescador(self):
+        """Retorna os dígitos do CPF do usuário logado, ou None se não for possível identificar."""
+        try:
+            cpf = self.driver.execute_script(JS_IDENTIFICAR_PESCADOR)
+            if cpf:
+                return re.sub(r"\D", "", cpf)
+        except Exception as e:
+            self.logger.debug(f"Não foi possível identificar o pescador: {e}")
+        return None
+
+    def modo_leve_ativo(self):
+        try:
+            return bool(self.cfg.data.get("modo_leve", False))
+        except Exception:
+            return False
+
+    def aplicar_modo_leve(self):
+        """
+        Aplica na aba atual o perfil leve via CDP: bloqueia fontes, imagens e
+        analytics (lista configurável em urls_bloqueadas) e mantém o cache ligado.
+        """
+        if not self.modo_leve_ativo():
+            return
+        try:
+            handle = self.driver.current_window_handle
+            if handle in self.abas_modo_leve:
+                return
+            urls = [u for u in self.cfg.data.get("urls_bloqueadas", []) if u]
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": urls})
+            self.driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+            self.abas_modo_leve.add(handle)
+            self.logger.info(f"Modo leve ativo: {len(urls)} padrões bloqueados.", extra={'tags': 'INFO'})
+        except Exception as e:
+            self.logger.warning(f"Não foi possível aplicar o modo leve: {e}")
+
+    def listar_abas(self):
+        """
+        Lista todas as abas ({handle, url, title}) em uma única consulta ao DevTools
+        (Target.getTargets), sem trocar de janela. Retorna None se o CDP não estiver
+        disponível ou os alvos não puderem ser associados aos handles do Selenium.
+        """
+        try:
+            handles = self.driver.window_handles
+            alvos = self.driver.execute_cdp_cmd("Target.getTargets", {}).get("targetInfos", [])
+        except Exception as e:
+            self.logger.debug(f"Descoberta de abas via CDP indisponível: {e}")
+            return None
+
+        abas = []
+        for alvo in alvos:
+            if alvo.get("type") != "page":
+                continue
+            target_id = alvo.get("targetId", "")
+            # No chromedriver o handle da janela é o targetId do DevTools
+            handle = next((h for h in handles if h == target_id or h.endswith(target_id)), None)
+            if handle:
+                abas.append({"handle": handle, "url": alvo.get("url", ""), "title": alvo.get("title", "")})
+
+        if handles and not abas:
+            return None
+        return abas
+
+    def listar_abas_trocando_janela(self):
+        """Fallback sem CDP: visita cada aba para ler URL e título (uma troca de foco por aba)."""
+        abas = []
+        for j in self.driver.window_handles:
+            try:
+                self.driver.switch_to.window(j)
+                abas.append({"handle": j, "url": self.driver.current_url, "title": self.driver.title})
+            except: continue
+        return abas
+
+    def eh_aba_pesqbrasil(self, aba):
+        url_atual = aba["url"].lower()
+        titulo_atual = aba["title"].lower()
+        return "pesqbrasil" in url_atual or "manutencao" in url_atual or "pescador profissional" in titulo_atual
+
     def garantir_acesso_manutencao(self):
         self.check_stop()
         driver = self.driver
@@ -159,29 +290,21 @@ class AutomationLogic:
 
         try:
             self.logger.info("Verificando abas para garantir acesso à Manutenção...")
-            aba_encontrada = None
             try:
-                janelas = driver.window_handles
+                abas = self.listar_abas()
+                if abas is None:
+                    abas = self.listar_abas_trocando_janela()
             except:
                 return False
 
-            for j in janelas:
-                try:
-                    driver.switch_to.window(j)
-                    url_atual = driver.current_url.lower()
-                    titulo_atual = driver.title.lower()
-                    
-                    # Detecção aprimorada
-                    if "pesqbrasil" in url_atual or "manutencao" in url_atual or "pescador profissional" in titulo_atual:
-                        aba_encontrada = j
-                        break
-                except: continue
+            aba_encontrada = next((a for a in abas if self.eh_aba_pesqbrasil(a)), None)
 
             if aba_encontrada:
-                driver.switch_to.window(aba_encontrada)
+                driver.switch_to.window(aba_encontrada["handle"])
                 self.logger.info("Aba PesqBrasil encontrada.", extra={'tags': 'INFO'})
+                self.aplicar_modo_leve()
                 # Só recarrega se não estiver na página certa (evita reload desnecessário)
-                if URL_ALVO not in driver.current_url:
+                if URL_ALVO not in aba_encontrada["url"]:
                      driver.get(URL_ALVO)
                 
                 try: WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
@@ -189,11 +312,17 @@ class AutomationLogic:
                 return True
             else:
                 self.logger.info("Aba PesqBrasil não encontrada. Abrindo nova guia...", extra={'tags': 'WARNING'})
+                handles_antes = set(driver.window_handles)
                 driver.execute_script(f"window.open('{URL_ALVO}', '_blank');")
-                time.sleep(1.5)
-                driver.switch_to.window(driver.window_handles[-1])
+                self.esperas.aguardar_ate(lambda: len(set(driver.window_handles) - handles_antes) > 0, timeout=5)
+                novas = list(set(driver.window_handles) - handles_antes)
+                driver.switch_to.window(novas[0] if novas else driver.window_handles[-1])
+                self.aplicar_modo_leve()
+                self.esperas.aguardar_seletor("body", timeout=5)
                 return True
 
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.error(f"Erro crítico na navegação: {e}")
             return False
@@ -202,26 +331,32 @@ class AutomationLogic:
         self.logger.info("Forçando retorno à página inicial...")
         self.garantir_acesso_manutencao()
 
+    def abrir_abas_em_lote(self, urls):
+        """Abre várias abas em um único execute_script; as bloqueadas são criadas via CDP."""
+        if not urls: return
+        bloqueadas = self.driver.execute_script("""
+            var falhas = [];
+            arguments[0].forEach(function(u) { if (!window.open(u, '_blank')) falhas.push(u); });
+            return falhas;
+        """, list(urls)) or []
+        for url in bloqueadas:
+            try: self.driver.execute_cdp_cmd("Target.createTarget", {"url": url})
+            except Exception as e: self.logger.warning(f"Não foi possível abrir {url}: {e}")
+
     def restaurar_abas_trabalho(self):
         """Verifica quais abas já estão abertas e abre apenas as faltantes."""
         if not self.driver: return
         self.logger.info("Verificando abas de trabalho...", extra={'tags': 'INFO'})
         
         try:
-            janelas = self.driver.window_handles
-            urls_abertas = []
-            
-            # Coleta URLs abertas (pode ser lento se houver muitas abas)
-            for j in janelas:
-                try:
-                    self.driver.switch_to.window(j)
-                    urls_abertas.append(self.driver.current_url.lower())
-                except: pass
-            
-            # Volta para a primeira (só para não ficar perdido)
-            if janelas: self.driver.switch_to.window(janelas[0])
-
-            count_abertas = 0
+            abas = self.listar_abas()
+            if abas is None:
+                abas = self.listar_abas_trocando_janela()
+                # Volta para a primeira (só para não ficar perdido)
+                if abas: self.driver.switch_to.window(abas[0]["handle"])
+            urls_abertas = [a["url"].lower() for a in abas]
+
+            faltantes = []
             for url_alvo in URLS_ABERTURA:
                 # Simplificação: verifica se parte da URL alvo está em alguma aberta
                 # Ex: "cadunico" em "https://cadunico..."
@@ -231,19 +366,14 @@ class AutomationLogic:
                 elif "receita" in url_alvo: keyword = "receita"
                 elif "pesqbrasil" in url_alvo: keyword = "pesqbrasil"
                 
-                ja_existe = False
-                for u in urls_abertas:
-                    if keyword and keyword in u:
-                        ja_existe = True
-                        break
-                
+                ja_existe = any(keyword and keyword in u for u in urls_abertas)
                 if not ja_existe:
                     self.logger.info(f"Abrindo aba faltante: {keyword}")
-                    self.driver.execute_script(f"window.open('{url_alvo}', '_blank');")
-                    count_abertas += 1
-                    time.sleep(0.5)
+                    faltantes.append(url_alvo)
             
-            if count_abertas == 0:
+            if faltantes:
+                self.abrir_abas_em_lote(faltantes)
+            else:
                 self.logger.info("Todas as abas de trabalho já estão abertas.", extra={'tags': 'SUCCESS'})
             
             self.garantir_acesso_manutencao()
@@ -253,6 +383,7 @@ class AutomationLogic:
 
     # --- INTERAÇÃO COM ELEMENTOS ---
 
+    @medir("acao")
     def click_robusto(self, elemento, timeout=2):
         try:
             # Tenta clique direto via JS (mais rápido e ignora overlays)
@@ -267,9 +398,17 @@ class AutomationLogic:
             except Exception as e:
                 return False
 
+    @medir("campo")
     def limpar_e_digitar(self, elemento, texto):
         self.check_stop()
         texto = str(texto)
+        try:
+            # Valores reprodutíveis: numa retomada o campo frequentemente já tem exatamente o valor
+            if (elemento.get_attribute("value") or "").strip() == texto.strip():
+                self.logger.info(f"Campo já contém '{texto}', mantendo.")
+                return True
+        except Exception:
+            pass
         self.logger.info(f"Digitando '{texto}'...")
         try:
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", elemento)
@@ -289,9 +428,39 @@ class AutomationLogic:
             self.logger.error(f"Erro ao digitar '{texto}': {e}")
             return False
 
-    def selecionar_combo(self, container_pai, valor, eh_busca=False):
+    def selecionar_combo_rapido(self, container_pai, valor, eh_busca=False, valor_norm=None):
+        """
+        Seleciona a opção em uma única chamada execute_script (abre a lista,
+        normaliza os textos, escolhe o match exato/parcial e clica).
+        Retorna o dicionário de resultado do script ou None se o script falhar.
+        """
+        try:
+            return self.driver.execute_script(
+                JS_SELECIONAR_COMBO, container_pai, valor_norm or self.normalize_text(valor), bool(eh_busca), str(valor)
+            )
+        except Exception as e:
+            self.logger.debug(f"Seleção rápida indisponível para '{valor}': {e}")
+            return None
+
+    @medir("campo")
+    def selecionar_combo(self, container_pai, valor, eh_busca=False, valor_norm=None):
         self.check_stop()
         self.logger.debug(f"Selecionando no combo: '{valor}'")
+
+        resultado = self.selecionar_combo_rapido(container_pai, valor, eh_busca, valor_norm)
+        if resultado:
+            status = resultado.get("status")
+            if status == "exato":
+                self.logger.info(f"Selecionado: {valor}", extra={'tags': 'SUCCESS'})
+                return True
+            if status == "parcial":
+                self.logger.info(f"Selecionado (Parcial): {resultado.get('texto')}", extra={'tags': 'WARNING'})
+                return True
+            self.logger.debug(f"Seleção rápida sem sucesso ({status}, {resultado.get('total')} opções). Usando modo clássico.")
+
+        return self.selecionar_combo_classico(container_pai, valor, eh_busca)
+
+    def selecionar_combo_classico(self, container_pai, valor, eh_busca=False):
         driver = self.driver
         MAX_TENTATIVAS = 3
 
@@ -322,7 +491,7 @@ class AutomationLogic:
                 if eh_busca:
                     input_elem.clear()
                     input_elem.send_keys(valor)
-                    time.sleep(0.5)
+                    self.esperas.aguardar_estabilizar(lista, timeout=1.0)
 
                 opcoes = lista.find_elements(By.TAG_NAME, "label")
                 match_candidato = None
@@ -354,6 +523,8 @@ class AutomationLogic:
                 try: self.driver.execute_script("document.body.click()")
                 except: pass
 
+            except InterruptedError:
+                raise
             except Exception as e:
                 time.sleep(0.5)
                 continue
@@ -361,9 +532,33 @@ class AutomationLogic:
         self.logger.error(f"FALHA ao selecionar combo: {valor}")
         return False
 
-    def garantir_selecao_unica_combo(self, nome_campo, valor_unico):
+    def registrar_reconciliacao(self, nome_campo, relatorio):
+        """Loga o diff de uma reconciliação de checkboxes (o que foi marcado/desmarcado)."""
+        marcados = relatorio.get("marcados") or []
+        desmarcados = relatorio.get("desmarcados") or []
+        if not marcados and not desmarcados:
+            self.logger.info(f"{nome_campo}: {relatorio.get('total', 0)} itens já corretos.")
+            return
+        partes = []
+        if marcados: partes.append(f"+{marcados}")
+        if desmarcados: partes.append(f"-{desmarcados}")
+        self.logger.info(f"{nome_campo}: {' '.join(partes)} ({relatorio.get('mantidos', 0)} mantidos)", extra={'tags': 'SUCCESS'})
+
+    @medir("campo")
+    def garantir_selecao_unica_combo(self, nome_campo, valor_unico, valor_norm=None):
         self.check_stop()
         self.logger.debug(f"Seleção única: {valor_unico}")
+        with contexto_evento(campo=nome_campo):
+            try:
+                relatorio = self.driver.execute_script(JS_RECONCILIAR_SELECAO_UNICA, nome_campo, valor_norm or self.normalize_text(valor_unico))
+                if relatorio and relatorio.get("total"):
+                    self.registrar_reconciliacao(nome_campo, relatorio)
+                    return relatorio
+            except Exception as e:
+                self.logger.debug(f"Reconciliação em lote indisponível para {nome_campo}: {e}")
+            self.garantir_selecao_unica_combo_classico(nome_campo, valor_unico)
+
+    def garantir_selecao_unica_combo_classico(self, nome_campo, valor_unico):
         try:
             inp = self.driver.find_element(By.XPATH, f"//input[@name='{nome_campo}']")
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", inp)
@@ -392,9 +587,22 @@ class AutomationLogic:
         except Exception as e:
             self.logger.warning(f"Erro em seleção única: {e}")
 
-    def garantir_checkbox_group(self, nome_grupo, lista_alvos):
+    @medir("campo")
+    def garantir_checkbox_group(self, nome_grupo, lista_alvos, alvos_norm=None):
         self.check_stop()
         self.logger.debug(f"Processando checkboxes: {lista_alvos}")
+        with contexto_evento(campo=nome_grupo):
+            try:
+                alvos_norm = list(alvos_norm) if alvos_norm is not None else [self.normalize_text(x) for x in lista_alvos]
+                relatorio = self.driver.execute_script(JS_RECONCILIAR_CHECKBOX_GROUP, nome_grupo, alvos_norm)
+                if relatorio and relatorio.get("total"):
+                    self.registrar_reconciliacao(nome_grupo, relatorio)
+                    return relatorio
+            except Exception as e:
+                self.logger.debug(f"Reconciliação em lote indisponível para {nome_grupo}: {e}")
+            self.garantir_checkbox_group_classico(nome_grupo, lista_alvos)
+
+    def garantir_checkbox_group_classico(self, nome_grupo, lista_alvos):
         try:
             alvos_norm = [self.normalize_text(x) for x in lista_alvos]
             itens = self.driver.find_elements(By.XPATH, f"//input[@name='{nome_grupo}']/ancestor::div[contains(@class, 'br-checkbox')]")
@@ -414,100 +622,133 @@ class AutomationLogic:
             self.logger.warning(f"Erro check group: {e}")
 
     # --- LÓGICA DE NEGÓCIO ---
-    def gerar_dados_mes(self, mes_nome):
-        d_min = float(self.cfg.data['meta_financeira_min'])
-        d_max = float(self.cfg.data['meta_financeira_max'])
-        variacao_pct = float(self.cfg.data.get('variacao_peso_pct', 0.15))
-        catalogo = self.cfg.data['catalogo_especies']
-
-        is_november = (mes_nome.lower() == "novembro")
+    def obter_solver(self):
+        """ProductionSolver da configuração atual (recriado só quando catálogo/metas mudam)."""
+        conf = self.config()
+        chave = conf.chave_solver
+        catalogo = conf.catalogo_dicts()
+        if getattr(self, "_solver_chave", None) != chave:
+            self._solver = ProductionSolver(catalogo, chave[1], chave[2], chave[3])
+            self._solver_chave = chave
+            # Subconjuntos viáveis vêm do cache em disco (compartilhado entre pescadores/execuções).
+            # Sem entrada, o sorteio segue sob demanda e o cache é montado em segundo plano;
+            # os sorteios semeados são os mesmos com ou sem cache.
+            try:
+                CombinationCache().aplicar(self._solver, impressao_digital(catalogo, chave[1], chave[2], chave[3]))
+            except Exception as e:
+                self.logger.debug(f"Cache de combinações indisponível: {e}")
+        return self._solver
 
-        start_time = time.time()
-        while True:
-            if time.time() - start_time > 10:
-                self.logger.warning(f"Timeout ao gerar valores para {mes_nome}.")
-                break
+    def fluxo_mes(self, mes_nome):
+        """Gerador semeado por (pescador, ano, mês) do ano em execução (não semeado fora dele)."""
+        return fluxo_aleatorio(self.pescador_id, self.ano_atual, mes_nome)
 
-            self.check_stop()
-            qtd_especies = random.choice([3, 4])
-            if len(catalogo) < qtd_especies:
-                especies_selecionadas = catalogo
-            else:
-                especies_selecionadas = random.sample(catalogo, qtd_especies)
-            producao = []
-            if is_november:
-                soma_parcial = 0
-                temp_prod = []
-                for i in range(len(especies_selecionadas) - 1):
-                    esp = especies_selecionadas[i]
-                    base = esp["kg_base"]
-                    variacao = int(base * variacao_pct)
-                    peso = random.randint(max(1, base - variacao), base + variacao)
-                    preco = esp["preco"]
-                    temp_prod.append({"nome": esp["nome"], "preco": preco, "peso": peso})
-                    soma_parcial += (peso * preco)
-                ultimo_esp = especies_selecionadas[-1]
-                preco_ultimo = ultimo_esp["preco"]
-                falta = 1000.00 - soma_parcial
-                if falta > 0 and (falta % preco_ultimo == 0):
-                    peso_necessario = int(falta / preco_ultimo)
-                    if 1 <= peso_necessario <= 100:
-                        temp_prod.append({"nome": ultimo_esp["nome"], "preco": preco_ultimo, "peso": peso_necessario})
-                        producao = temp_prod
-                        return [(item['nome'], "Quilo (Kg)", str(item['peso']), f"{item['preco']:.2f}".replace('.', ',')) for item in producao]
-            else:
-                producao = []
-                for esp in especies_selecionadas:
-                    base = esp["kg_base"]
-                    variacao = int(base * variacao_pct)
-                    peso = random.randint(max(1, base - variacao), base + variacao)
-                    producao.append({"nome": esp["nome"], "preco": esp["preco"], "peso": peso})
-                total_mes = sum(item["peso"] * item["preco"] for item in producao)
-                if d_min <= total_mes <= d_max:
-                    return [(item['nome'], "Quilo (Kg)", str(item['peso']), f"{item['preco']:.2f}".replace('.', ',')) for item in producao]
-        return [(item['nome'], "Quilo (Kg)", str(item['peso']), f"{item['preco']:.2f}".replace('.', ',')) for item in producao]
+    def gerar_dados_mes(self, mes_nome, rng=None):
+        self.check_stop()
+        is_november = (mes_nome.lower() == "novembro")
+        producao, valido = self.obter_solver().amostrar(is_november, rng)
+        if not valido:
+            self.logger.warning(f"Nenhuma combinação do catálogo atinge a meta de {mes_nome}. Usando a mais próxima.")
+        return formatar_producao(producao)
+
+    def meses_do_ano(self, meses_selecionados_set):
+        """Meses de defeso e de produção a preencher, na ordem da configuração."""
+        conf = self.config()
+        all_defeso = conf.meses_defeso or MESES_DEFESO_PADRAO
+        all_producao = conf.meses_producao or MESES_PRODUCAO_PADRAO
+        defeso = [m for m in all_defeso if m in meses_selecionados_set]
+        producao = [m for m in all_producao if m in meses_selecionados_set]
+        return defeso, producao
+
+    @medir("plano")
+    def preparar_plano(self, ano, meses_selecionados_set):
+        """
+        Gera (ou recupera do checkpoint) o plano do ano inteiro antes de preencher o formulário.
+        """
+        defeso, producao = self.meses_do_ano(meses_selecionados_set)
+        salvo = self.journal.plano() if self.journal else None
+        if salvo:
+            plano = YearPlan.from_dict(salvo)
+            if all(m in plano.producao for m in producao):
+                # O plano salvo pode cobrir mais meses do que a seleção atual: só os selecionados são preenchidos
+                plano = plano.restrito(defeso, producao)
+                self.logger.info(f"Plano de {ano} recuperado do checkpoint: {plano.resumo()}", extra={'tags': 'INFO'})
+                return plano
+
+        conf = self.config()
+        planner = YearPlanner(
+            self.obter_solver(),
+            conf.dias_min, conf.dias_max,
+            conf.meta_anual_min, conf.meta_anual_max, conf.min_especies_ano,
+        )
+        plano = planner.gerar(ano, defeso, producao, pescador_id=self.pescador_id)
+        self.logger.info(f"Plano de {ano} gerado: {plano.resumo()}", extra={'tags': 'INFO'})
+        if not plano.valido:
+            self.logger.warning("O plano não atende a todas as metas configuradas. Usando a aproximação mais próxima.")
+        if self.journal:
+            self.journal.salvar_plano(plano.to_dict())
+        return plano
 
     def processar_etapa_1(self):
         self.logger.info(">>> Etapa 1: Dados Básicos <<<", extra={'tags': 'DESTAK'})
         self.check_stop()
-        municipio = self.cfg.get_municipio_efetivo()
+        conf = self.config()
+        municipio = conf.municipio
         try:
             WebDriverWait(self.driver, 8).until(EC.presence_of_element_located((By.NAME, "uf")))
+            falhas = []
             inp_uf = self.driver.find_element(By.NAME, "uf").find_element(By.XPATH, "./ancestor::div[contains(@class, 'br-select')]")
-            self.selecionar_combo(inp_uf, self.cfg.data['uf_residencia'])
+            if not self.selecionar_combo(inp_uf, conf.uf_residencia): falhas.append("UF")
             inp_mun = self.driver.find_element(By.NAME, "municipio").find_element(By.XPATH, "./ancestor::div[contains(@class, 'br-select')]")
-            self.selecionar_combo(inp_mun, municipio, eh_busca=True)
+            if not self.selecionar_combo(inp_mun, municipio, eh_busca=True): falhas.append("município")
             inp_cat = self.driver.find_element(By.NAME, "categoria").find_element(By.XPATH, "./ancestor::div[contains(@class, 'br-select')]")
-            self.selecionar_combo(inp_cat, self.cfg.data['categoria'])
+            if not self.selecionar_combo(inp_cat, conf.categoria): falhas.append("categoria")
             inp_emb = self.driver.find_element(By.NAME, "embarcado").find_element(By.XPATH, "./ancestor::div[contains(@class, 'br-select')]")
-            self.selecionar_combo(inp_emb, self.cfg.data['forma_atuacao'])
+            if not self.selecionar_combo(inp_emb, conf.forma_atuacao): falhas.append("forma de atuação")
+            if falhas:
+                self.logger.warning(f"Etapa 1 incompleta: {', '.join(falhas)} não selecionado(s).")
+                return False
             self.logger.info("Etapa 1 preenchida.")
+            return True
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.warning(f"Aviso Etapa 1: {e}")
+            return False
 
     def processar_etapa_2(self):
         self.logger.info(">>> Etapa 2: Atividade <<<", extra={'tags': 'DESTAK'})
         self.check_stop()
+        conf = self.config()
         try:
             WebDriverWait(self.driver, 8).until(EC.presence_of_element_located((By.XPATH, "//h4[contains(text(), 'Atividade pesqueira')]")))
             try:
                 inp = self.driver.find_element(By.NAME, "prestacaoServico")
                 container = inp.find_element(By.XPATH, "./ancestor::div[contains(@class, 'br-select')]")
-                self.selecionar_combo(container, self.cfg.data['relacao_trabalho'])
-            except: pass
-            self.garantir_selecao_unica_combo("estadosComercializacao", self.cfg.data['estado_comercializacao'])
-            self.garantir_checkbox_group("gruposAlvo", self.cfg.data['grupos_alvo'])
-            self.garantir_checkbox_group("compradoresPescado", self.cfg.data['compradores'])
+            except: container = None # Campo nem sempre presente
+            if container is not None and not self.selecionar_combo(container, conf.relacao_trabalho):
+                self.logger.warning("Etapa 2 incompleta: relação de trabalho não selecionada.")
+                return False
+            self.garantir_selecao_unica_combo("estadosComercializacao", conf.estado_comercializacao, conf.estado_comercializacao_norm)
+            self.garantir_checkbox_group("gruposAlvo", conf.grupos_alvo, conf.grupos_alvo_norm)
+            self.garantir_checkbox_group("compradoresPescado", conf.compradores, conf.compradores_norm)
             self.logger.info("Etapa 2 preenchida.")
+            return True
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.error(f"Erro Etapa 2: {e}")
+            return False
 
+    @medir("tabela")
     def preencher_tabela_especies(self, dados_especies):
+        """Retorna True só se todas as linhas foram preenchidas (combos selecionados e valores digitados)."""
         self.check_stop()
         self.logger.info(f"Preenchendo {len(dados_especies)} espécies na tabela...")
         try:
             tabela = self.driver.find_element(By.XPATH, "//div[contains(@class, 'br-table') and .//div[contains(text(), 'Resultado anual')]]")
             btn_add = tabela.find_element(By.XPATH, ".//button[contains(., 'Adicionar nova') or .//i[contains(@class, 'fa-plus')]]")
+            especies_norm = self.config().especies_norm
             for i, (esp, und, qtd, val) in enumerate(dados_especies):
                 self.check_stop()
                 linhas = tabela.find_elements(By.XPATH, ".//tbody/tr")
@@ -515,20 +756,33 @@ class AutomationLogic:
                     try:
                         self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn_add)
                         self.click_robusto(btn_add)
-                        WebDriverWait(self.driver, 2).until(lambda d: len(tabela.find_elements(By.XPATH, ".//tbody/tr")) > i)
+                        if not self.esperas.aguardar_contagem(tabela, "tbody tr", i + 1, timeout=2):
+                            raise TimeoutException("Nova linha não apareceu")
+                    except InterruptedError:
+                        raise
                     except:
                         self.driver.execute_script("arguments[0].click();", btn_add)
-                        time.sleep(0.3)
+                        self.esperas.aguardar_contagem(tabela, "tbody tr", i + 1, timeout=1)
                     linhas = tabela.find_elements(By.XPATH, ".//tbody/tr")
-                if i < len(linhas):
+                if i >= len(linhas):
+                    self.logger.error(f"Linha {i+1} da tabela de espécies não foi criada.")
+                    return False
+                with contexto_evento(campo=f"especie {i+1}"):
                     self.logger.info(f"Preenchendo linha {i+1}: {esp} | {qtd}kg | R${val}")
                     col = linhas[i].find_elements(By.TAG_NAME, "td")
-                    self.selecionar_combo(col[0], esp, eh_busca=True)
-                    self.selecionar_combo(col[1], und, eh_busca=False)
-                    self.limpar_e_digitar(col[2].find_element(By.TAG_NAME, "input"), qtd)
-                    self.limpar_e_digitar(col[3].find_element(By.TAG_NAME, "input"), val)
+                    ok = self.selecionar_combo(col[0], esp, eh_busca=True, valor_norm=especies_norm.get(esp))
+                    ok = self.selecionar_combo(col[1], und, eh_busca=False) and ok
+                    ok = self.limpar_e_digitar(col[2].find_element(By.TAG_NAME, "input"), qtd) and ok
+                    ok = self.limpar_e_digitar(col[3].find_element(By.TAG_NAME, "input"), val) and ok
+                    if not ok:
+                        self.logger.error(f"Linha {i+1} da tabela de espécies ({esp}) não foi preenchida por completo.")
+                        return False
+            return True
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.error(f"Erro ao preencher espécies: {e}")
+            return False
 
     def processar_mes_defeso(self, mes):
         self.check_stop()
@@ -539,7 +793,7 @@ class AutomationLogic:
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", header)
             if "accordion-icon-approved" in header.get_attribute('innerHTML') or "Não houve pesca" in header.text:
                 self.logger.info(f"Mês {mes} já parece estar preenchido ou fechado.")
-                return
+                return True
             self.click_robusto(header)
             try:
                 radio_nao = WebDriverWait(self.driver, 1.5).until(EC.visibility_of_element_located((By.XPATH, "//label[normalize-space()='Não']")))
@@ -551,13 +805,28 @@ class AutomationLogic:
                 self.click_robusto(chk_defeso)
                 self.logger.info("Marcado motivo 'Defeso'.")
             except: pass
-        except: pass
+            return True
+        except InterruptedError:
+            raise
+        except:
+            return False
 
     def processar_mes_producao(self, mes):
         self.check_stop()
         self.logger.info(f"Iniciando Produção: {mes}", extra={'tags': 'INFO'})
-        dados = self.gerar_dados_mes(mes)
-        municipio_pesca = self.cfg.get_municipio_efetivo()
+        conf = self.config()
+        dados, dias = self.plano.mes(mes) if self.plano else (None, None)
+        if not dados:
+            dados, dias = self.journal.dados_mes(mes) if self.journal else (None, None)
+        if dados:
+            self.logger.info(f"Usando valores planejados para {mes}.")
+        else:
+            rng = self.fluxo_mes(mes)
+            dados = self.gerar_dados_mes(mes, rng)
+            dias = str(rng.randint(conf.dias_min, conf.dias_max))
+            if self.journal:
+                self.journal.salvar_dados_mes(mes, dados, dias)
+        municipio_pesca = conf.municipio
         try:
             xpath_header = f"//button[contains(@class, 'br-accordion-header') and .//*[contains(text(), '{mes}')]]"
             header = WebDriverWait(self.driver, 5).until(EC.presence_of_element_located((By.XPATH, xpath_header)))
@@ -565,60 +834,91 @@ class AutomationLogic:
             self.click_robusto(header)
             label_sim = WebDriverWait(self.driver, 1.5).until(EC.visibility_of_element_located((By.XPATH, "//label[normalize-space()='Sim']")))
             self.click_robusto(label_sim)
-            dias = str(random.randint(int(self.cfg.data['dias_min']), int(self.cfg.data['dias_max'])))
             self.logger.info(f"Dias trabalhados: {dias}")
             inp_dias = WebDriverWait(self.driver, 1.5).until(EC.visibility_of_element_located((By.XPATH, "//label[contains(text(), 'dias trabalhados')]/ancestor::div[contains(@class, 'br-input')]//input")))
-            self.limpar_e_digitar(inp_dias, dias)
+            falhas = []
+            if not self.limpar_e_digitar(inp_dias, dias): falhas.append("dias trabalhados")
             tbl = self.driver.find_element(By.XPATH, "//table[caption[contains(text(), 'Área de realização')]]")
             cols = tbl.find_element(By.XPATH, ".//tbody/tr[1]").find_elements(By.TAG_NAME, "td")
-            self.selecionar_combo(cols[0], self.cfg.data['local_pesca_tipo'])
-            self.selecionar_combo(cols[1], self.cfg.data['uf_pesca'])
-            self.selecionar_combo(cols[2], municipio_pesca, eh_busca=True)
-            self.limpar_e_digitar(cols[3].find_element(By.TAG_NAME, "input"), self.cfg.data['nome_local_pesca'])
+            if not self.selecionar_combo(cols[0], conf.local_pesca_tipo): falhas.append("local de pesca")
+            if not self.selecionar_combo(cols[1], conf.uf_pesca): falhas.append("UF de pesca")
+            if not self.selecionar_combo(cols[2], municipio_pesca, eh_busca=True): falhas.append("município de pesca")
+            if not self.limpar_e_digitar(cols[3].find_element(By.TAG_NAME, "input"), conf.nome_local_pesca): falhas.append("nome do local")
             cell_metodo = cols[4]
             inp_met = cell_metodo.find_element(By.TAG_NAME, "input")
             self.click_robusto(inp_met)
             br_select = cell_metodo.find_element(By.XPATH, ".//div[contains(@class, 'br-select')]")
             lista = br_select.find_element(By.CLASS_NAME, "br-list")
-            lista_metodos_cfg = self.cfg.data.get('metodos_pesca', [])
             opcoes = lista.find_elements(By.TAG_NAME, "label")
             for opc in opcoes:
                 txt_opc = self.normalize_text(opc.get_attribute("textContent"))
-                for metodo_usuario in lista_metodos_cfg:
-                    if self.normalize_text(metodo_usuario) == txt_opc:
-                        chk = opc.find_element(By.XPATH, "./preceding-sibling::input")
-                        if not self.driver.execute_script("return arguments[0].checked;", chk):
-                            self.click_robusto(opc)
-                        break
+                if txt_opc in conf.metodos_pesca_norm:
+                    chk = opc.find_element(By.XPATH, "./preceding-sibling::input")
+                    if not self.driver.execute_script("return arguments[0].checked;", chk):
+                        self.click_robusto(opc)
             try: self.driver.find_element(By.TAG_NAME, "caption").click()
             except: pass
-            self.preencher_tabela_especies(dados)
+            if not self.preencher_tabela_especies(dados): falhas.append("tabela de espécies")
+            if falhas:
+                # Mês não vai para o checkpoint: a retomada preenche de novo (mesmos valores planejados)
+                self.logger.warning(f"Mês {mes} incompleto: {', '.join(falhas)}.")
+                return False
             self.logger.info(f"Mês {mes} finalizado com sucesso.", extra={'tags': 'SUCCESS'})
+            return True
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.error(f"Erro crítico no mês {mes}: {e}")
             self.logger.error(traceback.format_exc())
+            return False
+
+    def executar_mes(self, mes, tipo, processar):
+        """Processa um mês com o mês no contexto dos eventos e registra resultado e duração."""
+        with contexto_evento(mes=mes), span(f"Mês {mes}", "mes", tipo=tipo):
+            inicio = time.time()
+            ok = False
+            try:
+                ok = processar(mes)
+                return ok
+            finally:
+                duracao = round(time.time() - inicio, 2)
+                resultado = "ok" if ok else "falha"
+                self.logger.info(
+                    f"Mês {mes} ({tipo}): {resultado} em {duracao:.1f}s",
+                    extra={'tags': 'INFO' if ok else 'WARNING', 'evento': {'resultado': resultado, 'duracao': duracao}}
+                )
 
     def processar_etapa_3(self, meses_selecionados_set):
         self.logger.info(">>> Iniciando Etapa 3: Meses <<<", extra={'tags': 'DESTAK'})
         self.check_stop()
         try:
             WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "br-accordion")))
-            try:
-                all_defeso = self.cfg.data.get('meses_defeso', MESES_DEFESO_PADRAO)
-                all_producao = self.cfg.data.get('meses_producao', MESES_PRODUCAO_PADRAO)
-            except Exception as e:
-                self.logger.warning(f"Erro ao ler configuração de meses: {e}. Usando padrão.")
-                all_defeso = MESES_DEFESO_PADRAO
-                all_producao = MESES_PRODUCAO_PADRAO
             self.logger.info(f"Meses selecionados pelo usuário: {len(meses_selecionados_set)}", extra={'tags': 'INFO'})
-            defesos_to_run = [m for m in all_defeso if m in meses_selecionados_set]
-            producao_to_run = [m for m in all_producao if m in meses_selecionados_set]
+            if self.plano:
+                defesos_to_run = [m for m in self.plano.defeso if m in meses_selecionados_set]
+                producao_to_run = [m for m in self.plano.producao if m in meses_selecionados_set]
+            else:
+                defesos_to_run, producao_to_run = self.meses_do_ano(meses_selecionados_set)
+            if self.journal:
+                ja_feitos = [m for m in defesos_to_run + producao_to_run if self.journal.mes_concluido(m)]
+                if ja_feitos:
+                    self.logger.info(f"Meses já concluídos (checkpoint), pulando: {ja_feitos}", extra={'tags': 'WARNING'})
+                    defesos_to_run = [m for m in defesos_to_run if m not in ja_feitos]
+                    producao_to_run = [m for m in producao_to_run if m not in ja_feitos]
+            todos_ok = True
             self.logger.info(f"Defesos a preencher: {defesos_to_run}")
             for mes in defesos_to_run:
-                self.processar_mes_defeso(mes)
+                if self.executar_mes(mes, "defeso", self.processar_mes_defeso):
+                    if self.journal: self.journal.marcar_mes(mes)
+                else:
+                    todos_ok = False
             self.logger.info(f"Produção a preencher: {producao_to_run}")
             for mes in producao_to_run:
-                self.processar_mes_producao(mes)
+                if self.executar_mes(mes, "producao", self.processar_mes_producao):
+                    if self.journal: self.journal.marcar_mes(mes)
+                else:
+                    todos_ok = False
+            return todos_ok
         except Exception as e:
             self.logger.error(f"ERRO CRÍTICO NA ETAPA 3: {e}")
             self.logger.error(traceback.format_exc())
@@ -634,13 +934,239 @@ class AutomationLogic:
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", container)
             if not self.driver.execute_script("return arguments[0].checked;", chk):
                 self.click_robusto(chk)
+                if not self.driver.execute_script("return arguments[0].checked;", chk):
+                    self.logger.warning("Termo de responsabilidade não ficou marcado.")
+                    return False
                 self.logger.info("Termo aceito!", extra={'tags': 'SUCCESS'})
             
             # REMOVIDO: ctypes.windll.user32.MessageBoxW...
             # A mensagem de sucesso agora é gerenciada pelo AppController -> UI
-            
+            return True
+        except InterruptedError:
+            raise
         except Exception as e:
             self.logger.error(f"Erro Etapa 4: {e}")
+            return False
+
+    def executar_formulario(self, meses_selecionados):
+        """
+        Executa as 4 etapas do formulário já aberto, pulando as etapas que o
+        checkpoint (self.journal) marca como concluídas. Retorna True só se chegou à
+        Etapa 4 com todas as etapas confirmadas (o ano não é dado como concluído com etapa falha).
+        """
+        etapas = [
+            (1, self.processar_etapa_1),
+            (2, self.processar_etapa_2),
+            (3, lambda: self.processar_etapa_3(meses_selecionados)),
+            (4, self.processar_etapa_4),
+        ]
+        todas_ok = True
+        for numero, processar in etapas:
+            with contexto_evento(etapa=numero), span(f"Etapa {numero}", "etapa"):
+                if numero > 1:
+                    with span("avancar", "navegacao"):
+                        avancou = self.avancar()
+                    if not avancou:
+                        return False
+                if self.journal and self.journal.etapa_concluida(numero):
+                    self.logger.info(f"Etapa {numero} já concluída (checkpoint). Avançando direto.", extra={'tags': 'WARNING'})
+                    continue
+                # Só a etapa que confirma sucesso (True) é marcada; falha é refeita na retomada
+                if processar() is True:
+                    if self.journal:
+                        self.journal.marcar_etapa(numero)
+                else:
+                    todas_ok = False
+                    self.logger.warning(f"Etapa {numero} não confirmada; será refeita na retomada.")
+        return todas_ok
+
+    # --- FLUXO DE ALTO NÍVEL (usado pelo controller e pelas sessões do pool) ---
+    def capturar_tabela(self, timeout=20):
+        """
+        Aguarda (via MutationObserver) a tabela de declarações ter linhas e
+        devolve todas elas em uma única chamada: {index, texto, status, ano, botao}.
+        Retorna None se a tabela não apareceu dentro do limite.
+        """
+        if not self.esperas.aguardar_seletor("table > tbody > tr", timeout=timeout):
+            return None
+        return self.driver.execute_script(JS_SNAPSHOT_TABELA) or None
+
+    def varrer_pendencias(self):
+        """
+        Lê a tabela de declarações da Manutenção.
+        Retorna lista de dicts {index, year, sent, button} ou None se a tabela não apareceu.
+        """
+        linhas = self.capturar_tabela()
+        if not linhas:
+            return None
+
+        results = []
+        for row in linhas:
+            txt = row.get('texto') or ""
+            status_text = row.get('status') or ""
+
+            is_enviado = "Enviado" in txt or "Enviado" in status_text
+            is_pendente = "Pendente" in txt or "Rascunho" in txt
+
+            if is_pendente or is_enviado:
+                results.append({
+                    'index': row['index'],
+                    'year': row.get('ano') or "Desconhecido",
+                    'sent': is_enviado,
+                    'button': row.get('botao')
+                })
+        return results
+
+    def voltar_lista_manutencao(self):
+        """Garante a página da lista de declarações (sai do formulário se necessário)."""
+        self.check_stop()
+        if self.driver.current_url.rstrip("/") != URL_ALVO.rstrip("/"):
+            self.driver.get(URL_ALVO)
+        return self.esperas.aguardar_seletor("table tbody tr", timeout=20)
+
+    def localizar_pendencia(self, ano=None, index=None):
+        """
+        Resolve a linha pendente pelo ano (índices ficam obsoletos após cada envio/edição)
+        ou pelo índice da última varredura. Retorna o dict da varredura ou None.
+        """
+        for item in self.varrer_pendencias() or []:
+            if item['sent']:
+                continue
+            if ano is not None and item['year'] == str(ano):
+                return item
+            if ano is None and item['index'] == index:
+                return item
+        return None
+
+    def executar_ano(self, index, ano, meses_selecionados):
+        """
+        Abre a declaração da linha `index` e preenche o ano inteiro com checkpoint.
+        Com index=None a linha é localizada pelo ano.
+        Retorna True se o formulário foi preenchido até a Etapa 4.
+        Todos os eventos do ano levam o mesmo id de execução (filtro do visualizador de logs)
+        e o tempo de cada etapa/mês/campo/comando é medido por um Tracer próprio do ano;
+        os comandos do WebDriver são contados por tipo, local de chamada e etapa (DriverProfiler).
+        """
+        self.motivo_falha = ""
+        self.status_falha = ""
+        execucao = novo_id_execucao()
+        tracer = Tracer(f"Ano {ano}", tid=contexto_atual().get("sessao", 0))
+        profiler = DriverProfiler(f"Ano {ano}")
+        with contexto_evento(execucao=execucao, ano=str(ano)), tracer.ativo(), profiler.ativo():
+            try:
+                with tracer.span(f"Ano {ano}", "ano"):
+                    return self._executar_ano(index, ano, meses_selecionados)
+            finally:
+                self.relatorio_tempos(tracer, profiler, ano, execucao)
+
+    def relatorio_tempos(self, tracer, profiler, ano, execucao):
+        """
+        Loga a tabela de tempos e a contagem de comandos do ano, avisa estouros do
+        orçamento de comandos e exporta o trace (TRACES_DIR) para análise detalhada.
+        """
+        try:
+            self.logger.info(f"Tempo por etapa/campo/comando em {ano} (total {tracer.duracao_total():.1f}s):", extra={'tags': 'DESTAK'})
+            for linha in tracer.tabela_resumo():
+                self.logger.info(linha)
+            for linha in profiler.relatorio():
+                self.logger.info(linha)
+            orcamento = self.config().orcamento_comandos
+            for chave, limite, contagem in profiler.estouros(orcamento):
+                self.logger.warning(
+                    f"Orçamento de comandos estourado em {chave}: {contagem} (limite {limite})",
+                    extra={'evento': {'resultado': 'orcamento_estourado', 'campo': chave}}
+                )
+            if not os.path.exists(TRACES_DIR):
+                os.makedirs(TRACES_DIR)
+            path = tracer.exportar(
+                os.path.join(TRACES_DIR, f"{ano}_{time.strftime('%Y%m%d_%H%M%S')}_{execucao}.json"),
+                {"comandos_webdriver": profiler.to_dict()}
+            )
+            podar_traces(TRACES_DIR, TRACES_MAX)
+            self.logger.info(f"Trace salvo em: {path}")
+        except Exception as e:
+            self.logger.warning(f"Não foi possível gerar o relatório de tempos: {e}")
+
+    def _executar_ano(self, index, ano, meses_selecionados):
+        driver = self.driver
+        if index is None:
+            linha = self.localizar_pendencia(ano=ano)
+            if not linha:
+                return self.falhar(f"Ano {ano} não encontrado entre as pendências.")
+        else:
+            linha = self.localizar_pendencia(index=index)
+            if not linha or linha['year'] != str(ano):
+                return self.falhar(f"A tabela de declarações mudou; {ano} não está mais na linha selecionada. Faça uma nova varredura.")
+
+        btn = linha.get('button')
+        if not btn:
+            return self.falhar(f"Botão de edição não encontrado para {ano}.")
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
+        btn.click()
+
+        # Checkpoint por pescador/ano: retoma na primeira etapa/mês não concluído
+        pescador_id = self.identificar_pescador()
+        self.pescador_id = pescador_id
+        self.ano_atual = str(ano)
+        # Configuração fixada para o ano inteiro (a UI pode salvar alterações durante a execução).
+        # Se o CPF logado tem perfil no banco, o ano usa esse perfil.
+        self.conf, perfil = self.cfg.snapshot_para_pescador(pescador_id)
+        if perfil:
+            definir_contexto(perfil=perfil['nome'])
+            self.logger.info(f"Usando perfil '{perfil['nome']}' do pescador logado.", extra={'tags': 'INFO'})
+        if pescador_id:
+            self.journal = RunJournal(pescador_id, ano)
+            if self.journal.tem_progresso():
+                self.logger.info(f"Checkpoint encontrado para {ano}. Retomando execução.", extra={'tags': 'DESTAK'})
+        else:
+            self.journal = None
+            self.logger.warning("Pescador não identificado na página. Execução sem checkpoint.")
+
+        inicio = time.time()
+        status, mensagem = "erro", ""
+        try:
+            # Valida o snapshot que será executado (o perfil do CPF pode ter outro catálogo/meta)
+            problemas = self.cfg.problemas_do_plano(meses_selecionados, self.conf)
+            if problemas:
+                for p in problemas:
+                    self.logger.error(f"Plano inviável: {p}")
+                status, mensagem = "inviavel", " | ".join(problemas)
+                return self.falhar("Configuração de produção inviável:\n" + "\n".join(problemas), status)
+
+            # O ano inteiro é planejado antes da Etapa 1; as etapas só reproduzem o plano
+            self.plano = self.preparar_plano(ano, meses_selecionados)
+            concluido = self.executar_formulario(meses_selecionados)
+            if concluido and self.journal:
+                self.journal.finalizar()
+            status = "concluido" if concluido else "incompleto"
+            if not concluido:
+                self.falhar(f"Preenchimento de {ano} incompleto (etapa não confirmada). Execute novamente para retomar do checkpoint.")
+            return concluido
+        except InterruptedError:
+            status = "interrompido"
+            raise
+        except Exception as e:
+            mensagem = str(e)
+            raise
+        finally:
+            duracao = time.time() - inicio
+            self.logger.info(
+                f"Ano {ano}: {status} em {duracao:.1f}s",
+                extra={'tags': 'SUCCESS' if status == "concluido" else 'WARNING', 'evento': {'resultado': status, 'duracao': round(duracao, 2)}}
+            )
+            self.cfg.registrar_execucao(pescador_id, ano, status, mensagem, duracao, perfil["id"] if perfil else None)
+            self.journal = None
+            self.plano = None
+            self.pescador_id = None
+            self.ano_atual = None
+            self.conf = None
+
+    def falhar(self, motivo, status="incompleto"):
+        """Registra o motivo/status de um executar_ano sem sucesso (lidos pelo controller) e retorna False."""
+        self.motivo_falha = motivo
+        self.status_falha = status
+        self.logger.error(motivo)
+        return False
 
     def avancar(self):
         self.check_stop()
@@ -648,11 +1174,16 @@ class AutomationLogic:
         try:
             btn = WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//button[contains(., 'Avançar') or @data-action='avancar']")))
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'center'});", btn)
-            time.sleep(0.1)
+            # scrollIntoView é instantâneo; só espera o botão parar de re-renderizar (ex.: habilitar após validação)
+            self.esperas.aguardar_estabilizar(btn, timeout=0.5, quieto_ms=50)
+            assinatura = self.esperas.assinatura_pagina()
             self.click_robusto(btn)
-            time.sleep(1.0)
             self.logger.info("Botão avançar clicado. Aguardando transição.")
+            if not self.esperas.aguardar_mudanca_pagina(assinatura, timeout=5):
+                self.logger.debug("Transição de etapa não detectada dentro do limite.")
             return True
+        except InterruptedError:
+            raise
         except:
             self.logger.error("Falha ao clicar em avançar.")
             return False
\ No newline at end of file
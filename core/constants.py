@@ -38,8 +38,43 @@ if not os.path.exists(BASE_DIR):
 
 # Define o arquivo de log fixo dentro de C:\chrome_reap
 LOG_FILE = os.path.join(BASE_DIR, "reap_debug_log.txt")
+
+# Eventos estruturados (JSON lines, um arquivo por mês) + índice SQLite do visualizador de logs
+EVENTOS_DIR = os.path.join(BASE_DIR, "eventos")
+EVENTOS_RETENCAO_MESES = 12
+
+# Traces de tempo por execução (formato Trace Event: chrome://tracing / ui.perfetto.dev)
+TRACES_DIR = os.path.join(BASE_DIR, "traces")
+TRACES_MAX = 100
+
+# Versões anteriores do JSON de configuração (rollback / recuperação de arquivo corrompido)
+CONFIG_BACKUP_DIR = os.path.join(BASE_DIR, "config_backups")
+CONFIG_BACKUP_MAX = 10
 CHROME_PROFILE_PATH = BASE_DIR
 
+# Sessões paralelas: cada sessão tem seu Chrome com porta de debug e perfil próprios.
+# A sessão 0 usa a porta/perfil originais para preservar o login já existente.
+MAX_SESSOES = 8
+SESSOES_DIR = os.path.join(BASE_DIR, "sessoes")
+
+def porta_debug_sessao(indice):
+    return CHROME_DEBUG_PORT + indice
+
+def perfil_chrome_sessao(indice):
+    if indice == 0:
+        return CHROME_PROFILE_PATH
+    return os.path.join(SESSOES_DIR, f"sessao_{indice}")
+
+# Checkpoints de execução (retomada de anos interrompidos)
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "checkpoints")
+
+# Cache em disco das combinações viáveis de espécies (uma entrada por catálogo/metas)
+COMBINACOES_CACHE_DIR = os.path.join(BASE_DIR, "cache_combinacoes")
+COMBINACOES_CACHE_MAX = 32
+
+# Banco de perfis de pescadores (configurações nomeadas + histórico de execuções)
+PERFIS_DB = os.path.join(BASE_DIR, "perfis.db")
+
 # URLs para abrir automaticamente
 URLS_ABERTURA = [
     "https://pesqbrasil-pescadorprofissional.mpa.gov.br/manutencao",
@@ -0,0 +1,80 @@
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from core.js_scripts import JS_AGUARDAR_CONDICAO, JS_ASSINATURA_PAGINA
+
+class DomWaiter:
+    """
+    Esperas orientadas a eventos do DOM (MutationObserver via execute_async_script).
+    Cada espera é quebrada em fatias curtas para que o check_stop continue
+    sendo respeitado enquanto o navegador aguarda a transição.
+    """
+    FATIA_SEGUNDOS = 0.5
+
+    def __init__(self, automation):
+        self.automation = automation
+
+    def _executar(self, tipo, params, timeout, fatiar=True):
+        driver = self.automation.driver
+        limite = time.monotonic() + timeout
+        while True:
+            self.automation.check_stop()
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return False
+            fatia = min(self.FATIA_SEGUNDOS, restante) if fatiar else restante
+            try:
+                if driver.execute_async_script(JS_AGUARDAR_CONDICAO, tipo, params or {}, int(fatia * 1000)):
+                    return True
+            except TimeoutException:
+                pass
+            except WebDriverException as e:
+                # Navegação completa descarta o script: para 'assinatura' isso já é a transição esperada
+                if tipo == "assinatura" and "unload" in str(e).lower():
+                    return True
+                self.automation.logger.debug(f"Espera '{tipo}' interrompida: {e}")
+                return False
+            if not fatiar:
+                return False
+
+    def aguardar_seletor(self, css, timeout=5.0, visivel=False):
+        """Aguarda existir (ou ficar visível) um elemento que case com o seletor CSS."""
+        return self._executar("seletor", {"css": css, "visivel": visivel}, timeout)
+
+    def aguardar_contagem(self, raiz, css, minimo, timeout=3.0):
+        """Aguarda a raiz conter pelo menos `minimo` elementos (ex.: nova linha no <tbody>)."""
+        return self._executar("contagem", {"raiz": raiz, "css": css, "minimo": minimo}, timeout)
+
+    def assinatura_pagina(self):
+        try:
+            return self.automation.driver.execute_script(JS_ASSINATURA_PAGINA)
+        except Exception:
+            return None
+
+    def aguardar_mudanca_pagina(self, assinatura_anterior, timeout=5.0):
+        """Aguarda a etapa exibida mudar em relação à assinatura capturada antes do clique."""
+        if assinatura_anterior is None:
+            return False
+        return self._executar("assinatura", {"anterior": assinatura_anterior}, timeout)
+
+    def aguardar_estabilizar(self, raiz=None, timeout=1.0, quieto_ms=150):
+        """Aguarda o DOM (ou a subárvore da raiz) ficar sem mutações por `quieto_ms`."""
+        params = {"quieto_ms": quieto_ms}
+        if raiz is not None:
+            params["raiz"] = raiz
+        return self._executar("estavel", params, timeout, fatiar=False)
+
+    def aguardar_ate(self, predicado, timeout=5.0, intervalo=0.1):
+        """Polling curto para condições fora do DOM (porta de debug, novas janelas)."""
+        limite = time.monotonic() + timeout
+        while True:
+            self.automation.check_stop()
+            try:
+                if predicado():
+                    return True
+            except Exception:
+                pass
+            if time.monotonic() >= limite:
+                return False
+            time.sleep(intervalo)
@@ -0,0 +1,235 @@
+# ==============================================================================
+#  SCRIPTS JS INJETADOS NO NAVEGADOR
+#  Cada script resolve uma interação inteira em um único execute_script,
+#  evitando dezenas de idas e voltas HTTP ao chromedriver.
+# ==============================================================================
+
+# Mesmas regras de AutomationLogic.normalize_text (NFKD, remove "R$" e nbsp, trim, lower)
+JS_NORMALIZAR = r"""
+var normalizar = function(t) {
+    if (!t) return "";
+    t = String(t).normalize("NFKD");
+    t = t.split("R$").join("").split("\u00a0").join("").trim();
+    return t.toLowerCase();
+};
+var visivel = function(el) {
+    if (!el) return false;
+    var st = window.getComputedStyle(el);
+    return st.display !== "none" && st.visibility !== "hidden" && el.getClientRects().length > 0;
+};
+"""
+
+# arguments: [container_pai, valor_normalizado, eh_busca, valor_original]
+# Retorno: {status: 'exato'|'parcial'|'nao_encontrado'|'sem_select', texto, total}
+JS_SELECIONAR_COMBO = JS_NORMALIZAR + r"""
+var container = arguments[0], alvo = arguments[1], ehBusca = arguments[2], valorOriginal = arguments[3];
+
+var brSelect = container.querySelector("div[class*='br-select']") || container.closest("div[class*='br-select']");
+if (!brSelect) return {status: "sem_select", texto: "", total: 0};
+
+brSelect.scrollIntoView({block: "center", inline: "center"});
+var input = brSelect.querySelector("input");
+var lista = brSelect.querySelector(".br-list");
+if (!lista) return {status: "sem_select", texto: "", total: 0};
+
+if (!visivel(lista)) {
+    var btn = brSelect.querySelector("button[class*='br-button']");
+    if (btn) btn.click(); else if (input) input.click();
+}
+
+if (ehBusca && input) {
+    input.value = valorOriginal;
+    input.dispatchEvent(new Event("input", {bubbles: true}));
+    input.dispatchEvent(new KeyboardEvent("keyup", {bubbles: true}));
+}
+
+var opcoes = lista.querySelectorAll("label");
+var parcial = null;
+for (var i = 0; i < opcoes.length; i++) {
+    var txt = normalizar(opcoes[i].textContent);
+    if (txt === alvo) {
+        opcoes[i].scrollIntoView({block: "nearest"});
+        opcoes[i].click();
+        return {status: "exato", texto: opcoes[i].textContent.trim(), total: opcoes.length};
+    }
+    if (ehBusca && !parcial && txt.indexOf(alvo) !== -1) parcial = opcoes[i];
+}
+
+if (parcial) {
+    parcial.scrollIntoView({block: "nearest"});
+    parcial.click();
+    return {status: "parcial", texto: parcial.textContent.trim(), total: opcoes.length};
+}
+
+document.body.click();
+return {status: "nao_encontrado", texto: "", total: opcoes.length};
+"""
+
+# arguments: [nome_grupo, alvos_normalizados]
+# Grupo de checkboxes soltos (input[name=grupo] dentro de div.br-checkbox).
+# Um item é alvo se algum texto alvo estiver contido no texto do item.
+# Retorno: {marcados: [...], desmarcados: [...], mantidos: n, total: n}
+JS_RECONCILIAR_CHECKBOX_GROUP = JS_NORMALIZAR + r"""
+var nome = arguments[0], alvos = arguments[1];
+var inputs = document.querySelectorAll("input[name='" + nome + "']");
+var relatorio = {marcados: [], desmarcados: [], mantidos: 0, total: 0};
+var alternar = [];
+
+for (var i = 0; i < inputs.length; i++) {
+    var item = inputs[i].closest("div[class*='br-checkbox']");
+    if (!item) continue;
+    relatorio.total++;
+    var txt = normalizar(item.innerText || item.textContent);
+    var ehAlvo = alvos.some(function(a) { return txt.indexOf(a) !== -1; });
+    if (ehAlvo !== inputs[i].checked) {
+        alternar.push(inputs[i]);
+        (ehAlvo ? relatorio.marcados : relatorio.desmarcados).push(txt);
+    } else {
+        relatorio.mantidos++;
+    }
+}
+
+alternar.forEach(function(chk) {
+    chk.scrollIntoView({block: "center"});
+    chk.click();
+});
+return relatorio;
+"""
+
+# arguments: [nome_campo, alvo_normalizado]
+# Combo multi-seleção (br-select com br-item) onde apenas um valor deve ficar marcado.
+# Retorno: {marcados: [...], desmarcados: [...], mantidos: n, total: n} ou null se o campo não existir.
+JS_RECONCILIAR_SELECAO_UNICA = JS_NORMALIZAR + r"""
+var nome = arguments[0], alvo = arguments[1];
+var inp = document.querySelector("input[name='" + nome + "']");
+if (!inp) return null;
+var brSelect = inp.closest("div[class*='br-select']");
+if (!brSelect) return null;
+
+inp.scrollIntoView({block: "center", inline: "center"});
+var lista = brSelect.querySelector("div[class*='br-list']");
+if (!lista || !visivel(lista)) {
+    var btn = inp.nextElementSibling;
+    if (btn && btn.tagName === "BUTTON") btn.click(); else inp.click();
+    lista = brSelect.querySelector("div[class*='br-list']");
+}
+if (!lista) { document.body.click(); return null; }
+
+var relatorio = {marcados: [], desmarcados: [], mantidos: 0, total: 0};
+var itens = lista.querySelectorAll(".br-item");
+var alternar = [];
+
+for (var i = 0; i < itens.length; i++) {
+    var lbl = itens[i].querySelector("label");
+    var chk = itens[i].querySelector("input");
+    if (!lbl || !chk) continue;
+    var txt = normalizar(lbl.textContent);
+    if (!txt || txt.indexOf("selecionar todos") !== -1) continue;
+    relatorio.total++;
+    var ehAlvo = (txt === alvo);
+    if (ehAlvo !== chk.checked) {
+        alternar.push(lbl);
+        (ehAlvo ? relatorio.marcados : relatorio.desmarcados).push(txt);
+    } else {
+        relatorio.mantidos++;
+    }
+}
+
+alternar.forEach(function(lbl) { lbl.click(); });
+document.body.click();
+return relatorio;
+"""
+
+# Assinatura da etapa visível (títulos + passo ativo do wizard). Muda quando o formulário avança.
+JS_FUNCAO_ASSINATURA = r"""
+var assinatura = function() {
+    var partes = [];
+    document.querySelectorAll("h1, h2, h3, h4, legend, [class*='wizard'] [active], [class*='step'] [active]").forEach(function(e) {
+        partes.push((e.textContent || "").trim());
+    });
+    return location.href + "|" + partes.join("|");
+};
+"""
+JS_ASSINATURA_PAGINA = JS_FUNCAO_ASSINATURA + "return assinatura();"
+
+# execute_async_script. arguments: [tipo, params, limite_ms, callback]
+# Resolve true assim que a condição for satisfeita (verificada a cada mutação do DOM)
+# ou com o resultado da última verificação quando o limite estourar.
+#   seletor       -> params {css, visivel}: existe elemento que casa com o seletor
+#   contagem      -> params {raiz, css, minimo}: raiz contém >= minimo elementos
+#   assinatura    -> params {anterior}: assinatura da página diferente da anterior
+#   estavel       -> params {raiz, quieto_ms}: DOM da raiz ficou quieto por quieto_ms
+JS_AGUARDAR_CONDICAO = JS_NORMALIZAR + JS_FUNCAO_ASSINATURA + r"""
+var tipo = arguments[0], p = arguments[1] || {}, limite = arguments[2], done = arguments[arguments.length - 1];
+var raiz = p.raiz || document.documentElement;
+
+var checar = function() {
+    if (tipo === "seletor") {
+        var els = document.querySelectorAll(p.css);
+        for (var i = 0; i < els.length; i++) if (!p.visivel || visivel(els[i])) return true;
+        return false;
+    }
+    if (tipo === "contagem") return raiz.querySelectorAll(p.css).length >= p.minimo;
+    if (tipo === "assinatura") return assinatura() !== p.anterior;
+    return false;
+};
+
+var fim = false, timerQuieto = null, timerLimite = null, obs = null;
+var terminar = function(valor) {
+    if (fim) return;
+    fim = true;
+    if (obs) obs.disconnect();
+    clearTimeout(timerQuieto);
+    clearTimeout(timerLimite);
+    done(valor);
+};
+
+if (tipo === "estavel") {
+    var quieto = p.quieto_ms || 150;
+    timerQuieto = setTimeout(function() { terminar(true); }, quieto);
+    obs = new MutationObserver(function() {
+        clearTimeout(timerQuieto);
+        timerQuieto = setTimeout(function() { terminar(true); }, quieto);
+    });
+    obs.observe(raiz, {childList: true, subtree: true, attributes: true, characterData: true});
+    timerLimite = setTimeout(function() { terminar(false); }, limite);
+    return;
+}
+
+if (checar()) { done(true); return; }
+obs = new MutationObserver(function() { if (checar()) terminar(true); });
+obs.observe(raiz, {childList: true, subtree: true, attributes: true, characterData: true});
+timerLimite = setTimeout(function() { terminar(checar()); }, limite);
+"""
+
+# Procura o CPF do usuário logado no texto da página (cabeçalho/menu do gov.br).
+JS_IDENTIFICAR_PESCADOR = r"""
+var texto = document.body ? document.body.innerText : "";
+var m = texto.match(/\d{3}\.\d{3}\.\d{3}-\d{2}/);
+return m ? m[0] : null;
+"""
+
+# Fotografia da tabela de declarações da Manutenção (mesmas regras da varredura original).
+# Retorno: lista de {index, texto, status, ano, botao} onde botao é o WebElement "editar" (ou null).
+JS_SNAPSHOT_TABELA = r"""
+var linhas = document.querySelectorAll("table > tbody > tr");
+var saida = [];
+for (var i = 0; i < linhas.length; i++) {
+    var row = linhas[i];
+    var statusCell = row.querySelector("td[class*='status']");
+    var ano = null;
+    var cols = row.querySelectorAll("td");
+    for (var c = 0; c < cols.length; c++) {
+        var t = (cols[c].innerText || "").trim();
+        if (/^20\d{2}/.test(t)) { ano = t; break; }
+    }
+    saida.push({
+        index: i,
+        texto: row.innerText || "",
+        status: statusCell ? (statusCell.innerText || "") : "",
+        ano: ano,
+        botao: row.querySelector("button[class*='br-button'][aria-label='editar']")
+    });
+}
+return saida;
+"""
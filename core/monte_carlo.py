@@ -0,0 +1,107 @@
+import random
+import statistics
+
+from core.constants import MESES_PRODUCAO_PADRAO
+from core.production_solver import ProductionSolver, META_NOVEMBRO
+from core.year_plan import YearPlanner
+from services.combination_cache import CombinationCache, impressao_digital
+
+PERCENTIS = (5, 25, 50, 75, 95)
+
+def percentis(valores, ps=PERCENTIS):
+    """Percentis com interpolação linear entre os pontos (statistics.quantiles, método inclusivo)."""
+    if not valores:
+        return {p: 0.0 for p in ps}
+    if len(valores) == 1:
+        return {p: float(valores[0]) for p in ps}
+    cortes = statistics.quantiles(valores, n=100, method="inclusive") # cortes[k - 1] = percentil k
+    return {p: cortes[p - 1] for p in ps}
+
+def histograma(valores, faixas=10):
+    """Lista de (inicio, fim, contagem) com faixas de largura igual."""
+    if not valores:
+        return []
+    lo, hi = min(valores), max(valores)
+    largura = (hi - lo) / faixas or 1.0
+    contagens = [0] * faixas
+    for v in valores:
+        contagens[min(int((v - lo) / largura), faixas - 1)] += 1
+    return [(lo + i * largura, lo + (i + 1) * largura, c) for i, c in enumerate(contagens)]
+
+def resumo_distribuicao(valores):
+    if not valores:
+        return {"min": 0.0, "max": 0.0, "media": 0.0, "percentis": percentis([]), "histograma": []}
+    return {
+        "min": min(valores),
+        "max": max(valores),
+        "media": statistics.fmean(valores),
+        "percentis": percentis(valores),
+        "histograma": histograma(valores),
+    }
+
+def simular_anos(config_data, n_anos=2000, rng=None, parar=None, progresso=None):
+    """
+    Simula `n_anos` anos completos com o mesmo YearPlanner usado na automação e
+    consolida as estatísticas: distribuição dos totais mensais e anuais, frequência
+    de cada espécie (fração dos meses de produção em que aparece) e taxa de meses
+    fora da meta. `parar()` interrompe cedo; `progresso(feitos, total)` é chamado a cada lote.
+    """
+    rng = rng or random.Random()
+    catalogo = config_data.get("catalogo_especies", [])
+    meta_min = float(config_data.get("meta_financeira_min", 0))
+    meta_max = float(config_data.get("meta_financeira_max", 0))
+    variacao = float(config_data.get("variacao_peso_pct", 0.15))
+    meses_prod = config_data.get("meses_producao", MESES_PRODUCAO_PADRAO)
+
+    solver = ProductionSolver(catalogo, meta_min, meta_max, variacao)
+    try:
+        CombinationCache().aplicar(solver, impressao_digital(catalogo, meta_min, meta_max, variacao))
+    except Exception:
+        pass
+    planner = YearPlanner(
+        solver, config_data.get("dias_min", 18), config_data.get("dias_max", 22),
+        config_data.get("meta_anual_min", 0), config_data.get("meta_anual_max", 0), config_data.get("min_especies_ano", 0),
+    )
+
+    totais_mes, totais_ano = [], []
+    aparicoes = {e["nome"]: 0 for e in catalogo}
+    fora_faixa = 0
+    anos_invalidos = 0
+    lote = max(1, n_anos // 50)
+
+    feitos = 0
+    for feitos in range(1, n_anos + 1):
+        if parar and parar():
+            feitos -= 1
+            break
+        plano = planner.gerar("Simulação", [], meses_prod, rng)
+        if not plano.valido:
+            anos_invalidos += 1
+        total_ano = 0.0
+        for mes in plano.producao:
+            total = round(plano.total_mes(mes), 2)
+            total_ano += total
+            totais_mes.append(total)
+            if mes.lower() == "novembro":
+                fora = abs(total - META_NOVEMBRO) > 0.005
+            else:
+                fora = total < meta_min - 0.005 or total > meta_max + 0.005
+            if fora:
+                fora_faixa += 1
+            dados, _ = plano.mes(mes)
+            for nome in {linha[0] for linha in dados}:
+                aparicoes[nome] = aparicoes.get(nome, 0) + 1
+        totais_ano.append(total_ano)
+        if progresso and feitos % lote == 0:
+            progresso(feitos, n_anos)
+
+    n_meses = len(totais_mes)
+    return {
+        "anos": feitos,
+        "meses": n_meses,
+        "mensal": resumo_distribuicao(totais_mes),
+        "anual": resumo_distribuicao(totais_ano),
+        "frequencia_especies": {nome: (c / n_meses if n_meses else 0.0) for nome, c in aparicoes.items()},
+        "taxa_fora_faixa": fora_faixa / n_meses if n_meses else 0.0,
+        "taxa_anos_invalidos": anos_invalidos / feitos if feitos else 0.0,
+    }
@@ -0,0 +1,123 @@
+import logging
+import threading
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+from core.automation import AutomationLogic
+
+class ServicoPreAquecido(Service):
+    """
+    Serviço do chromedriver iniciado antecipadamente. O webdriver.Chrome chama
+    start() ao conectar; se o processo já está de pé, reaproveita em vez de
+    subir outro chromedriver.
+    """
+    def start(self):
+        if self.process and self.process.poll() is None and self.is_connectable():
+            return
+        super().start()
+
+class BrowserPrewarmer:
+    """
+    Sobe o Chrome (porta de debug da sessão 0) e o chromedriver em segundo plano
+    enquanto a splash valida a licença. O AutomationLogic depois só se conecta.
+    """
+    def __init__(self):
+        self.logger = logging.getLogger("REAP_PREWARM")
+        self.chrome_pronto = threading.Event()
+        self.servico_pronto = threading.Event()
+        self.servico = None
+        self.thread = None
+        self.porta_chrome = None # Porta de debug do Chrome aberto pelo pré-aquecimento (None = já estava aberto)
+
+    def iniciar(self):
+        self.thread = threading.Thread(target=self._executar, daemon=True)
+        self.thread.start()
+
+    def _executar(self):
+        # Chrome e chromedriver sobem em paralelo entre si também
+        t_chrome = threading.Thread(target=self._aquecer_chrome, daemon=True)
+        t_chrome.start()
+        self._aquecer_chromedriver()
+        t_chrome.join()
+
+    def _aquecer_chrome(self):
+        try:
+            logic = AutomationLogic(self.logger, threading.Event(), None)
+            ja_aberto = logic.is_port_in_use(logic.porta_debug)
+            if logic.garantir_chrome_aberto() and not ja_aberto:
+                self.porta_chrome = logic.porta_debug
+        except Exception as e:
+            self.logger.warning(f"Pré-aquecimento do Chrome falhou: {e}")
+        finally:
+            self.chrome_pronto.set()
+
+    def _aquecer_chromedriver(self):
+        try:
+            servico = ServicoPreAquecido()
+            servico.path = self._resolver_chromedriver(servico)
+            servico.start()
+            self.servico = servico
+        except Exception as e:
+            self.logger.warning(f"Pré-aquecimento do chromedriver falhou: {e}")
+        finally:
+            self.servico_pronto.set()
+
+    def _resolver_chromedriver(self, servico):
+        if servico.path:
+            return servico.path
+        from selenium.webdriver.common.driver_finder import DriverFinder
+        try:
+            return DriverFinder(servico, Options()).get_driver_path() # Selenium >= 4.20
+        except TypeError:
+            return DriverFinder.get_path(servico, Options()) # Selenium 4.11 - 4.19
+
+    def aguardar_chrome(self, timeout=15):
+        return self.chrome_pronto.wait(timeout)
+
+    def obter_servico(self, timeout=15):
+        """Serviço do chromedriver já iniciado, ou None (o webdriver sobe um novo)."""
+        self.servico_pronto.wait(timeout)
+        return self.servico
+
+    def encerrar(self, fechar_chrome=False):
+        """
+        Para o chromedriver pré-aquecido. Com fechar_chrome=True (licença recusada) também
+        fecha o Chrome aberto pelo pré-aquecimento; um Chrome que já estava aberto fica.
+        """
+        if fechar_chrome:
+            self.aguardar_chrome()
+            self.servico_pronto.wait(15)
+            if self.porta_chrome:
+                self._fechar_chrome(self.porta_chrome)
+                self.porta_chrome = None
+        if self.servico:
+            try: self.servico.stop()
+            except: pass
+            self.servico = None
+
+    def _fechar_chrome(self, porta):
+        """Fecha o navegador pela porta de debug (Browser.close via CDP)."""
+        try:
+            opts = Options()
+            opts.add_experimental_option("debuggerAddress", f"127.0.0.1:{porta}")
+            if self.servico:
+                driver = webdriver.Chrome(service=self.servico, options=opts)
+            else:
+                driver = webdriver.Chrome(options=opts)
+            driver.execute_cdp_cmd("Browser.close", {})
+        except Exception as e:
+            self.logger.warning(f"Não foi possível fechar o Chrome pré-aquecido: {e}")
+
+_PREWARMER = None
+
+def iniciar_preaquecimento():
+    global _PREWARMER
+    if _PREWARMER is None:
+        _PREWARMER = BrowserPrewarmer()
+        _PREWARMER.iniciar()
+    return _PREWARMER
+
+def obter_preaquecimento():
+    return _PREWARMER
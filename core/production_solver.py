@@ -0,0 +1,425 @@
+import copy
+import math
+import bisect
+import random
+import threading
+import itertools
+import collections
+
+# Regras de Novembro (herdadas do gerador original): total exato de R$ 1000,00,
+# com a última espécie livre entre 1 e 100 kg para fechar a conta.
+META_NOVEMBRO = 1000.00
+PESO_MAX_NOVEMBRO = 100
+
+def para_centavos(valor):
+    return int(round(float(valor) * 100))
+
+class ProductionSolver:
+    """
+    Gerador construtivo da produção mensal.
+
+    Para um subconjunto de espécies, monta por programação dinâmica inteira
+    (valores em centavos) a contagem de combinações de pesos que atingem cada
+    total, e sorteia de trás para frente proporcionalmente a essas contagens.
+    Assim o resultado é uniforme entre as combinações válidas do subconjunto e
+    sempre cai na meta, sem amostragem por rejeição.
+    """
+    SONDAGENS_ALEATORIAS = 48 # Subconjuntos sorteados antes de enumerar todos
+    LIMITE_ENUMERACAO = 20000 # Máximo de subconjuntos testados na enumeração completa
+
+    def __init__(self, catalogo, meta_min, meta_max, variacao_pct):
+        self.catalogo = [
+            {"nome": e["nome"], "preco": float(e["preco"]), "kg_base": int(e["kg_base"])}
+            for e in catalogo
+        ]
+        self.min_cent = para_centavos(meta_min)
+        self.max_cent = para_centavos(meta_max)
+        self.variacao_pct = float(variacao_pct)
+        self._tabelas = {} # chave do subconjunto -> tabela DP (ou None se inviável)
+        self._viaveis = {} # (qtd, novembro) -> lista de chaves viáveis (após enumeração)
+        self._melhor_esforco = {} # novembro -> combinação mais próxima da meta (sem nenhuma viável)
+
+    # --- PARÂMETROS ---
+    def faixa_peso(self, esp):
+        base = esp["kg_base"]
+        variacao = int(base * self.variacao_pct)
+        return max(1, base - variacao), base + variacao
+
+    def tamanhos(self):
+        """Quantidades de espécies por mês (3 ou 4, limitadas ao tamanho do catálogo)."""
+        n = len(self.catalogo)
+        return sorted({min(3, n), min(4, n)}) if n else []
+
+    def alvo(self, novembro):
+        if novembro:
+            c = para_centavos(META_NOVEMBRO)
+            return c, c
+        return self.min_cent, self.max_cent
+
+    def _faixas_precos(self, chave):
+        indices, novembro = chave
+        faixas = [self.faixa_peso(self.catalogo[i]) for i in indices]
+        if novembro:
+            faixas[-1] = (1, PESO_MAX_NOVEMBRO)
+        precos = [para_centavos(self.catalogo[i]["preco"]) for i in indices]
+        return faixas, precos
+
+    def chave(self, indices, novembro):
+        # Fora de Novembro a ordem não importa; em Novembro a última espécie é a livre
+        if novembro:
+            return (tuple(sorted(indices[:-1])) + (indices[-1],), True)
+        return (tuple(sorted(indices)), False)
+
+    # --- PROGRAMAÇÃO DINÂMICA ---
+    def tabela(self, chave):
+        if chave in self._tabelas:
+            return self._tabelas[chave]
+
+        faixas, precos = self._faixas_precos(chave)
+        alvo_min, alvo_max = self.alvo(chave[1])
+
+        # Máximo ainda alcançável a partir de cada posição (poda pelo limite inferior)
+        resto_max = [0] * (len(precos) + 1)
+        for k in range(len(precos) - 1, -1, -1):
+            resto_max[k] = resto_max[k + 1] + faixas[k][1] * precos[k]
+
+        tabela = None
+        if resto_max[0] >= alvo_min and sum(a * p for (a, _), p in zip(faixas, precos)) <= alvo_max:
+            camadas = [{0: 1}]
+            for k, (p, (a, b)) in enumerate(zip(precos, faixas)):
+                nova = {}
+                for soma, cont in camadas[-1].items():
+                    for w in range(a, b + 1):
+                        t = soma + w * p
+                        if t > alvo_max:
+                            break
+                        if t + resto_max[k + 1] < alvo_min:
+                            continue
+                        nova[t] = nova.get(t, 0) + cont
+                camadas.append(nova)
+
+            finais = sorted((s, c) for s, c in camadas[-1].items() if alvo_min <= s <= alvo_max)
+            if finais:
+                acumulados = list(itertools.accumulate(c for _, c in finais))
+                tabela = {
+                    "faixas": faixas,
+                    "precos": precos,
+                    "camadas": camadas,
+                    "totais": [s for s, _ in finais],
+                    "acumulados": acumulados,
+                }
+
+        self._tabelas[chave] = tabela
+        return tabela
+
+    def contar(self, chave):
+        """Quantidade de combinações de pesos válidas para o subconjunto."""
+        t = self.tabela(chave)
+        return t["acumulados"][-1] if t else 0
+
+    def _sortear_pesos(self, tabela, rng):
+        acumulados = tabela["acumulados"]
+        idx = bisect.bisect_right(acumulados, rng.random() * acumulados[-1])
+        soma = tabela["totais"][min(idx, len(acumulados) - 1)]
+
+        camadas, precos, faixas = tabela["camadas"], tabela["precos"], tabela["faixas"]
+        pesos = [0] * len(precos)
+        for k in range(len(precos) - 1, -1, -1):
+            p, (a, b) = precos[k], faixas[k]
+            opcoes, contagens = [], []
+            for w in range(a, b + 1):
+                c = camadas[k].get(soma - w * p)
+                if c:
+                    opcoes.append(w)
+                    contagens.append(c)
+            w = rng.choices(opcoes, weights=contagens)[0]
+            pesos[k] = w
+            soma -= w * p
+        return pesos
+
+    # --- ESCOLHA DO SUBCONJUNTO ---
+    def _sortear_chave(self, qtd, novembro, rng):
+        indices = rng.sample(range(len(self.catalogo)), qtd)
+        return self.chave(indices, novembro)
+
+    def _candidatos(self, qtd, novembro):
+        """
+        Chaves a testar na enumeração: todas, se couberem em LIMITE_ENUMERACAO; senão uma
+        amostra uniforme sem repetição (a ordem lexicográfica truncada só veria as primeiras
+        espécies do catálogo). A semente é fixa: com ou sem cache a lista é a mesma.
+        """
+        n = len(self.catalogo)
+        if math.comb(n, qtd) * (qtd if novembro else 1) <= self.LIMITE_ENUMERACAO:
+            for combo in itertools.combinations(range(n), qtd):
+                ordens = [combo[:i] + combo[i + 1:] + (combo[i],) for i in range(qtd)] if novembro else [combo]
+                for ordem in ordens:
+                    yield self.chave(ordem, novembro)
+            return
+        rng = random.Random(f"enumeracao|{n}|{qtd}|{novembro}")
+        vistos = set()
+        for _ in range(3 * self.LIMITE_ENUMERACAO):
+            chave = self._sortear_chave(qtd, novembro, rng)
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+            yield chave
+            if len(vistos) >= self.LIMITE_ENUMERACAO:
+                return
+
+    def _enumerar_viaveis(self, qtd, novembro):
+        chave_cache = (qtd, novembro)
+        if chave_cache not in self._viaveis:
+            self._viaveis[chave_cache] = [c for c in self._candidatos(qtd, novembro) if self._atinge_alvo(c)]
+        return self._viaveis[chave_cache]
+
+    def escolher_chave(self, novembro, rng):
+        """Sorteia um subconjunto viável. Retorna None se nenhum atinge a meta."""
+        tamanhos = self.tamanhos()
+        if not tamanhos:
+            return None
+        qtd_preferida = rng.choice([3, 4])
+        qtd_preferida = min(qtd_preferida, len(self.catalogo))
+        ordem_tamanhos = [qtd_preferida] + [q for q in tamanhos if q != qtd_preferida]
+
+        for qtd in ordem_tamanhos:
+            # Sondagens aceitam o primeiro subconjunto viável sorteado: uniforme entre os viáveis.
+            # Rodam mesmo com a lista carregada, para o sorteio semeado não depender do cache.
+            for _ in range(self.SONDAGENS_ALEATORIAS):
+                chave = self._sortear_chave(qtd, novembro, rng)
+                if self.tabela(chave):
+                    return chave
+            # Viáveis raros: sorteia na lista (cache em disco ou enumeração sob demanda)
+            viaveis = self._enumerar_viaveis(qtd, novembro)
+            if viaveis:
+                return rng.choice(viaveis)
+        return None
+
+    def subconjuntos_viaveis(self):
+        """Enumera (ou devolve do cache em memória) todos os subconjuntos viáveis: {(qtd, novembro): [chaves]}."""
+        return {
+            (qtd, novembro): self._enumerar_viaveis(qtd, novembro)
+            for qtd in self.tamanhos() for novembro in (False, True)
+        }
+
+    def copia_vazia(self):
+        """Solver com a mesma configuração e sem estado (para enumerar em outra thread)."""
+        return ProductionSolver(self.catalogo, self.min_cent / 100, self.max_cent / 100, self.variacao_pct)
+
+    def carregar_viaveis(self, viaveis):
+        """Reaproveita subconjuntos viáveis já calculados (ex.: cache em disco), pulando a enumeração."""
+        for (qtd, novembro), chaves in viaveis.items():
+            self._viaveis[(qtd, novembro)] = [self.chave(list(indices), novembro) for indices in chaves]
+
+    # --- API ---
+    def amostrar(self, novembro=False, rng=None):
+        """
+        Retorna (producao, valido). `producao` é uma lista de dicts {nome, preco, peso}.
+        Quando nenhuma combinação atinge a meta, devolve a mais próxima com valido=False.
+        """
+        rng = rng or random
+        chave = self.escolher_chave(novembro, rng)
+        if chave is None:
+            return self.melhor_esforco(novembro), False
+
+        pesos = self._sortear_pesos(self.tabela(chave), rng)
+        producao = [
+            {"nome": self.catalogo[i]["nome"], "preco": self.catalogo[i]["preco"], "peso": w}
+            for i, w in zip(chave[0], pesos)
+        ]
+        if not novembro:
+            rng.shuffle(producao)
+        return producao, True
+
+    def melhor_esforco(self, novembro):
+        """
+        Combinação mais próxima da meta (para catálogos/metas incompatíveis).
+        Subconjuntos que ficam inteiros abaixo/acima da meta valem pelos pesos extremos;
+        os que cruzam a meta sem atingi-la (granularidade dos preços) usam o total
+        alcançável mais próximo (_mais_proximo). Os candidatos são os da enumeração
+        (_candidatos), sem favorecer as primeiras espécies do catálogo. Calculada uma vez por solver.
+        """
+        if novembro in self._melhor_esforco:
+            return [dict(item) for item in self._melhor_esforco[novembro]]
+        tamanhos = self.tamanhos()
+        if not tamanhos:
+            return []
+        alvo_min, alvo_max = self.alvo(novembro)
+        melhor, melhor_dist = None, None
+        cruzam = [] # (chave, excesso acima da meta máxima)
+        for qtd in tamanhos:
+            for chave in self._candidatos(qtd, novembro):
+                faixas, precos = self._faixas_precos(chave)
+                minimo = sum(a * p for (a, _), p in zip(faixas, precos))
+                maximo = sum(b * p for (_, b), p in zip(faixas, precos))
+                if maximo < alvo_min:
+                    dist, pesos = alvo_min - maximo, [b for _, b in faixas]
+                elif minimo > alvo_max:
+                    dist, pesos = minimo - alvo_max, [a for a, _ in faixas]
+                else:
+                    cruzam.append((chave, maximo - alvo_max))
+                    continue
+                if melhor_dist is None or dist < melhor_dist:
+                    melhor, melhor_dist = (chave, pesos), dist
+
+        # Só interessam totais mais próximos que o melhor já encontrado
+        for chave, excesso in cruzam:
+            folga = excesso if melhor_dist is None else min(excesso, melhor_dist - 1)
+            if folga < 0:
+                break
+            resultado = self._mais_proximo(chave, folga)
+            if resultado and (melhor_dist is None or resultado[0] < melhor_dist):
+                melhor_dist, pesos = resultado
+                melhor = (chave, pesos)
+
+        producao = []
+        if melhor:
+            chave, pesos = melhor
+            producao = [
+                {"nome": self.catalogo[i]["nome"], "preco": self.catalogo[i]["preco"], "peso": w}
+                for i, w in zip(chave[0], pesos)
+            ]
+        self._melhor_esforco[novembro] = producao
+        return [dict(item) for item in producao]
+
+    def _mais_proximo(self, chave, folga):
+        """
+        (distância, pesos) do total alcançável mais próximo da meta, considerando só
+        totais até `folga` centavos fora dela; None se não houver. Bitset por espécie
+        como em _atinge_alvo, guardando as camadas para recuperar os pesos.
+        """
+        faixas, precos = self._faixas_precos(chave)
+        alvo_min, alvo_max = self.alvo(chave[1])
+        mascara = (1 << (alvo_max + folga + 1)) - 1
+        camadas = [1]
+        for p, (a, b) in zip(precos, faixas):
+            novo = 0
+            for w in range(a, b + 1):
+                novo |= camadas[-1] << (w * p)
+            camadas.append(novo & mascara)
+
+        bits = camadas[-1]
+        candidatos = []
+        abaixo = bits & ((1 << alvo_min) - 1)
+        if abaixo:
+            total = abaixo.bit_length() - 1
+            candidatos.append((alvo_min - total, total))
+        acima = bits >> alvo_min
+        if acima:
+            total = alvo_min + (acima & -acima).bit_length() - 1
+            candidatos.append((max(0, total - alvo_max), total))
+        if not candidatos:
+            return None
+        dist, soma = min(candidatos)
+        if dist > folga:
+            return None
+
+        pesos = [0] * len(precos)
+        for k in range(len(precos) - 1, -1, -1):
+            p, (a, b) = precos[k], faixas[k]
+            for w in range(a, b + 1):
+                resto = soma - w * p
+                if resto >= 0 and (camadas[k] >> resto) & 1:
+                    pesos[k], soma = w, resto
+                    break
+        return dist, pesos
+
+    # --- VIABILIDADE ---
+    def _atinge_alvo(self, chave):
+        """Existência de solução via bitset (int do Python): bit t ligado = total t alcançável."""
+        faixas, precos = self._faixas_precos(chave)
+        alvo_min, alvo_max = self.alvo(chave[1])
+        if sum(b * p for (_, b), p in zip(faixas, precos)) < alvo_min:
+            return False
+        if sum(a * p for (a, _), p in zip(faixas, precos)) > alvo_max:
+            return False
+        mascara = (1 << (alvo_max + 1)) - 1
+        bits = 1
+        for p, (a, b) in zip(precos, faixas):
+            novo = 0
+            for w in range(a, b + 1):
+                novo |= bits << (w * p)
+            bits = novo & mascara
+            if not bits:
+                return False
+        return bool(bits >> alvo_min)
+
+    def _algum_viavel(self, qtd, novembro):
+        """
+        True assim que encontrar um subconjunto de `qtd` espécies que atinge a meta.
+        Usa os subconjuntos já carregados (cache) quando houver; senão testa por bitset
+        e para no primeiro viável (só o caso inviável percorre a enumeração inteira).
+        """
+        carregados = self._viaveis.get((qtd, novembro))
+        if carregados is not None:
+            return bool(carregados)
+        return any(self._atinge_alvo(chave) for chave in self._candidatos(qtd, novembro))
+
+    def faixa_totais(self):
+        """(mínimo, máximo) em reais dos totais de um mês comum, entre todos os tamanhos de subconjunto."""
+        if not self.catalogo:
+            return None, None
+        minimos = sorted(self.faixa_peso(e)[0] * para_centavos(e["preco"]) for e in self.catalogo)
+        maximos = sorted((self.faixa_peso(e)[1] * para_centavos(e["preco"]) for e in self.catalogo), reverse=True)
+        tamanhos = self.tamanhos()
+        return sum(minimos[:tamanhos[0]]) / 100, sum(maximos[:tamanhos[-1]]) / 100
+
+    def analisar(self):
+        """
+        Relatório de viabilidade do catálogo contra as metas:
+        faixa de totais alcançáveis por mês comum e se cada tipo de mês é atingível.
+        """
+        relatorio = {
+            "total_min": None, "total_max": None,
+            "mes_comum_viavel": False, "novembro_viavel": False,
+            "problemas": [],
+        }
+        if len(self.catalogo) == 0:
+            relatorio["problemas"].append("O catálogo de espécies está vazio.")
+            return relatorio
+        if self.min_cent > self.max_cent:
+            relatorio["problemas"].append("A meta financeira mínima é maior que a máxima.")
+
+        relatorio["total_min"], relatorio["total_max"] = self.faixa_totais()
+        relatorio["mes_comum_viavel"] = any(self._algum_viavel(qtd, False) for qtd in self.tamanhos())
+        relatorio["novembro_viavel"] = any(self._algum_viavel(qtd, True) for qtd in self.tamanhos())
+
+        if not relatorio["mes_comum_viavel"]:
+            relatorio["problemas"].append(
+                f"Nenhuma combinação atinge R$ {self.min_cent / 100:.2f} - R$ {self.max_cent / 100:.2f}. "
+                f"Totais possíveis: R$ {relatorio['total_min']:.2f} a R$ {relatorio['total_max']:.2f}."
+            )
+        if not relatorio["novembro_viavel"]:
+            relatorio["problemas"].append(f"Nenhuma combinação fecha o total exato de Novembro (R$ {META_NOVEMBRO:.2f}).")
+        return relatorio
+
+# Análises já feitas por (catálogo, metas, variação): salvar a config ou iniciar um ano não refaz a conta
+_ANALISES = collections.OrderedDict()
+_ANALISES_MAX = 16
+_ANALISES_LOCK = threading.Lock()
+
+def analisar_viabilidade(catalogo, meta_min, meta_max, variacao_pct, viaveis=None):
+    """
+    Relatório de viabilidade (ProductionSolver.analisar) memoizado por configuração.
+    `viaveis` (ex.: do CombinationCache) dispensa o teste por bitset.
+    """
+    chave = (
+        tuple((e["nome"], round(float(e["preco"]), 2), int(e["kg_base"])) for e in catalogo),
+        para_centavos(meta_min), para_centavos(meta_max), round(float(variacao_pct), 4),
+    )
+    with _ANALISES_LOCK:
+        if chave in _ANALISES:
+            _ANALISES.move_to_end(chave)
+            return copy.deepcopy(_ANALISES[chave])
+    solver = ProductionSolver(catalogo, meta_min, meta_max, variacao_pct)
+    if viaveis:
+        solver.carregar_viaveis(viaveis)
+    relatorio = solver.analisar()
+    with _ANALISES_LOCK:
+        _ANALISES[chave] = relatorio
+        while len(_ANALISES) > _ANALISES_MAX:
+            _ANALISES.popitem(last=False)
+    return copy.deepcopy(relatorio)
+
+def formatar_producao(producao):
+    """Converte para o formato das linhas da tabela: (nome, unidade, peso, preço com vírgula)."""
+    return [(item['nome'], "Quilo (Kg)", str(item['peso']), f"{item['preco']:.2f}".replace('.', ',')) for item in producao]
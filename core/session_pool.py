@@ -0,0 +1,184 @@
+import logging
+import queue
+import threading
+
+from core.automation import AutomationLogic
+from core.constants import MAX_SESSOES, porta_debug_sessao, perfil_chrome_sessao
+from services.event_log import definir_contexto
+
+class SessionLogger(logging.LoggerAdapter):
+    """Prefixa as mensagens com a sessão, preservando o extra={'tags': ...} do chamador."""
+    def process(self, msg, kwargs):
+        return f"[S{self.extra['sessao']}] {msg}", kwargs
+
+class Job:
+    """
+    Trabalho enfileirado no pool. `executar` recebe o AutomationLogic da sessão;
+    `ao_falhar(motivo)` é chamado quando o job é descartado sem rodar (sem navegador).
+    """
+    def __init__(self, descricao, executar, sessao_id=None, ao_falhar=None):
+        self.descricao = descricao
+        self.executar = executar
+        self.sessao_id = sessao_id
+        self.ao_falhar = ao_falhar
+
+class Sessao:
+    def __init__(self, indice, automation):
+        self.indice = indice
+        self.automation = automation
+        self.fila = queue.Queue() # Jobs fixados nesta sessão (ex.: anos do pescador logado nela)
+        self.ocupada = False
+        self.thread = None
+
+class SessionPool:
+    """
+    Pool de sessões do Chrome. Cada sessão tem porta de debug, perfil e
+    AutomationLogic próprios, e uma thread que consome jobs da sua fila
+    (jobs fixados) ou da fila geral (qualquer sessão livre com navegador).
+    """
+    ESPERA_FILA = 0.5 # Espera bloqueante por job antes de reavaliar as filas
+    def __init__(self, logger, stop_event, config_manager, on_status=None):
+        self.logger = logger
+        self.stop_event = stop_event
+        self.cfg = config_manager
+        self.on_status = on_status
+        self.sessoes = {}
+        self.fila_geral = queue.Queue()
+        self.lock = threading.Lock()
+
+    def definir_status(self, indice, texto, cor="#94A3B8"):
+        if self.on_status:
+            try: self.on_status(indice, texto, cor)
+            except: pass
+
+    def proximo_indice_livre(self):
+        with self.lock:
+            for i in range(MAX_SESSOES):
+                if i not in self.sessoes:
+                    return i
+        return None
+
+    def criar_sessao(self, indice):
+        """Cria (ou recria, em caso de reconexão) a sessão `indice` com um AutomationLogic novo."""
+        logger = self.logger if indice == 0 else SessionLogger(self.logger, {'sessao': indice})
+        automation = AutomationLogic(
+            logger, self.stop_event, self.cfg,
+            porta_debug=porta_debug_sessao(indice),
+            perfil_path=perfil_chrome_sessao(indice)
+        )
+        with self.lock:
+            sessao = self.sessoes.get(indice)
+            if sessao:
+                sessao.automation = automation
+            else:
+                sessao = Sessao(indice, automation)
+                self.sessoes[indice] = sessao
+                sessao.thread = threading.Thread(target=self._loop_sessao, args=(sessao,), daemon=True)
+                sessao.thread.start()
+        self.definir_status(indice, "Iniciando...", "white")
+        return sessao
+
+    def sessao(self, indice):
+        return self.sessoes.get(indice)
+
+    def enfileirar(self, job):
+        if job.sessao_id is not None:
+            sessao = self.sessoes.get(job.sessao_id)
+            if not sessao:
+                raise ValueError(f"Sessão {job.sessao_id} não existe.")
+            sessao.fila.put(job)
+            if sessao.ocupada:
+                self.definir_status(sessao.indice, f"Ocupada ({sessao.fila.qsize()} na fila)", "#FACC15")
+        else:
+            if not self.sessoes_com_navegador():
+                self.falhar_job(job, "Nenhuma sessão com navegador conectado.")
+                return
+            self.fila_geral.put(job)
+
+    def sessoes_com_navegador(self):
+        return [s for s in list(self.sessoes.values()) if s.automation and s.automation.driver]
+
+    def falhar_job(self, job, motivo):
+        self.logger.error(f"Job '{job.descricao}' descartado: {motivo}")
+        if job.ao_falhar:
+            try: job.ao_falhar(motivo)
+            except Exception as e: self.logger.error(f"Erro ao notificar falha do job '{job.descricao}': {e}")
+
+    def limpar_filas(self):
+        """Descarta jobs pendentes (usado pelo PARAR TUDO)."""
+        filas = [self.fila_geral] + [s.fila for s in list(self.sessoes.values())]
+        for f in filas:
+            try:
+                while True: f.get_nowait()
+            except queue.Empty:
+                pass
+
+    def _proximo_job(self, sessao):
+        """
+        Jobs fixados primeiro. A fila geral só é consumida por sessão com navegador;
+        sem navegador a sessão espera apenas pela própria fila (nada de repassar jobs).
+        """
+        try:
+            return sessao.fila.get_nowait()
+        except queue.Empty:
+            pass
+        automation = sessao.automation
+        if automation and automation.driver:
+            fila = self.fila_geral
+        else:
+            fila = sessao.fila
+            self._descartar_orfaos()
+        try:
+            return fila.get(timeout=self.ESPERA_FILA)
+        except queue.Empty:
+            return None
+
+    def _descartar_orfaos(self):
+        """Sem nenhuma sessão com navegador, os jobs livres pendentes falham em vez de esperar para sempre."""
+        if self.fila_geral.empty() or self.sessoes_com_navegador():
+            return
+        while True:
+            try:
+                job = self.fila_geral.get_nowait()
+            except queue.Empty:
+                return
+            self.falhar_job(job, "Nenhuma sessão com navegador conectado.")
+
+    def _loop_sessao(self, sessao):
+        definir_contexto(sessao=sessao.indice) # Todos os eventos desta thread levam a sessão
+        while True:
+            job = self._proximo_job(sessao)
+            if job is None:
+                continue
+
+            automation = sessao.automation
+            if not automation or not automation.driver:
+                # O navegador caiu depois de pegar um job livre: volta para uma sessão com navegador
+                if job.sessao_id is None and self.sessoes_com_navegador():
+                    self.fila_geral.put(job)
+                else:
+                    self.falhar_job(job, f"Navegador da sessão {sessao.indice} não conectado.")
+                continue
+
+            sessao.ocupada = True
+            self.definir_status(sessao.indice, f"Executando {job.descricao}", "#FACC15")
+            try:
+                job.executar(automation)
+            except Exception as e:
+                self.logger.error(f"[S{sessao.indice}] Erro no job '{job.descricao}': {e}")
+            finally:
+                sessao.ocupada = False
+                self.definir_status(sessao.indice, "Livre", "#10B981")
+
+    def encerrar_navegadores(self):
+        for sessao in list(self.sessoes.values()):
+            automation = sessao.automation
+            if automation and automation.driver:
+                try:
+                    automation.driver.execute_script("window.stop();")
+                except: pass
+                try:
+                    automation.driver.quit()
+                    automation.driver = None
+                except: pass
+            self.definir_status(sessao.indice, "Parada", "#EF4444")
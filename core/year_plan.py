@@ -0,0 +1,138 @@
+import random
+import hashlib
+
+from core.production_solver import formatar_producao
+
+def fluxo_aleatorio(pescador_id, ano, mes):
+    """
+    Gerador reprodutível por (pescador, ano, mês): a mesma tripla gera sempre os
+    mesmos valores. Sem pescador identificado, devolve um gerador não semeado.
+    """
+    if not pescador_id:
+        return random.Random()
+    semente = hashlib.sha256(f"{pescador_id}|{ano}|{mes}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(semente[:8], "big"))
+
+class YearPlan:
+    """
+    Plano completo de um ano: meses de defeso e, para cada mês de produção,
+    as linhas da tabela de espécies e os dias trabalhados. Gerado antes de
+    abrir o formulário; a automação apenas reproduz o plano.
+    """
+    def __init__(self, ano, defeso=None, producao=None, valido=True):
+        self.ano = str(ano)
+        self.defeso = list(defeso or [])
+        self.producao = dict(producao or {}) # mes -> {"dados": [(nome, und, peso, preco)], "dias": "20"}
+        self.valido = valido
+
+    def mes(self, mes):
+        """Retorna (dados, dias) planejados para o mês de produção, ou (None, None)."""
+        item = self.producao.get(mes)
+        if not item:
+            return None, None
+        return [tuple(linha) for linha in item["dados"]], item["dias"]
+
+    def total_mes(self, mes):
+        dados, _ = self.mes(mes)
+        return sum(float(peso) * float(preco.replace(',', '.')) for _, _, peso, preco in dados or [])
+
+    def total_anual(self):
+        return sum(self.total_mes(m) for m in self.producao)
+
+    def especies(self):
+        return {linha[0] for item in self.producao.values() for linha in item["dados"]}
+
+    def resumo(self):
+        return f"{len(self.producao)} meses de produção, {len(self.defeso)} de defeso | Total anual R$ {self.total_anual():.2f} | {len(self.especies())} espécies"
+
+    def restrito(self, defeso, producao):
+        """Cópia só com os meses informados (plano do checkpoint com uma seleção de meses menor)."""
+        return YearPlan(
+            self.ano,
+            [m for m in defeso],
+            {m: self.producao[m] for m in producao if m in self.producao},
+            self.valido,
+        )
+
+    # --- SERIALIZAÇÃO (checkpoint) ---
+    def to_dict(self):
+        return {
+            "ano": self.ano,
+            "defeso": self.defeso,
+            "producao": {m: {"dados": [list(l) for l in item["dados"]], "dias": item["dias"]} for m, item in self.producao.items()},
+            "valido": self.valido,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("ano", ""), data.get("defeso"), data.get("producao"), data.get("valido", True))
+
+class YearPlanner:
+    """
+    Gera o YearPlan em lote a partir do ProductionSolver.
+
+    Restrições anuais opcionais (0 = desligada): faixa do total anual e número
+    mínimo de espécies distintas no ano. Quando o sorteio inicial viola alguma,
+    meses são resorteados um a um mantendo só as trocas que reduzem a violação.
+    """
+    MAX_TROCAS = 400
+
+    def __init__(self, solver, dias_min, dias_max, meta_anual_min=0, meta_anual_max=0, min_especies_ano=0):
+        self.solver = solver
+        self.dias_min = int(dias_min)
+        self.dias_max = int(dias_max)
+        self.meta_anual_min = float(meta_anual_min or 0)
+        self.meta_anual_max = float(meta_anual_max or 0)
+        self.min_especies_ano = int(min_especies_ano or 0)
+
+    def _violacao(self, meses):
+        total = sum(sum(i["peso"] * i["preco"] for i in prod) for prod, _ in meses.values())
+        v = 0.0
+        if self.meta_anual_min and total < self.meta_anual_min:
+            v += self.meta_anual_min - total
+        if self.meta_anual_max and total > self.meta_anual_max:
+            v += total - self.meta_anual_max
+        if self.min_especies_ano:
+            distintas = len({i["nome"] for prod, _ in meses.values() for i in prod})
+            v += max(0, self.min_especies_ano - distintas) * 1000.0 # Cada espécie faltante pesa como R$ 1000
+        return v
+
+    def gerar(self, ano, meses_defeso, meses_producao, rng=None, pescador_id=None):
+        """
+        Com `pescador_id`, cada mês usa o próprio fluxo semeado (fluxo_aleatorio) e
+        o plano é determinístico: regerar após uma falha produz os mesmos valores.
+        """
+        if pescador_id:
+            fluxos = {mes: fluxo_aleatorio(pescador_id, ano, mes) for mes in meses_producao}
+            rng = fluxo_aleatorio(pescador_id, ano, "ajuste")
+        else:
+            rng = rng or random
+            fluxos = {mes: rng for mes in meses_producao}
+
+        meses = {}
+        for mes in meses_producao:
+            meses[mes] = self.solver.amostrar(mes.lower() == "novembro", fluxos[mes])
+
+        violacao = self._violacao(meses)
+        candidatos = [m for m in meses_producao if m.lower() != "novembro"] or list(meses_producao)
+        trocas = 0
+        while violacao > 0 and candidatos and trocas < self.MAX_TROCAS:
+            trocas += 1
+            mes = rng.choice(candidatos)
+            anterior = meses[mes]
+            meses[mes] = self.solver.amostrar(mes.lower() == "novembro", fluxos[mes])
+            nova = self._violacao(meses)
+            if nova <= violacao:
+                violacao = nova
+            else:
+                meses[mes] = anterior
+
+        producao = {}
+        for mes in meses_producao:
+            prod, _ = meses[mes]
+            producao[mes] = {
+                "dados": formatar_producao(prod),
+                "dias": str(fluxos[mes].randint(self.dias_min, self.dias_max)),
+            }
+        valido = violacao == 0 and all(ok for _, ok in meses.values())
+        return YearPlan(ano, meses_defeso, producao, valido)
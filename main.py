@@ -8,6 +8,7 @@ from ui.main_window import MainWindow
 from core.constants import VERSION, IMG_DIR, resource_path
 from services.license_manager import LicenseManager
 from services.updater import AutoUpdater
+from core.prewarm import iniciar_preaquecimento
 
 # Ajuste para o ícone aparecer corretamente na barra de tarefas do Windows
 try:
@@ -118,12 +119,16 @@ def main():
     app.processEvents()
     # --------------------------------------------
 
+    # Chrome e chromedriver sobem em segundo plano enquanto a licença é validada
+    prewarmer = iniciar_preaquecimento()
+
     # 2. Verificação de Acesso e Atualizações
     # Bloqueia a abertura se não houver licença válida
     # Passamos o splash para que ele possa atualizar o status
     success, license_data = check_license_and_updates(splash)
 
     if not success:
+        prewarmer.encerrar(fechar_chrome=True)
         sys.exit()
 
     # 3. Configurações Visuais
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from core.constants import COMBINACOES_CACHE_DIR, COMBINACOES_CACHE_MAX
+
+# Incrementar quando a regra de viabilidade ou a seleção de candidatos do solver mudar (invalida o cache antigo)
+VERSAO_CACHE = 2
+
+_EM_CALCULO = set() # Chaves com enumeração em andamento (uma thread por configuração)
+_EM_CALCULO_LOCK = threading.Lock()
+
+def impressao_digital(catalogo, meta_min, meta_max, variacao_pct):
+    """Hash do catálogo + metas + variação. Qualquer mudança na configuração gera outra chave."""
+    base = {
+        "versao": VERSAO_CACHE,
+        "catalogo": [[e["nome"], round(float(e["preco"]), 2), int(e["kg_base"])] for e in catalogo],
+        "meta_min": round(float(meta_min), 2),
+        "meta_max": round(float(meta_max), 2),
+        "variacao": round(float(variacao_pct), 4),
+    }
+    texto = json.dumps(base, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+class CombinationCache:
+    """
+    Cache em disco dos subconjuntos de espécies que fecham a meta, um arquivo por
+    impressão digital da configuração. O uso renova o mtime do arquivo; acima de
+    COMBINACOES_CACHE_MAX entradas, as menos usadas recentemente são removidas.
+    """
+    def __init__(self, diretorio=COMBINACOES_CACHE_DIR, max_entradas=COMBINACOES_CACHE_MAX):
+        self.diretorio = diretorio
+        self.max_entradas = max_entradas
+        if not os.path.exists(self.diretorio):
+            try: os.makedirs(self.diretorio)
+            except: pass
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, f"{chave}.json")
+
+    def obter(self, chave):
+        """Retorna {(qtd, novembro): [indices, ...]} ou None se não houver entrada."""
+        path = self._caminho(chave)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                loaded = json.load(f)
+            os.utime(path, None) # Marca como usado recentemente
+            return {(g["qtd"], g["novembro"]): g["chaves"] for g in loaded["grupos"]}
+        except Exception as e:
+            print(f"Cache de combinações ilegível, recalculando: {e}")
+            return None
+
+    def gravar(self, chave, viaveis):
+        dados = {
+            "chave": chave,
+            "criado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "grupos": [
+                {"qtd": qtd, "novembro": novembro, "chaves": [list(c[0]) for c in chaves]}
+                for (qtd, novembro), chaves in viaveis.items()
+            ],
+        }
+        path = self._caminho(chave)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dados, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Erro ao salvar cache de combinações: {e}")
+        self.podar()
+
+    def podar(self):
+        """Remove as entradas menos usadas além do limite."""
+        try:
+            arquivos = [os.path.join(self.diretorio, n) for n in os.listdir(self.diretorio) if n.endswith(".json")]
+            arquivos.sort(key=os.path.getmtime, reverse=True)
+            for path in arquivos[self.max_entradas:]:
+                try: os.remove(path)
+                except: pass
+        except: pass
+
+    def aplicar(self, solver, chave):
+        """
+        Carrega no solver os subconjuntos viáveis do cache. Sem entrada, o solver segue
+        sorteando sob demanda e a entrada é calculada em segundo plano para as próximas vezes.
+        """
+        viaveis = self.obter(chave)
+        if viaveis is not None:
+            solver.carregar_viaveis(viaveis)
+            return True
+        self.calcular_em_segundo_plano(chave, solver.copia_vazia())
+        return False
+
+    def calcular_em_segundo_plano(self, chave, solver):
+        """Enumera e grava a entrada numa thread daemon. Retorna a thread, ou None se já há uma em andamento."""
+        with _EM_CALCULO_LOCK:
+            if chave in _EM_CALCULO:
+                return None
+            _EM_CALCULO.add(chave)
+
+        def calcular():
+            try:
+                self.gravar(chave, solver.subconjuntos_viaveis())
+            except Exception as e:
+                print(f"Erro ao calcular cache de combinações: {e}")
+            finally:
+                with _EM_CALCULO_LOCK:
+                    _EM_CALCULO.discard(chave)
+
+        thread = threading.Thread(target=calcular, daemon=True)
+        thread.start()
+        return thread
@@ -1,7 +1,51 @@
 import os
-import json
+import atexit
+import unicodedata
+from types import MappingProxyType
+from services.profile_store import ProfileStore
+from services.config_persistence import ConfigPersistence
 from core.constants import BASE_DIR, CONFIG_FILE, MESES_DEFESO_PADRAO, MESES_PRODUCAO_PADRAO, TODOS_MESES_ORDENADOS
 
+def normalizar_texto(text):
+    """NFKD, remove "R$" e nbsp, trim, lower (mesmas regras do JS_NORMALIZAR)."""
+    if not text: return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = text.replace("R$", "").replace("\u00a0", "").strip()
+    return text.lower()
+
+class ConfigSnapshot:
+    """
+    Fotografia imutável e já validada da configuração, tirada uma vez por execução.
+    Números já convertidos, listas como tuplas e textos comparados no formulário já
+    normalizados: o robô não reprocessa a configuração a cada mês e não enxerga
+    alterações feitas pela interface no meio de um ano.
+    """
+    __slots__ = (
+        "uf_residencia", "municipio", "categoria", "forma_atuacao",
+        "relacao_trabalho", "estado_comercializacao", "estado_comercializacao_norm",
+        "grupos_alvo", "grupos_alvo_norm", "compradores", "compradores_norm",
+        "local_pesca_tipo", "uf_pesca", "nome_local_pesca", "metodos_pesca", "metodos_pesca_norm",
+        "dias_min", "dias_max", "meta_financeira_min", "meta_financeira_max", "variacao_peso_pct",
+        "meta_anual_min", "meta_anual_max", "min_especies_ano",
+        "meses_defeso", "meses_producao", "meses_selecionados",
+        "catalogo_especies", "especies_norm", "chave_solver",
+        "modo_leve", "urls_bloqueadas", "orcamento_comandos",
+    )
+
+    def __init__(self, **valores):
+        for nome in self.__slots__:
+            object.__setattr__(self, nome, valores[nome])
+
+    def __setattr__(self, nome, valor):
+        raise AttributeError("ConfigSnapshot é somente leitura")
+
+    def __delattr__(self, nome):
+        raise AttributeError("ConfigSnapshot é somente leitura")
+
+    def catalogo_dicts(self):
+        """Catálogo no formato de dicts esperado pelo ProductionSolver."""
+        return [{"nome": n, "preco": p, "kg_base": k} for n, p, k in self.catalogo_especies]
+
 class ConfigManager:
     # Configuração Padrão
     DEFAULT_CONFIG = {
@@ -31,6 +75,23 @@ class ConfigManager:
         "meta_financeira_max": 1100.00,
         "variacao_peso_pct": 0.15,
 
+        # Plano anual (0 = sem restrição)
+        "meta_anual_min": 0,
+        "meta_anual_max": 0,
+        "min_especies_ano": 0,
+
+        # Desempenho (Modo Leve): bloqueia recursos dispensáveis na aba do PesqBrasil via CDP
+        "modo_leve": False,
+        "urls_bloqueadas": [
+            "*.woff", "*.woff2", "*.ttf", "*.otf",
+            "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+            "*google-analytics.com*", "*googletagmanager.com*", "*hotjar.com*", "*clarity.ms*"
+        ],
+
+        # Orçamento de comandos do WebDriver por execução (vazio = sem limite).
+        # Chaves: "etapa_1".."etapa_4" e "formulario"; estouros viram aviso no relatório do ano
+        "orcamento_comandos": {},
+
         # Meses Configurados (Controle de Checkboxes da UI)
         "meses_selecionados": TODOS_MESES_ORDENADOS.copy(),
         
@@ -53,38 +114,131 @@ class ConfigManager:
     }
 
     def __init__(self):
+        self.persistencia = ConfigPersistence(CONFIG_FILE)
+        atexit.register(self.persistencia.flush) # Não perde um salvamento ainda no debounce
         self.data = self.load()
+        self.perfil_ativo = None # {"id", "nome", "cpf"} do perfil carregado do banco, se houver
+        try:
+            self.perfis = ProfileStore()
+        except Exception as e:
+            print(f"Banco de perfis indisponível: {e}")
+            self.perfis = None
 
     def load(self):
         if not os.path.exists(BASE_DIR):
             try: os.makedirs(BASE_DIR)
             except: pass
 
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    config = self.DEFAULT_CONFIG.copy()
-                    config.update(loaded)
-
-                    # Correção legada específica
-                    if "catalogo_especies" in config:
-                        for esp in config["catalogo_especies"]:
-                            if esp["nome"] == "Surubim":
-                                esp["nome"] = "Surubim ou Cachara"
-
-                    return config
-            except:
-                return self.DEFAULT_CONFIG.copy()
-        return self.DEFAULT_CONFIG.copy()
+        # Lê o JSON principal ou, se corrompido, o backup válido mais recente
+        loaded = self.persistencia.ler()
+        if loaded is None:
+            return self.DEFAULT_CONFIG.copy()
+        return self._aplicar_sobre_padrao(loaded)
+
+    def _aplicar_sobre_padrao(self, loaded):
+        try:
+            config = self.DEFAULT_CONFIG.copy()
+            config.update(loaded)
+
+            # Correção legada específica
+            if "catalogo_especies" in config:
+                for esp in config["catalogo_especies"]:
+                    if esp["nome"] == "Surubim":
+                        esp["nome"] = "Surubim ou Cachara"
+
+            return config
+        except:
+            return self.DEFAULT_CONFIG.copy()
 
     def save(self):
+        # Com um perfil ativo, as alterações vão para o perfil no banco (o JSON fica como padrão da máquina)
+        if self.perfil_ativo and self.perfis:
+            try:
+                self.perfis.atualizar_config(self.perfil_ativo["id"], self.data)
+                return
+            except Exception as e:
+                print(f"Erro ao salvar perfil: {e}")
+        # Escrita atômica e com debounce, fora da thread chamadora
         try:
-            with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=4, ensure_ascii=False)
+            self.persistencia.agendar(self.data)
         except Exception as e:
             print(f"Erro ao salvar config: {e}")
 
+    def flush(self):
+        self.persistencia.flush()
+
+    # --- ROLLBACK ---
+    def listar_backups(self):
+        return self.persistencia.listar_backups()
+
+    def restaurar_backup(self, path):
+        """Volta a configuração da máquina para uma versão anterior do JSON."""
+        loaded = self.persistencia.ler_arquivo(path)
+        if loaded is None:
+            return False
+        self.perfil_ativo = None # Backups são do JSON da máquina, não dos perfis
+        self.data = self._aplicar_sobre_padrao(loaded)
+        self.save()
+        return True
+
+    # --- PERFIS ---
+    def _mesclar(self, config):
+        dados = self.DEFAULT_CONFIG.copy()
+        dados.update(config or {})
+        return dados
+
+    def ativar_perfil(self, perfil_id):
+        """Troca a configuração em memória pela do perfil (sem reler/regravar o JSON)."""
+        perfil = self.perfis.obter(perfil_id) if self.perfis else None
+        if not perfil:
+            return False
+        self.data = self._mesclar(perfil["config"])
+        self.perfil_ativo = {"id": perfil["id"], "nome": perfil["nome"], "cpf": perfil["cpf"]}
+        return True
+
+    def desativar_perfil(self):
+        """Volta para a configuração padrão da máquina (JSON)."""
+        self.perfil_ativo = None
+        self.data = self.load()
+
+    def salvar_como_perfil(self, nome, cpf=None):
+        if not self.perfis:
+            return None
+        perfil_id = self.perfis.salvar_perfil(nome, self.data, cpf)
+        self.perfil_ativo = {"id": perfil_id, "nome": nome.strip(), "cpf": ProfileStore.somente_digitos(cpf)}
+        return perfil_id
+
+    def perfil_do_pescador(self, cpf):
+        """Perfil cadastrado para o CPF logado no navegador, ou None."""
+        if not self.perfis or not cpf:
+            return None
+        try:
+            return self.perfis.obter_por_cpf(cpf)
+        except Exception as e:
+            print(f"Erro ao consultar perfil: {e}")
+            return None
+
+    def snapshot_para_pescador(self, cpf):
+        """
+        Snapshot do perfil cadastrado para o CPF (o lote usa o perfil de cada pescador
+        direto do banco); sem perfil, snapshot da configuração atual.
+        Retorna (snapshot, perfil_ou_None).
+        """
+        perfil = self.perfil_do_pescador(cpf)
+        if perfil:
+            return self.snapshot(self._mesclar(perfil["config"])), perfil
+        return self.snapshot(), None
+
+    def registrar_execucao(self, cpf, ano, status, mensagem="", duracao=0.0, perfil_id=None):
+        if not self.perfis:
+            return
+        try:
+            if perfil_id is None and self.perfil_ativo:
+                perfil_id = self.perfil_ativo["id"]
+            self.perfis.registrar_execucao(perfil_id, cpf, ano, status, mensagem, duracao)
+        except Exception as e:
+            print(f"Erro ao registrar execução: {e}")
+
     def reset_to_defaults(self):
         self.data = self.DEFAULT_CONFIG.copy()
         self.save()
@@ -95,10 +249,133 @@ class ConfigManager:
             return self.data.get("municipio_manual", "")
         return sel
 
+    def _valor(self, dados, key, conversor):
+        """Valor convertido; se inválido, o padrão (também convertido)."""
+        try:
+            return conversor(dados.get(key, self.DEFAULT_CONFIG.get(key)))
+        except (TypeError, ValueError):
+            print(f"Config '{key}' inválida ({dados.get(key)!r}), usando padrão.")
+            return conversor(self.DEFAULT_CONFIG.get(key))
+
+    def snapshot(self, dados=None):
+        """ConfigSnapshot validado da configuração atual (ou do dict `dados`, ex.: um perfil)."""
+        dados = self.data if dados is None else dados
+        def lista(key):
+            valor = dados.get(key, self.DEFAULT_CONFIG.get(key)) or []
+            return tuple(str(v) for v in valor) if isinstance(valor, (list, tuple)) else (str(valor),)
+
+        dias_min, dias_max = self._valor(dados, "dias_min", int), self._valor(dados, "dias_max", int)
+        if dias_min > dias_max:
+            dias_min, dias_max = dias_max, dias_min
+
+        catalogo = []
+        for esp in dados.get("catalogo_especies") or []:
+            try:
+                catalogo.append((str(esp["nome"]), float(esp["preco"]), int(esp["kg_base"])))
+            except (KeyError, TypeError, ValueError):
+                print(f"Espécie inválida ignorada: {esp!r}")
+        catalogo = tuple(catalogo)
+
+        meta_min = self._valor(dados, "meta_financeira_min", float)
+        meta_max = self._valor(dados, "meta_financeira_max", float)
+        variacao = self._valor(dados, "variacao_peso_pct", float)
+        grupos, compradores, metodos = lista("grupos_alvo"), lista("compradores"), lista("metodos_pesca")
+        estado_com = str(dados.get("estado_comercializacao", ""))
+
+        return ConfigSnapshot(
+            uf_residencia=str(dados.get("uf_residencia", "")),
+            municipio=str((dados.get("municipio_manual", "") if dados.get("municipio_padrao") == "Outros" else dados.get("municipio_padrao")) or ""),
+            categoria=str(dados.get("categoria", "")),
+            forma_atuacao=str(dados.get("forma_atuacao", "")),
+            relacao_trabalho=str(dados.get("relacao_trabalho", "")),
+            estado_comercializacao=estado_com,
+            estado_comercializacao_norm=normalizar_texto(estado_com),
+            grupos_alvo=grupos,
+            grupos_alvo_norm=tuple(normalizar_texto(x) for x in grupos),
+            compradores=compradores,
+            compradores_norm=tuple(normalizar_texto(x) for x in compradores),
+            local_pesca_tipo=str(dados.get("local_pesca_tipo", "")),
+            uf_pesca=str(dados.get("uf_pesca", "")),
+            nome_local_pesca=str(dados.get("nome_local_pesca", "")),
+            metodos_pesca=metodos,
+            metodos_pesca_norm=frozenset(normalizar_texto(x) for x in metodos),
+            dias_min=dias_min,
+            dias_max=dias_max,
+            meta_financeira_min=meta_min,
+            meta_financeira_max=meta_max,
+            variacao_peso_pct=variacao,
+            meta_anual_min=self._valor(dados, "meta_anual_min", float),
+            meta_anual_max=self._valor(dados, "meta_anual_max", float),
+            min_especies_ano=self._valor(dados, "min_especies_ano", int),
+            meses_defeso=lista("meses_defeso"),
+            meses_producao=lista("meses_producao"),
+            meses_selecionados=lista("meses_selecionados"),
+            catalogo_especies=catalogo,
+            especies_norm=MappingProxyType({nome: normalizar_texto(nome) for nome, _, _ in catalogo}),
+            chave_solver=(catalogo, meta_min, meta_max, variacao),
+            modo_leve=bool(dados.get("modo_leve", False)),
+            urls_bloqueadas=tuple(u for u in lista("urls_bloqueadas") if u),
+            orcamento_comandos=MappingProxyType(self._orcamento(dados.get("orcamento_comandos"))),
+        )
+
+    @staticmethod
+    def _orcamento(valor):
+        orcamento = {}
+        for chave, limite in (valor if isinstance(valor, dict) else {}).items():
+            try: orcamento[str(chave)] = int(limite)
+            except (TypeError, ValueError): print(f"Orçamento de comandos inválido ignorado: {chave}={limite!r}")
+        return orcamento
+
+    def analisar_viabilidade(self, conf=None):
+        """
+        Relatório de viabilidade do catálogo/metas (ver core.production_solver): do snapshot
+        `conf` quando informado (ex.: perfil do pescador), senão da configuração atual.
+        Pode levar segundos em catálogos grandes sem cache: chamar fora da thread da UI.
+        """
+        from core.production_solver import analisar_viabilidade
+        from services.combination_cache import CombinationCache, impressao_digital
+        try:
+            if conf is not None:
+                catalogo = conf.catalogo_dicts()
+                metas = (conf.meta_financeira_min, conf.meta_financeira_max, conf.variacao_peso_pct)
+            else:
+                catalogo = self.data.get("catalogo_especies", [])
+                metas = (
+                    self.data.get("meta_financeira_min", 0),
+                    self.data.get("meta_financeira_max", 0),
+                    self.data.get("variacao_peso_pct", 0.15),
+                )
+            try:
+                viaveis = CombinationCache().obter(impressao_digital(catalogo, *metas))
+            except Exception:
+                viaveis = None
+            return analisar_viabilidade(catalogo, *metas, viaveis=viaveis)
+        except Exception as e:
+            return {"mes_comum_viavel": False, "novembro_viavel": False, "problemas": [f"Configuração inválida: {e}"]}
+
+    def problemas_do_plano(self, meses_selecionados, conf=None):
+        """
+        Problemas que impedem preencher os meses de produção selecionados com o
+        snapshot `conf` (o que o ano vai de fato executar; padrão: configuração atual).
+        Lista vazia = plano viável.
+        """
+        meses_producao = conf.meses_producao if conf is not None else self.data.get("meses_producao", [])
+        producao = [m for m in meses_producao if m in meses_selecionados]
+        if not producao:
+            return []
+
+        analise = self.analisar_viabilidade(conf)
+        precisa_comum = any(m.lower() != "novembro" for m in producao)
+        precisa_novembro = any(m.lower() == "novembro" for m in producao)
+        if (precisa_comum and not analise["mes_comum_viavel"]) or (precisa_novembro and not analise["novembro_viavel"]):
+            return analise["problemas"]
+        return []
+
     def apply_cloud_overrides(self, license_data):
         """
         Aplica configurações vindas da nuvem (JSON da Licença).
         Isso permite personalizar UF, Espécies, Municípios e Regras de Negócio por cliente.
+        Retorna True se alguma configuração mudou.
         """
         if not license_data:
             return
@@ -142,7 +419,10 @@ class ConfigManager:
             "catalogo_especies", 
             "meta_financeira_min", 
             "meta_financeira_max", 
-            "variacao_peso_pct"
+            "variacao_peso_pct",
+            "meta_anual_min",
+            "meta_anual_max",
+            "min_especies_ano"
         ]
 
         for key in keys_to_override:
@@ -157,4 +437,6 @@ class ConfigManager:
         # Salva se houve mudança para persistir nas próximas aberturas
         if changed:
             self.save()
-            print("Configurações atualizadas via nuvem com sucesso.")
\ No newline at end of file
+            print("Configurações atualizadas via nuvem com sucesso.")
+        # Quem chama valida o novo perfil fora da UI (AppController.check_viability("nuvem"))
+        return changed
\ No newline at end of file
@@ -0,0 +1,125 @@
+import os
+import json
+import shutil
+import threading
+from datetime import datetime
+from core.constants import CONFIG_FILE, CONFIG_BACKUP_DIR, CONFIG_BACKUP_MAX
+
+class ConfigPersistence:
+    """
+    Gravação do JSON de configuração fora da thread da interface.
+
+    - Debounce: salvamentos em sequência rápida viram uma única escrita.
+    - Atômica: grava em arquivo temporário, fsync e os.replace (nunca deixa o JSON pela metade).
+    - Backups: antes de substituir, a versão anterior (se válida) vai para CONFIG_BACKUP_DIR;
+      as CONFIG_BACKUP_MAX mais recentes são mantidas para rollback e para a leitura de emergência.
+    """
+    ATRASO_SEGUNDOS = 0.5
+
+    def __init__(self, path=CONFIG_FILE, backup_dir=CONFIG_BACKUP_DIR, max_backups=CONFIG_BACKUP_MAX):
+        self.path = path
+        self.backup_dir = backup_dir
+        self.max_backups = max_backups
+        self._lock = threading.Lock() # Protege _pendente/_timer
+        self._escrita = threading.Lock() # Serializa as escritas em disco
+        self._pendente = None
+        self._timer = None
+
+    # --- ESCRITA ---
+    def agendar(self, dados):
+        """Serializa já (cópia consistente) e agenda a escrita; chamadas seguidas reiniciam o prazo."""
+        texto = json.dumps(dados, indent=4, ensure_ascii=False)
+        with self._lock:
+            self._pendente = texto
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.ATRASO_SEGUNDOS, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Grava imediatamente o que estiver pendente (também chamado na saída do programa)."""
+        with self._lock:
+            texto, self._pendente = self._pendente, None
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+        if texto is not None:
+            self._gravar(texto)
+
+    def _gravar(self, texto):
+        with self._escrita:
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(texto)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._guardar_versao_atual(texto)
+                os.replace(tmp_path, self.path)
+            except Exception as e:
+                print(f"Erro ao salvar config: {e}")
+
+    def _guardar_versao_atual(self, novo_texto):
+        """Copia o JSON atual para os backups se for válido e diferente do que vai ser gravado."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                atual = f.read()
+            if atual == novo_texto:
+                return
+            json.loads(atual)
+        except Exception:
+            return # Versão atual corrompida não vira backup
+
+        if not os.path.exists(self.backup_dir):
+            try: os.makedirs(self.backup_dir)
+            except: pass
+        nome_base = os.path.splitext(os.path.basename(self.path))[0]
+        carimbo = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        try:
+            shutil.copy2(self.path, os.path.join(self.backup_dir, f"{nome_base}_{carimbo}.json"))
+        except Exception as e:
+            print(f"Erro ao criar backup da config: {e}")
+        self._podar()
+
+    def _podar(self):
+        for path in self.listar_backups()[self.max_backups:]:
+            try: os.remove(path)
+            except: pass
+
+    # --- LEITURA ---
+    def listar_backups(self):
+        """Caminhos dos backups, do mais recente para o mais antigo."""
+        if not os.path.exists(self.backup_dir):
+            return []
+        nome_base = os.path.splitext(os.path.basename(self.path))[0]
+        arquivos = [
+            os.path.join(self.backup_dir, n) for n in os.listdir(self.backup_dir)
+            if n.startswith(nome_base + "_") and n.endswith(".json")
+        ]
+        return sorted(arquivos, reverse=True) # O carimbo no nome ordena cronologicamente
+
+    @staticmethod
+    def ler_arquivo(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            return dados if isinstance(dados, dict) else None
+        except Exception:
+            return None
+
+    def ler(self):
+        """JSON principal; se ausente ou corrompido, o backup válido mais recente. None se nada servir."""
+        if os.path.exists(self.path):
+            dados = self.ler_arquivo(self.path)
+            if dados is not None:
+                return dados
+            print("Config principal corrompida. Procurando backup...")
+            for backup in self.listar_backups():
+                dados = self.ler_arquivo(backup)
+                if dados is not None:
+                    print(f"Config recuperada do backup: {os.path.basename(backup)}")
+                    return dados
+        return None
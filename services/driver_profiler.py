@@ -0,0 +1,143 @@
+import os
+import sys
+import bisect
+import threading
+import contextlib
+import collections
+
+from services.event_log import contexto_atual
+
+# Faixas do histograma de latência (ms); a última faixa é "acima do maior limite"
+LIMITES_HISTOGRAMA_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_atual = threading.local()
+
+def profiler_atual():
+    return getattr(_atual, "profiler", None)
+
+# Quadros que não contam como local de chamada: o próprio Selenium e a instrumentação
+_IGNORAR = (
+    os.sep + "selenium" + os.sep,
+    os.path.basename(__file__),
+    "tracer.py",
+    "contextlib.py",
+)
+
+def local_chamada():
+    """Primeiro quadro fora do Selenium/instrumentação: 'metodo (arquivo:linha)'."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if not any(trecho in arquivo for trecho in _IGNORAR):
+            return f"{frame.f_code.co_name} ({os.path.basename(arquivo)}:{frame.f_lineno})"
+        frame = frame.f_back
+    return "?"
+
+class DriverProfiler:
+    """
+    Contador de comandos do WebDriver de uma execução (um formulário/ano): quantidade
+    e histograma de latência por tipo de comando, quantidade por local de chamada e
+    por etapa (lida do contexto dos eventos). Alimentado pelo wrapper de driver.execute
+    (services.tracer.instrumentar_driver) enquanto estiver ativo na thread.
+    """
+    def __init__(self, nome):
+        self.nome = nome
+        self.comandos = {} # comando -> {"qtd", "total", "max", "hist"}
+        self.locais = collections.Counter() # (local, comando) -> qtd
+        self.etapas = collections.Counter() # etapa -> qtd
+        self.total = 0
+        self.tempo_total = 0.0
+
+    @contextlib.contextmanager
+    def ativo(self):
+        anterior = profiler_atual()
+        _atual.profiler = self
+        try:
+            yield self
+        finally:
+            _atual.profiler = anterior
+
+    def registrar(self, comando, duracao):
+        c = self.comandos.get(comando)
+        if c is None:
+            c = self.comandos[comando] = {"qtd": 0, "total": 0.0, "max": 0.0, "hist": [0] * (len(LIMITES_HISTOGRAMA_MS) + 1)}
+        c["qtd"] += 1
+        c["total"] += duracao
+        c["max"] = max(c["max"], duracao)
+        c["hist"][bisect.bisect_left(LIMITES_HISTOGRAMA_MS, duracao * 1000)] += 1
+        self.locais[(local_chamada(), comando)] += 1
+        self.etapas[contexto_atual().get("etapa", 0)] += 1 # 0 = fora do formulário (abrir o ano, varredura)
+        self.total += 1
+        self.tempo_total += duracao
+
+    # --- RELATÓRIOS ---
+    @staticmethod
+    def percentil_hist(hist, p):
+        """Limite superior (ms) da faixa do histograma que contém o percentil p."""
+        alvo = sum(hist) * p / 100.0
+        acumulado = 0
+        for i, qtd in enumerate(hist):
+            acumulado += qtd
+            if qtd and acumulado >= alvo:
+                return LIMITES_HISTOGRAMA_MS[i] if i < len(LIMITES_HISTOGRAMA_MS) else float("inf")
+        return 0
+
+    @staticmethod
+    def rotulo_faixa(limite_ms):
+        if limite_ms == float("inf"):
+            return f">{LIMITES_HISTOGRAMA_MS[-1]}ms"
+        return f"<{limite_ms}ms"
+
+    def estouros(self, orcamentos):
+        """
+        Compara com os orçamentos {'etapa_1': N, ..., 'formulario': N}.
+        Retorna lista de (chave, limite, contagem) dos que passaram do limite.
+        """
+        saida = []
+        for chave, limite in (orcamentos or {}).items():
+            if chave == "formulario":
+                contagem = sum(q for etapa, q in self.etapas.items() if etapa)
+            elif chave.startswith("etapa_"):
+                try: contagem = self.etapas.get(int(chave[6:]), 0)
+                except ValueError: continue
+            else:
+                continue
+            if limite and contagem > limite:
+                saida.append((chave, limite, contagem))
+        return saida
+
+    def relatorio(self, limite_locais=10):
+        """Linhas de texto: comandos por etapa, por tipo (com p50/p95 do histograma) e locais que mais chamam."""
+        no_formulario = sum(q for etapa, q in self.etapas.items() if etapa)
+        linhas = [f"Comandos WebDriver: {self.total} ({self.tempo_total:.1f}s) | no formulário: {no_formulario}"]
+        linhas.append("  Por etapa: " + " | ".join(
+            f"{'fora' if not etapa else f'E{etapa}'}: {qtd}" for etapa, qtd in sorted(self.etapas.items())
+        ))
+        linhas.append(f"  {'COMANDO':<28}{'QTD':>6}{'TOTAL':>10}{'MÉDIA':>9}{'P50':>8}{'P95':>8}{'MÁX':>9}")
+        for comando, c in sorted(self.comandos.items(), key=lambda item: item[1]["total"], reverse=True):
+            p50, p95 = (self.rotulo_faixa(self.percentil_hist(c["hist"], p)) for p in (50, 95))
+            linhas.append(
+                f"  {comando[:27]:<28}{c['qtd']:>6}{c['total']:>9.2f}s{c['total'] / c['qtd'] * 1000:>7.0f}ms"
+                f"{p50:>8}{p95:>8}{c['max'] * 1000:>7.0f}ms"
+            )
+        linhas.append("  Locais com mais comandos:")
+        for (local, comando), qtd in self.locais.most_common(limite_locais):
+            linhas.append(f"    {qtd:>5}x {comando} <- {local}")
+        return linhas
+
+    def to_dict(self):
+        return {
+            "nome": self.nome,
+            "total": self.total,
+            "tempo_total": round(self.tempo_total, 4),
+            "por_etapa": {str(etapa): qtd for etapa, qtd in sorted(self.etapas.items())},
+            "limites_histograma_ms": list(LIMITES_HISTOGRAMA_MS),
+            "por_comando": {
+                comando: {"qtd": c["qtd"], "total": round(c["total"], 4), "max": round(c["max"], 4), "hist": c["hist"]}
+                for comando, c in self.comandos.items()
+            },
+            "por_local": [
+                {"local": local, "comando": comando, "qtd": qtd}
+                for (local, comando), qtd in self.locais.most_common()
+            ],
+        }
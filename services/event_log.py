@@ -0,0 +1,261 @@
+import os
+import json
+import uuid
+import logging
+import sqlite3
+import threading
+import contextlib
+from datetime import datetime
+
+# Campos de contexto usados pela automação (além de ts/nivel/tag/msg):
+# sessao, execucao, perfil, ano, etapa, mes, campo, duracao, resultado
+_contexto = threading.local()
+
+def contexto_atual():
+    return dict(getattr(_contexto, "campos", {}))
+
+def definir_contexto(**campos):
+    """Acrescenta campos ao contexto de eventos da thread atual (None remove o campo)."""
+    atual = contexto_atual()
+    for chave, valor in campos.items():
+        if valor is None:
+            atual.pop(chave, None)
+        else:
+            atual[chave] = valor
+    _contexto.campos = atual
+
+@contextlib.contextmanager
+def contexto_evento(**campos):
+    """Contexto temporário: ao sair, restaura o contexto anterior inteiro."""
+    anterior = contexto_atual()
+    definir_contexto(**campos)
+    try:
+        yield
+    finally:
+        _contexto.campos = anterior
+
+def novo_id_execucao():
+    return uuid.uuid4().hex[:12]
+
+class ContextoEventoFilter(logging.Filter):
+    """Roda na thread de origem: copia o contexto da thread para o registro antes da fila."""
+    def filter(self, record):
+        record.contexto = contexto_atual()
+        return True
+
+def tag_do_registro(record):
+    tag = getattr(record, 'tags', None)
+    if tag: return tag
+    if record.levelno >= logging.ERROR: return "ERROR"
+    if record.levelno == logging.WARNING: return "WARNING"
+    return "INFO"
+
+class EventIndex:
+    """
+    Índice SQLite dos eventos: uma linha por evento com os campos filtráveis e a
+    posição (arquivo, offset) da linha JSON completa. Filtrar por execução, ano ou
+    erro é uma consulta indexada, sem ler os arquivos .jsonl.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS eventos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            arquivo TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            ts TEXT,
+            nivel INTEGER,
+            tag TEXT,
+            sessao INTEGER,
+            execucao TEXT,
+            perfil TEXT,
+            ano TEXT,
+            etapa INTEGER,
+            mes TEXT,
+            erro INTEGER DEFAULT 0,
+            msg TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_eventos_execucao ON eventos(execucao, id);
+        CREATE INDEX IF NOT EXISTS idx_eventos_ano ON eventos(ano, id);
+        CREATE INDEX IF NOT EXISTS idx_eventos_erro ON eventos(erro, id);
+        CREATE INDEX IF NOT EXISTS idx_eventos_arquivo ON eventos(arquivo);
+    """
+    MSG_MAX = 300 # Só o início da mensagem vai para o índice (a linha completa fica no .jsonl)
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.path = os.path.join(diretorio, "indice.db")
+        if not os.path.exists(diretorio):
+            try: os.makedirs(diretorio)
+            except: pass
+        novo = not os.path.exists(self.path)
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(self.SCHEMA)
+        if novo:
+            self.reindexar()
+
+    def abrir_conexao(self):
+        con = sqlite3.connect(self.path, timeout=5)
+        con.row_factory = sqlite3.Row
+        return con
+
+    @contextlib.contextmanager
+    def _conectar(self):
+        """Conexão de uma operação: commit (rollback em erro) e fechamento ao sair do bloco."""
+        con = self.abrir_conexao()
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    def arquivos(self):
+        """Arquivos .jsonl de eventos, do mais antigo para o mais recente (um por mês)."""
+        try:
+            return sorted(n for n in os.listdir(self.diretorio) if n.startswith("eventos_") and n.endswith(".jsonl"))
+        except Exception:
+            return []
+
+    @classmethod
+    def linha_indice(cls, arquivo, offset, evento):
+        return (
+            arquivo, offset, evento.get("ts"), evento.get("nivel"), evento.get("tag"),
+            evento.get("sessao"), evento.get("execucao"), evento.get("perfil"),
+            evento.get("ano"), evento.get("etapa"), evento.get("mes"),
+            1 if evento.get("nivel", 0) >= logging.WARNING or evento.get("tag") in ("ERROR", "WARNING") else 0,
+            (evento.get("msg") or "")[:cls.MSG_MAX],
+        )
+
+    INSERT = """INSERT INTO eventos (arquivo, offset, ts, nivel, tag, sessao, execucao, perfil, ano, etapa, mes, erro, msg)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+    def reindexar(self):
+        """Reconstrói o índice a partir dos .jsonl (índice apagado ou corrompido)."""
+        with self._conectar() as con:
+            con.execute("DELETE FROM eventos")
+            for arquivo in self.arquivos():
+                linhas = []
+                try:
+                    with open(os.path.join(self.diretorio, arquivo), 'rb') as f:
+                        offset = 0
+                        for bruta in f:
+                            try:
+                                linhas.append(self.linha_indice(arquivo, offset, json.loads(bruta)))
+                            except Exception:
+                                pass # Linha truncada (queda no meio da escrita)
+                            offset += len(bruta)
+                except Exception as e:
+                    print(f"Erro ao reindexar {arquivo}: {e}")
+                con.executemany(self.INSERT, linhas)
+
+    def remover_arquivo(self, arquivo):
+        with self._conectar() as con:
+            con.execute("DELETE FROM eventos WHERE arquivo = ?", (arquivo,))
+        try: os.remove(os.path.join(self.diretorio, arquivo))
+        except: pass
+
+    # --- CONSULTAS (visualizador) ---
+    def execucoes(self, limite=200):
+        """Execuções mais recentes: execucao, ano, perfil, inicio, fim, eventos, erros."""
+        with self._conectar() as con:
+            rows = con.execute(
+                """SELECT execucao, MAX(ano) AS ano, MAX(perfil) AS perfil, MIN(ts) AS inicio, MAX(ts) AS fim,
+                          COUNT(*) AS eventos, SUM(erro) AS erros
+                   FROM eventos WHERE execucao IS NOT NULL
+                   GROUP BY execucao ORDER BY MAX(id) DESC LIMIT ?""",
+                (limite,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def buscar(self, execucao=None, ano=None, somente_erros=False, texto="", limite=2000):
+        """Eventos filtrados, do mais recente para o mais antigo."""
+        condicoes, params = [], []
+        if execucao:
+            condicoes.append("execucao = ?"); params.append(execucao)
+        if ano:
+            condicoes.append("ano = ?"); params.append(str(ano))
+        if somente_erros:
+            condicoes.append("erro = 1")
+        if texto:
+            condicoes.append("msg LIKE ?"); params.append(f"%{texto}%")
+        where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        with self._conectar() as con:
+            rows = con.execute(f"SELECT * FROM eventos {where} ORDER BY id DESC LIMIT ?", params + [limite]).fetchall()
+        return [dict(r) for r in rows]
+
+    def ler_evento(self, arquivo, offset):
+        """Linha JSON completa do evento (com traceback, duração etc.)."""
+        try:
+            with open(os.path.join(self.diretorio, arquivo), 'rb') as f:
+                f.seek(offset)
+                return json.loads(f.readline())
+        except Exception:
+            return None
+
+class JsonEventHandler(logging.Handler):
+    """
+    Grava cada registro como uma linha JSON (eventos_AAAA-MM.jsonl, um arquivo por mês)
+    e indexa a posição no EventIndex. Roda na thread do QueueListener, junto com o
+    arquivo de texto. Campos: ts, nivel, tag, msg + contexto da thread de origem
+    (ContextoEventoFilter) + extra={'evento': {...}} do chamador.
+    """
+    def __init__(self, diretorio, retencao_meses=12):
+        super().__init__()
+        self.diretorio = diretorio
+        self.retencao_meses = retencao_meses
+        self.indice = EventIndex(diretorio)
+        self._con = None
+        self._arquivo = None
+        self._stream = None
+        self._podar()
+
+    def _podar(self):
+        for arquivo in self.indice.arquivos()[:-self.retencao_meses]:
+            self.indice.remover_arquivo(arquivo)
+
+    def _abrir(self, arquivo):
+        if self._stream:
+            try: self._stream.close()
+            except: pass
+        self._arquivo = arquivo
+        self._stream = open(os.path.join(self.diretorio, arquivo), 'ab')
+
+    def evento(self, record):
+        evento = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelno,
+            "tag": tag_do_registro(record),
+            "msg": record.getMessage(),
+        }
+        evento.update(getattr(record, 'contexto', None) or {})
+        evento.update(getattr(record, 'evento', None) or {})
+        return {k: v for k, v in evento.items() if v is not None}
+
+    def emit(self, record):
+        try:
+            evento = self.evento(record)
+            arquivo = f"eventos_{evento['ts'][:7]}.jsonl"
+            if arquivo != self._arquivo:
+                self._abrir(arquivo)
+            linha = (json.dumps(evento, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            offset = self._stream.tell()
+            self._stream.write(linha)
+            self._stream.flush()
+            if self._con is None:
+                self._con = self.indice.abrir_conexao() # Conexão própria da thread do listener
+                self._con.execute("PRAGMA synchronous=NORMAL")
+            self._con.execute(EventIndex.INSERT, EventIndex.linha_indice(arquivo, offset, evento))
+            self._con.commit()
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        try:
+            if self._stream: self._stream.close()
+        except: pass
+        self._stream = None
+        # A conexão pertence à thread do listener; de outra thread o sqlite recusa o close e ela só é descartada
+        try:
+            if self._con: self._con.close()
+        except: pass
+        self._con = None
+        super().close()
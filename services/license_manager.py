@@ -1,8 +1,13 @@
 import os
 import json
+import time
+import hmac
+import hashlib
+import platform
 import requests
 import ctypes
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 from core.constants import BASE_DIR
 
 # URL Onde ficam as licenças e versões
@@ -12,8 +17,31 @@ LICENSE_URL = "https://gist.githubusercontent.com/dreagas/1f1410aac58eb9ec5338fd
 # Formato: YYYY-MM-DD HH:MM:SS
 HARD_LIMIT_DATE = "2026-02-11 12:00:00"
 
+# Cache local do licencas.json: dentro do TTL nem consulta a rede; depois disso faz
+# requisição condicional (ETag / If-Modified-Since).
+# Política: o cache só serve enquanto fresco. Sem internet e com o cache vencido,
+# a validação cai no fallback da data fixa (como sem cache). O TTL curto limita o
+# tempo em que uma licença suspensa no servidor ainda abre o programa.
+LICENSE_CACHE_FILE = os.path.join(BASE_DIR, "license_cache.json")
+LICENSE_CACHE_TTL = 10 * 60 # segundos
+
+# Assinatura do cache (HMAC por máquina): edição manual ou cópia de outra máquina invalida o arquivo
+_CACHE_SEGREDO = b"reap-licencas-cache-v1"
+
+_SESSAO = None
+
+def obter_sessao():
+    """requests.Session compartilhada (conexões keep-alive reaproveitadas entre validações)."""
+    global _SESSAO
+    if _SESSAO is None:
+        sessao = requests.Session()
+        sessao.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        sessao.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        _SESSAO = sessao
+    return _SESSAO
+
 class LicenseManager:
-    def __init__(self):
+    def __init__(self, url=LICENSE_URL, cache_file=LICENSE_CACHE_FILE, ttl=LICENSE_CACHE_TTL):
         # Arquivo local que o usuário pode criar para colocar sua chave
         # Conteúdo esperado: {"chave": "teste_reap2025"}
         if not os.path.exists(BASE_DIR):
@@ -23,6 +51,86 @@ class LicenseManager:
         self.local_license_file = os.path.join(BASE_DIR, "user_license.json")
         self.user_key = None
         self.license_data = None # Guarda dados retornados (versão, url, etc)
+        self.url = url
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+    # --- CACHE DO licencas.json ---
+    @staticmethod
+    def _assinatura(cache):
+        chave = hashlib.sha256(_CACHE_SEGREDO + platform.node().encode("utf-8") + BASE_DIR.encode("utf-8")).digest()
+        campos = {k: cache.get(k) for k in ("url", "etag", "last_modified", "buscado_em", "conteudo")}
+        texto = json.dumps(campos, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hmac.new(chave, texto, hashlib.sha256).hexdigest()
+
+    def _ler_cache(self):
+        """Cache válido ou None: assinatura incorreta ou buscado_em no futuro contam como cache ausente."""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get("url") != self.url or not isinstance(cache.get("conteudo"), dict):
+                return None
+            if not hmac.compare_digest(str(cache.get("assinatura", "")), self._assinatura(cache)):
+                print("[License] Cache de licenças com assinatura inválida. Ignorando.")
+                return None
+            if float(cache.get("buscado_em", 0)) > time.time():
+                print("[License] Cache de licenças com data no futuro. Ignorando.")
+                return None
+            return cache
+        except Exception:
+            pass
+        return None
+
+    def _salvar_cache(self, cache):
+        cache["assinatura"] = self._assinatura(cache)
+        tmp_path = self.cache_file + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            print(f"[License] Erro ao salvar cache: {e}")
+
+    def buscar_licencas(self, forcar=False):
+        """
+        Retorna (licencas_dict, origem) com origem em 'cache' ou 'rede'.
+        forcar=True ignora o TTL (mas ainda usa a requisição condicional).
+        Levanta a exceção de rede se o cache não estiver fresco (sem uso offline de cache vencido).
+        """
+        cache = self._ler_cache()
+        agora = time.time()
+        if cache and not forcar and agora - cache.get("buscado_em", 0) < self.ttl:
+            return cache["conteudo"], "cache"
+
+        headers = {}
+        if cache:
+            if cache.get("etag"): headers["If-None-Match"] = cache["etag"]
+            if cache.get("last_modified"): headers["If-Modified-Since"] = cache["last_modified"]
+        response = obter_sessao().get(self.url, headers=headers, timeout=5)
+        if response.status_code == 304 and cache:
+            cache["buscado_em"] = agora
+            self._salvar_cache(cache)
+            return cache["conteudo"], "rede"
+        response.raise_for_status()
+        conteudo = response.json()
+        self._salvar_cache({
+            "url": self.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "buscado_em": agora,
+            "conteudo": conteudo,
+        })
+        return conteudo, "rede"
+
+    def _ativa_no_cache(self, all_licenses, current_time):
+        """True se o cache já concede a licença (chave presente, ativa e dentro da validade)."""
+        try:
+            user_data = all_licenses.get(self.user_key)
+            if not user_data or user_data.get("status") != "ativo":
+                return False
+            return current_time <= datetime.strptime(user_data.get("validade"), "%Y-%m-%d %H:%M:%S")
+        except Exception:
+            return False
 
     def get_local_key(self):
         """Tenta ler a chave do usuário de um arquivo local JSON."""
@@ -45,10 +153,11 @@ class LicenseManager:
             print(f"Erro ao salvar licença: {e}")
             return False
 
-    def validate(self):
+    def validate(self, forcar=False):
         """
         Retorna uma tupla: (is_valid, message, remote_data_dict)
         remote_data_dict contém 'versao', 'url_download', etc. se validado online.
+        forcar=True revalida com o servidor mesmo dentro do TTL do cache.
         """
         current_time = datetime.now()
         self.user_key = self.get_local_key()
@@ -57,10 +166,12 @@ class LicenseManager:
         if self.user_key:
             print(f"[License] Chave encontrada: {self.user_key}. Verificando online...")
             try:
-                response = requests.get(LICENSE_URL, timeout=5)
-                if response.status_code == 200:
-                    all_licenses = response.json()
-                    
+                all_licenses, origem = self.buscar_licencas(forcar)
+                if origem == "cache" and not self._ativa_no_cache(all_licenses, current_time):
+                    # Recusa vinda do cache (chave recém-digitada, suspensa ou vencida): confirma com o servidor
+                    all_licenses, origem = self.buscar_licencas(forcar=True)
+                print(f"[License] Lista de licenças obtida ({origem}).")
+                if isinstance(all_licenses, dict):
                     if self.user_key in all_licenses:
                         user_data = all_licenses[self.user_key]
                         self.license_data = user_data
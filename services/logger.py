@@ -1,17 +1,137 @@
 import logging
+import logging.handlers
+import threading
+import collections
 import queue
+import atexit
+import gzip
+import shutil
 import os
 
+from services.event_log import ContextoEventoFilter, JsonEventHandler
+
+UI_LOG_MAX_PENDENTES = 2000 # Linhas aguardando a UI; acima disso as mais antigas são descartadas
+
+# Arquivo de log: gravado por uma thread própria (QueueListener), com rotação por tamanho
+FILE_LOG_MAX_BYTES = 5 * 1024 * 1024
+FILE_LOG_BACKUPS = 5 # Segmentos antigos mantidos (comprimidos em .gz)
+FILE_LOG_MAX_PENDENTES = 10000
+
+class UiLogBuffer:
+    """
+    Buffer limitado entre as threads da automação e a UI.
+    Guarda (msg, tag) já formatados; cheio, descarta as linhas mais antigas e conta
+    quantas perdeu. Avisa a UI (callback) só quando passa de vazio para não vazio,
+    então a UI não precisa de timer de polling.
+    """
+    def __init__(self, maximo=UI_LOG_MAX_PENDENTES):
+        self._itens = collections.deque(maxlen=maximo)
+        self._lock = threading.Lock()
+        self._descartadas = 0
+        self._avisado = False
+        self._notificar = None
+
+    def definir_notificacao(self, callback):
+        self._notificar = callback
+        with self._lock:
+            pendentes = bool(self._itens)
+        if pendentes:
+            callback() # Linhas registradas antes da UI existir (ex.: cabeçalho da sessão)
+
+    def adicionar(self, msg, tag):
+        with self._lock:
+            if len(self._itens) == self._itens.maxlen:
+                self._descartadas += 1
+            self._itens.append((msg, tag))
+            avisar = not self._avisado
+            self._avisado = True
+        if avisar and self._notificar:
+            self._notificar()
+
+    def drenar(self):
+        """Retorna (itens, descartadas) acumulados desde a última drenagem."""
+        with self._lock:
+            itens = list(self._itens)
+            self._itens.clear()
+            descartadas, self._descartadas = self._descartadas, 0
+            self._avisado = False
+        return itens, descartadas
+
 class QueueHandler(logging.Handler):
     def __init__(self, log_queue):
         super().__init__()
         self.log_queue = log_queue
 
     def emit(self, record):
-        self.log_queue.put(record)
+        # Formata aqui (thread de origem): a UI só concatena o HTML
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        tag = "INFO"
+        if hasattr(record, 'tags'): tag = record.tags
+        elif record.levelno == logging.WARNING: tag = "WARNING"
+        elif record.levelno >= logging.ERROR: tag = "ERROR"
+        self.log_queue.adicionar(msg, tag)
+
+class GzipRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler que comprime os segmentos antigos (log.txt.1.gz, log.txt.2.gz...)."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.namer = lambda nome: nome + ".gz"
+        self.rotator = self._comprimir
 
-def setup_logging(log_file, version=""):
-    log_queue = queue.Queue()
+    @staticmethod
+    def _comprimir(origem, destino):
+        with open(origem, 'rb') as f_in, gzip.open(destino, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(origem)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Entrega os registros ao QueueListener sem nunca bloquear a thread que loga.
+
+    Política de estouro da fila:
+      - DEBUG/INFO: o registro novo é descartado (e contado);
+      - WARNING ou acima: o registro mais antigo da fila sai para abrir espaço.
+    A quantidade descartada é registrada no arquivo assim que houver espaço.
+    """
+    def __init__(self, fila):
+        super().__init__(fila)
+        self.descartados = 0
+        self._lock_descartes = threading.Lock()
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno < logging.WARNING:
+                with self._lock_descartes:
+                    self.descartados += 1
+                return
+            try:
+                self.queue.get_nowait()
+                with self._lock_descartes:
+                    self.descartados += 1
+            except queue.Empty:
+                pass
+            try: self.queue.put_nowait(record)
+            except queue.Full: pass
+            return
+
+        if self.descartados:
+            with self._lock_descartes:
+                descartados, self.descartados = self.descartados, 0
+            aviso = logging.makeLogRecord({
+                "name": record.name, "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": f"{descartados} registros de log descartados (fila do arquivo cheia)",
+            })
+            try: self.queue.put_nowait(aviso)
+            except queue.Full: pass
+
+def setup_logging(log_file, version="", eventos_dir=None, eventos_retencao_meses=12):
+    log_queue = UiLogBuffer()
     logger = logging.getLogger("REAP_GUI")
     logger.setLevel(logging.INFO)
 
@@ -24,6 +144,10 @@ def setup_logging(log_file, version=""):
     # Better not to mess with global logger if possible, but here it is a specific logger.
     if logger.hasHandlers():
         logger.handlers.clear()
+    for filtro in list(logger.filters):
+        logger.removeFilter(filtro)
+    # Contexto da thread (execução, ano, etapa, mês...) anexado a cada registro para os eventos JSON
+    logger.addFilter(ContextoEventoFilter())
 
     queue_handler = QueueHandler(log_queue)
     queue_formatter = logging.Formatter('%(asctime)s %(message)s', datefmt='%H:%M')
@@ -37,10 +161,25 @@ def setup_logging(log_file, version=""):
             try: os.makedirs(log_dir)
             except: pass
 
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+        file_handler = GzipRotatingFileHandler(
+            log_file, mode='a', maxBytes=FILE_LOG_MAX_BYTES, backupCount=FILE_LOG_BACKUPS, encoding='utf-8'
+        )
         file_formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+
+        handlers = [file_handler]
+        if eventos_dir:
+            try:
+                handlers.append(JsonEventHandler(eventos_dir, eventos_retencao_meses))
+            except Exception as e:
+                print(f"Eventos estruturados indisponíveis: {e}")
+
+        # A automação só enfileira; disco (e rotação/gzip, eventos JSON) ficam com a thread do listener
+        file_queue = queue.Queue(maxsize=FILE_LOG_MAX_PENDENTES)
+        listener = logging.handlers.QueueListener(file_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop) # Esvazia a fila antes de sair
+        logger.addHandler(BoundedQueueHandler(file_queue))
 
         if version:
             logger.info("="*50)
@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import sqlite3
+import contextlib
+from datetime import datetime
+from core.constants import BASE_DIR, PERFIS_DB
+
+class ProfileStore:
+    """
+    Banco SQLite de perfis de pescadores (configuração completa por perfil),
+    indexado por nome, município e CPF, com o histórico de execuções de cada um.
+    Cada operação abre a própria conexão: seguro para uso a partir das threads do pool.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS perfis (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            cpf TEXT,
+            municipio TEXT COLLATE NOCASE,
+            config TEXT NOT NULL,
+            atualizado_em TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_perfis_municipio ON perfis(municipio);
+        CREATE INDEX IF NOT EXISTS idx_perfis_cpf ON perfis(cpf);
+
+        CREATE TABLE IF NOT EXISTS execucoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            perfil_id INTEGER REFERENCES perfis(id) ON DELETE SET NULL,
+            cpf TEXT,
+            ano TEXT,
+            status TEXT,
+            mensagem TEXT,
+            duracao REAL,
+            registrado_em TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_execucoes_perfil ON execucoes(perfil_id, registrado_em);
+        CREATE INDEX IF NOT EXISTS idx_execucoes_cpf ON execucoes(cpf, registrado_em);
+    """
+
+    def __init__(self, path=PERFIS_DB):
+        if not os.path.exists(BASE_DIR):
+            try: os.makedirs(BASE_DIR)
+            except: pass
+        self.path = path
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(self.SCHEMA)
+
+    @contextlib.contextmanager
+    def _conectar(self):
+        """Conexão de uma operação: commit (rollback em erro) e fechamento ao sair do bloco."""
+        con = sqlite3.connect(self.path, timeout=5)
+        try:
+            con.row_factory = sqlite3.Row
+            con.execute("PRAGMA foreign_keys=ON")
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def somente_digitos(cpf):
+        return re.sub(r"\D", "", str(cpf or "")) or None
+
+    @staticmethod
+    def _linha(row, com_config=False):
+        if row is None:
+            return None
+        perfil = {"id": row["id"], "nome": row["nome"], "cpf": row["cpf"], "municipio": row["municipio"], "atualizado_em": row["atualizado_em"]}
+        if com_config:
+            perfil["config"] = json.loads(row["config"])
+        return perfil
+
+    # --- PERFIS ---
+    def salvar_perfil(self, nome, config, cpf=None):
+        """Cria ou atualiza (pelo nome) um perfil. Retorna o id."""
+        municipio = config.get("municipio_manual") if config.get("municipio_padrao") == "Outros" else config.get("municipio_padrao")
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._conectar() as con:
+            con.execute(
+                """INSERT INTO perfis (nome, cpf, municipio, config, atualizado_em) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(nome) DO UPDATE SET cpf=excluded.cpf, municipio=excluded.municipio,
+                   config=excluded.config, atualizado_em=excluded.atualizado_em""",
+                (nome.strip(), self.somente_digitos(cpf), municipio, json.dumps(config, ensure_ascii=False), agora),
+            )
+            return con.execute("SELECT id FROM perfis WHERE nome = ?", (nome.strip(),)).fetchone()["id"]
+
+    def atualizar_config(self, perfil_id, config):
+        municipio = config.get("municipio_manual") if config.get("municipio_padrao") == "Outros" else config.get("municipio_padrao")
+        with self._conectar() as con:
+            con.execute(
+                "UPDATE perfis SET config = ?, municipio = ?, atualizado_em = ? WHERE id = ?",
+                (json.dumps(config, ensure_ascii=False), municipio, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), perfil_id),
+            )
+
+    def obter(self, perfil_id):
+        with self._conectar() as con:
+            return self._linha(con.execute("SELECT * FROM perfis WHERE id = ?", (perfil_id,)).fetchone(), True)
+
+    def obter_por_cpf(self, cpf):
+        cpf = self.somente_digitos(cpf)
+        if not cpf:
+            return None
+        with self._conectar() as con:
+            return self._linha(con.execute("SELECT * FROM perfis WHERE cpf = ? ORDER BY atualizado_em DESC LIMIT 1", (cpf,)).fetchone(), True)
+
+    def buscar(self, texto="", limite=50):
+        """Busca por prefixo de nome/município/CPF (sem carregar o JSON de configuração)."""
+        texto = (texto or "").strip()
+        with self._conectar() as con:
+            if not texto:
+                rows = con.execute("SELECT id, nome, cpf, municipio, atualizado_em FROM perfis ORDER BY nome LIMIT ?", (limite,)).fetchall()
+            else:
+                prefixo = texto.replace("%", "").replace("_", "") + "%"
+                cpf = (self.somente_digitos(texto) or "\x00") + "%"
+                rows = con.execute(
+                    """SELECT id, nome, cpf, municipio, atualizado_em FROM perfis
+                       WHERE nome LIKE ? OR municipio LIKE ? OR cpf LIKE ?
+                       ORDER BY nome LIMIT ?""",
+                    (prefixo, prefixo, cpf, limite),
+                ).fetchall()
+        return [self._linha(r) for r in rows]
+
+    def remover(self, perfil_id):
+        with self._conectar() as con:
+            con.execute("DELETE FROM perfis WHERE id = ?", (perfil_id,))
+
+    # --- HISTÓRICO ---
+    def registrar_execucao(self, perfil_id, cpf, ano, status, mensagem="", duracao=0.0):
+        with self._conectar() as con:
+            con.execute(
+                "INSERT INTO execucoes (perfil_id, cpf, ano, status, mensagem, duracao, registrado_em) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (perfil_id, self.somente_digitos(cpf), str(ano), status, mensagem or "", float(duracao or 0), datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+            )
+
+    def historico(self, perfil_id, limite=20):
+        with self._conectar() as con:
+            perfil = con.execute("SELECT cpf FROM perfis WHERE id = ?", (perfil_id,)).fetchone()
+            cpf = perfil["cpf"] if perfil else None
+            rows = con.execute(
+                """SELECT ano, status, mensagem, duracao, registrado_em FROM execucoes
+                   WHERE perfil_id = ? OR (cpf IS NOT NULL AND cpf = ?)
+                   ORDER BY registrado_em DESC, id DESC LIMIT ?""",
+                (perfil_id, cpf, limite),
+            ).fetchall()
+        return [dict(r) for r in rows]
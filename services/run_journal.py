@@ -0,0 +1,93 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+from core.constants import CHECKPOINT_DIR
+
+class RunJournal:
+    """
+    Diário de checkpoints de um ano de um pescador.
+    Registra etapas concluídas, meses concluídos na Etapa 3 e os dados gerados
+    para cada mês, permitindo que uma execução interrompida retome do ponto exato
+    reaproveitando os mesmos valores.
+    """
+    def __init__(self, pescador_id, ano):
+        if not os.path.exists(CHECKPOINT_DIR):
+            try: os.makedirs(CHECKPOINT_DIR)
+            except: pass
+
+        # O identificador do pescador (CPF) não vai em claro para o nome do arquivo
+        chave = hashlib.sha1(str(pescador_id).encode("utf-8")).hexdigest()[:16]
+        self.path = os.path.join(CHECKPOINT_DIR, f"{chave}_{ano}.json")
+        self.ano = str(ano)
+        self.data = self.load()
+
+    def load(self):
+        vazio = {"ano": self.ano, "etapas": [], "meses": [], "dados_meses": {}, "dias_meses": {}, "plano": None, "atualizado_em": None}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                vazio.update(loaded)
+            except Exception as e:
+                print(f"Checkpoint ilegível, ignorando: {e}")
+        return vazio
+
+    def save(self):
+        self.data["atualizado_em"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Erro ao salvar checkpoint: {e}")
+
+    def tem_progresso(self):
+        return bool(self.data["etapas"] or self.data["meses"] or self.data["dados_meses"] or self.data["plano"])
+
+    # --- ETAPAS ---
+    def etapa_concluida(self, numero):
+        return numero in self.data["etapas"]
+
+    def marcar_etapa(self, numero):
+        if numero not in self.data["etapas"]:
+            self.data["etapas"].append(numero)
+            self.save()
+
+    # --- MESES (ETAPA 3) ---
+    def mes_concluido(self, mes):
+        return mes in self.data["meses"]
+
+    def marcar_mes(self, mes):
+        if mes not in self.data["meses"]:
+            self.data["meses"].append(mes)
+            self.save()
+
+    def dados_mes(self, mes):
+        """Retorna (dados_especies, dias) gerados anteriormente para o mês, ou (None, None)."""
+        return self.data["dados_meses"].get(mes), self.data["dias_meses"].get(mes)
+
+    def salvar_dados_mes(self, mes, dados, dias):
+        self.data["dados_meses"][mes] = [list(item) for item in dados]
+        self.data["dias_meses"][mes] = dias
+        self.save()
+
+    # --- PLANO ANUAL ---
+    def plano(self):
+        """Plano anual salvo (dict de YearPlan.to_dict) ou None."""
+        return self.data.get("plano")
+
+    def salvar_plano(self, plano_dict):
+        self.data["plano"] = plano_dict
+        self.save()
+
+    def finalizar(self):
+        """Ano concluído: o checkpoint deixa de ser necessário."""
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except Exception as e:
+            print(f"Erro ao remover checkpoint: {e}")
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import threading
+import functools
+import contextlib
+
+from services.driver_profiler import profiler_atual
+
+_atual = threading.local()
+
+def tracer_atual():
+    return getattr(_atual, "tracer", None)
+
+@contextlib.contextmanager
+def span(nome, categoria="", **args):
+    """Span aninhado no Tracer ativo da thread; sem Tracer ativo não mede nada."""
+    tracer = tracer_atual()
+    if tracer is None:
+        yield
+        return
+    with tracer.span(nome, categoria, **args):
+        yield
+
+def medir(categoria):
+    """Decorador: cada chamada do método vira um span `categoria:nome_do_metodo`."""
+    def decorador(func):
+        @functools.wraps(func)
+        def medido(*args, **kwargs):
+            tracer = tracer_atual()
+            if tracer is None:
+                return func(*args, **kwargs)
+            with tracer.span(func.__name__, categoria):
+                return func(*args, **kwargs)
+        return medido
+    return decorador
+
+def instrumentar_driver(driver):
+    """
+    Envolve driver.execute (por onde passam todos os comandos do WebDriver, inclusive
+    os dos WebElements) para que cada comando vire um span da categoria 'webdriver'
+    e seja contado pelo DriverProfiler ativo. Sem Tracer/Profiler ativos, repassa direto.
+    """
+    if driver is None or getattr(driver, "_execute_original", None):
+        return driver
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        tracer = tracer_atual()
+        profiler = profiler_atual()
+        if tracer is None and profiler is None:
+            return original(driver_command, params)
+        inicio = time.perf_counter()
+        try:
+            if tracer is None:
+                return original(driver_command, params)
+            with tracer.span(driver_command, "webdriver"):
+                return original(driver_command, params)
+        finally:
+            if profiler is not None:
+                profiler.registrar(driver_command, time.perf_counter() - inicio)
+
+    driver._execute_original = original
+    driver.execute = execute
+    return driver
+
+class Tracer:
+    """
+    Spans aninhados de uma execução (um ano): etapas, meses, campos e comandos do WebDriver.
+    Exporta no formato Trace Event do Chrome (chrome://tracing, Perfetto) e resume o tempo
+    por span, separando o tempo próprio (sem os filhos) do total.
+    """
+    def __init__(self, nome, tid=0):
+        self.nome = nome
+        self.tid = tid
+        self.spans = [] # (nome, categoria, inicio_s, duracao_s, proprio_s, profundidade, args)
+        self._pilha = [] # [tempo dos filhos] de cada span aberto
+        self._t0 = time.perf_counter()
+        self.inicio = time.time()
+
+    @contextlib.contextmanager
+    def span(self, nome, categoria="", **args):
+        inicio = time.perf_counter()
+        self._pilha.append(0.0)
+        try:
+            yield
+        except BaseException as e:
+            args["erro"] = type(e).__name__
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            filhos = self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1] += duracao
+            self.spans.append((nome, categoria, inicio - self._t0, duracao, duracao - filhos, len(self._pilha), args))
+
+    @contextlib.contextmanager
+    def ativo(self):
+        """Torna este o Tracer da thread durante o bloco (restaura o anterior ao sair)."""
+        anterior = tracer_atual()
+        _atual.tracer = self
+        try:
+            yield self
+        finally:
+            _atual.tracer = anterior
+
+    # --- RELATÓRIOS ---
+    def duracao_total(self):
+        return sum(s[3] for s in self.spans if s[5] == 0)
+
+    def resumo(self):
+        """Agregado por (categoria, nome): quantidade, total, próprio, máximo. Ordenado pelo tempo próprio."""
+        agregados = {}
+        for nome, categoria, _, duracao, proprio, _, _ in self.spans:
+            a = agregados.setdefault((categoria, nome), {"categoria": categoria, "nome": nome, "qtd": 0, "total": 0.0, "proprio": 0.0, "max": 0.0})
+            a["qtd"] += 1
+            a["total"] += duracao
+            a["proprio"] += proprio
+            a["max"] = max(a["max"], duracao)
+        return sorted(agregados.values(), key=lambda a: a["proprio"], reverse=True)
+
+    ESTRUTURA = ("etapa", "mes", "plano") # Categorias listadas em ordem cronológica no relatório
+
+    def tabela_resumo(self, limite=15):
+        """
+        Linhas de texto (largura fixa): primeiro etapas/meses na ordem em que rodaram,
+        depois os spans que mais consumiram tempo próprio.
+        """
+        linhas = []
+        for nome, categoria, _, duracao, proprio, profundidade, _ in sorted(self.spans, key=lambda s: s[2]):
+            if categoria in self.ESTRUTURA:
+                linhas.append(f"{'  ' * max(profundidade - 1, 0)}{nome:<32}{duracao:>9.2f}s")
+        linhas.append(f"{'SPAN':<34}{'QTD':>6}{'TOTAL':>10}{'PRÓPRIO':>10}{'MÉDIA':>10}{'MÁX':>10}")
+        for a in self.resumo()[:limite]:
+            rotulo = f"{a['categoria']}:{a['nome']}" if a["categoria"] else a["nome"]
+            linhas.append(
+                f"{rotulo[:33]:<34}{a['qtd']:>6}{a['total']:>9.2f}s{a['proprio']:>9.2f}s"
+                f"{a['total'] / a['qtd'] * 1000:>8.0f}ms{a['max']:>9.2f}s"
+            )
+        return linhas
+
+    def trace_events(self):
+        pid = os.getpid()
+        eventos = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": "REAP"}},
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": self.tid, "args": {"name": self.nome}},
+        ]
+        for nome, categoria, inicio, duracao, _, _, args in sorted(self.spans, key=lambda s: (s[2], s[5])):
+            eventos.append({
+                "name": nome, "cat": categoria or "reap", "ph": "X", "pid": pid, "tid": self.tid,
+                "ts": round(inicio * 1e6, 1), "dur": round(duracao * 1e6, 1), "args": args,
+            })
+        return eventos
+
+    def exportar(self, path, extras=None):
+        """Grava o JSON de trace (abrir em chrome://tracing ou ui.perfetto.dev). `extras` vai em otherData."""
+        outros = {"nome": self.nome, "inicio": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.inicio))}
+        outros.update(extras or {})
+        dados = {
+            "traceEvents": self.trace_events(),
+            "displayTimeUnit": "ms",
+            "otherData": outros,
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+def podar_traces(diretorio, maximo):
+    """Mantém só os `maximo` arquivos de trace mais recentes."""
+    try:
+        arquivos = [os.path.join(diretorio, n) for n in os.listdir(diretorio) if n.endswith(".json")]
+        arquivos.sort(key=os.path.getmtime, reverse=True)
+        for path in arquivos[maximo:]:
+            try: os.remove(path)
+            except: pass
+    except: pass
@@ -0,0 +1,59 @@
+import logging
+import threading
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("selenium")
+
+import core.automation as automation_mod
+from core.year_plan import YearPlan
+from services.config_manager import ConfigManager
+
+class EsperaFalsa:
+    def __init__(self, driver, timeout, *args, **kwargs):
+        pass
+    def until(self, condicao, *args, **kwargs):
+        return mock.MagicMock()
+
+class JournalFalso:
+    def __init__(self):
+        self.meses = []
+    def mes_concluido(self, mes):
+        return mes in self.meses
+    def marcar_mes(self, mes):
+        self.meses.append(mes)
+    def dados_mes(self, mes):
+        return None, None
+
+@pytest.fixture
+def logic(monkeypatch):
+    monkeypatch.setattr(automation_mod, "WebDriverWait", EsperaFalsa)
+    cfg = ConfigManager.__new__(ConfigManager)
+    cfg.data = dict(ConfigManager.DEFAULT_CONFIG, meses_defeso=[], meses_producao=["Maio"], municipio_padrao="Soure")
+    logic = automation_mod.AutomationLogic(logging.getLogger("teste"), threading.Event(), cfg)
+    logic.driver = mock.MagicMock()
+    logic.conf = cfg.snapshot()
+    logic.journal = JournalFalso()
+    logic.plano = YearPlan("2024", [], {"Maio": {"dados": [["Tainha", "kg", "10", "12,50"]], "dias": "20"}})
+    monkeypatch.setattr(logic, "click_robusto", lambda *a, **k: True)
+    monkeypatch.setattr(logic, "limpar_e_digitar", lambda *a, **k: True)
+    monkeypatch.setattr(logic, "preencher_tabela_especies", lambda dados: True)
+    return logic
+
+def test_mes_preenchido_vai_para_o_checkpoint(logic, monkeypatch):
+    monkeypatch.setattr(logic, "selecionar_combo", lambda *a, **k: True)
+    assert logic.processar_etapa_3({"Maio"}) is True
+    assert logic.journal.meses == ["Maio"]
+
+def test_falha_no_combo_deixa_o_mes_fora_do_checkpoint(logic, monkeypatch):
+    municipio = logic.conf.municipio
+    monkeypatch.setattr(logic, "selecionar_combo", lambda container, valor, **k: valor != municipio)
+    assert logic.processar_etapa_3({"Maio"}) is False
+    assert logic.journal.meses == []
+
+def test_falha_na_tabela_de_especies_deixa_o_mes_fora_do_checkpoint(logic, monkeypatch):
+    monkeypatch.setattr(logic, "selecionar_combo", lambda *a, **k: True)
+    monkeypatch.setattr(logic, "preencher_tabela_especies", lambda dados: False)
+    assert logic.processar_etapa_3({"Maio"}) is False
+    assert logic.journal.meses == []
@@ -0,0 +1,43 @@
+import random
+import threading
+import time
+
+from core.production_solver import ProductionSolver
+from services.combination_cache import CombinationCache, impressao_digital
+
+CATALOGO = [{"nome": f"e{i}", "preco": 10 + i, "kg_base": 10} for i in range(12)]
+
+def test_cache_ausente_nao_bloqueia_o_sorteio(monkeypatch, tmp_path):
+    liberar = threading.Event()
+    enumerar = ProductionSolver.subconjuntos_viaveis
+
+    def enumerar_lento(self):
+        liberar.wait(5)
+        return enumerar(self)
+    monkeypatch.setattr(ProductionSolver, "subconjuntos_viaveis", enumerar_lento)
+
+    cache = CombinationCache(str(tmp_path))
+    chave = impressao_digital(CATALOGO, 300, 600, 0.5)
+    solver = ProductionSolver(CATALOGO, 300, 600, 0.5)
+    assert cache.aplicar(solver, chave) is False
+    assert solver.escolher_chave(False, random.Random(1)) is not None
+    assert cache.obter(chave) is None
+
+    # A entrada aparece quando a enumeração em segundo plano termina
+    liberar.set()
+    limite = time.time() + 20
+    while cache.obter(chave) is None and time.time() < limite:
+        time.sleep(0.05)
+    assert cache.obter(chave) is not None
+    assert cache.aplicar(ProductionSolver(CATALOGO, 300, 600, 0.5), chave) is True
+
+def test_sorteio_semeado_igual_com_ou_sem_cache(tmp_path):
+    cache = CombinationCache(str(tmp_path))
+    chave = impressao_digital(CATALOGO, 300, 600, 0.5)
+    cache.gravar(chave, ProductionSolver(CATALOGO, 300, 600, 0.5).subconjuntos_viaveis())
+
+    sem_cache = ProductionSolver(CATALOGO, 300, 600, 0.5)
+    com_cache = ProductionSolver(CATALOGO, 300, 600, 0.5)
+    assert cache.aplicar(com_cache, chave) is True
+    for novembro in (False, True):
+        assert sem_cache.amostrar(novembro, random.Random(3)) == com_cache.amostrar(novembro, random.Random(3))
@@ -0,0 +1,29 @@
+import os
+import logging
+
+from services.event_log import EventIndex, JsonEventHandler, contexto_evento, ContextoEventoFilter
+
+def _registro(msg, nivel=logging.INFO):
+    record = logging.LogRecord("REAP", nivel, __file__, 0, msg, None, None)
+    ContextoEventoFilter().filter(record)
+    return record
+
+def test_eventos_indexados_e_conexoes_fechadas(tmp_path):
+    handler = JsonEventHandler(str(tmp_path))
+    with contexto_evento(execucao="abc", ano="2024"):
+        handler.emit(_registro("início"))
+        handler.emit(_registro("falhou", logging.ERROR))
+    handler.close()
+
+    indice = EventIndex(str(tmp_path))
+    assert [e["msg"] for e in indice.buscar(execucao="abc", somente_erros=True)] == ["falhou"]
+    assert indice.execucoes()[0]["ano"] == "2024"
+    indice.reindexar()
+    assert len(indice.buscar(ano="2024")) == 2
+
+    if os.path.isdir("/proc/self/fd"):
+        abertos = []
+        for fd in os.listdir("/proc/self/fd"):
+            try: abertos.append(os.readlink(os.path.join("/proc/self/fd", fd)))
+            except OSError: pass
+        assert not [a for a in abertos if a.startswith(str(tmp_path))]
@@ -0,0 +1,47 @@
+import math
+import random
+
+from core.production_solver import ProductionSolver
+
+def catalogo_grande(n=40):
+    return [{"nome": f"e{i}", "preco": 100 + i, "kg_base": 4} for i in range(n)]
+
+def test_sorteio_nao_favorece_as_primeiras_especies(monkeypatch):
+    monkeypatch.setattr(ProductionSolver, "LIMITE_ENUMERACAO", 3000)
+    solver = ProductionSolver(catalogo_grande(), 1000, 2000, 0.5)
+
+    # A lista enumerada (a que vai para o cache) cobre o catálogo inteiro
+    lista = solver._enumerar_viaveis(4, False)
+    indices = [i for chave in lista for i in chave[0]]
+    assert max(indices) == 39
+    assert abs(sum(indices) / len(indices) - 19.5) < 1.5
+
+    # Com a lista carregada, meses de 4 espécies contêm e0, e1 ou e2 na proporção esperada
+    solver.carregar_viaveis({(4, False): [list(c[0]) for c in lista]})
+    rng = random.Random(7)
+    chaves = [c for c in (solver.escolher_chave(False, rng) for _ in range(1500)) if len(c[0]) == 4]
+    esperado = 1 - math.comb(37, 4) / math.comb(40, 4)
+    observado = sum(1 for c in chaves if set(c[0]) & {0, 1, 2}) / len(chaves)
+    assert abs(observado - esperado) < 0.06
+
+def test_melhor_esforco_sem_solucao_exata_usa_o_catalogo_inteiro(monkeypatch):
+    monkeypatch.setattr(ProductionSolver, "LIMITE_ENUMERACAO", 500)
+    # Preços múltiplos de 7 centavos: nenhum total cai entre 50002 e 50006 centavos
+    catalogo = [{"nome": f"e{i}", "preco": (143 + i) * 7 / 100, "kg_base": 10} for i in range(40)]
+    solver = ProductionSolver(catalogo, 500.02, 500.06, 0.5)
+    assert not solver.analisar()["mes_comum_viavel"]
+
+    testados = []
+    mais_proximo = solver._mais_proximo
+    def registrar(chave, folga):
+        testados.append(chave)
+        return mais_proximo(chave, folga)
+    monkeypatch.setattr(solver, "_mais_proximo", registrar)
+
+    producao = solver.melhor_esforco(False)
+    total = sum(round(item["preco"] * 100) * item["peso"] for item in producao)
+    assert total in (50001, 50007)
+
+    indices = [i for chave in testados for i in chave[0]]
+    assert max(indices) == 39
+    assert abs(sum(indices) / len(indices) - 19.5) < 2
@@ -0,0 +1,50 @@
+import os
+
+from services.profile_store import ProfileStore
+
+def _descritores_abertos(path):
+    """Descritores do processo apontando para o banco (ou -wal/-shm); None sem /proc."""
+    if not os.path.isdir("/proc/self/fd"):
+        return None
+    abertos = []
+    for fd in os.listdir("/proc/self/fd"):
+        try: alvo = os.readlink(os.path.join("/proc/self/fd", fd))
+        except OSError: continue
+        if alvo.startswith(str(path)):
+            abertos.append(alvo)
+    return abertos
+
+def test_operacoes_nao_deixam_conexoes_abertas(tmp_path):
+    path = tmp_path / "perfis.db"
+    store = ProfileStore(str(path))
+    perfil_id = store.salvar_perfil("Fulano", {"municipio_padrao": "Belém"}, cpf="123.456.789-00")
+    store.atualizar_config(perfil_id, {"municipio_padrao": "Outros", "municipio_manual": "Soure"})
+    assert store.obter(perfil_id)["municipio"] == "Soure"
+    assert store.obter_por_cpf("12345678900")["id"] == perfil_id
+    assert [p["nome"] for p in store.buscar("ful")] == ["Fulano"]
+    store.registrar_execucao(perfil_id, "12345678900", 2024, "concluido", duracao=1.5)
+    assert store.historico(perfil_id)[0]["status"] == "concluido"
+    store.remover(perfil_id)
+
+    abertos = _descritores_abertos(path)
+    if abertos is not None:
+        assert abertos == []
+    # No Windows um handle esquecido impede apagar o banco
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(str(path) + sufixo):
+            os.remove(str(path) + sufixo)
+    assert not os.path.exists(path)
+
+def test_erro_na_operacao_faz_rollback_e_fecha(tmp_path):
+    path = tmp_path / "perfis.db"
+    store = ProfileStore(str(path))
+    try:
+        with store._conectar() as con:
+            con.execute("INSERT INTO perfis (nome, config) VALUES ('X', '{}')")
+            raise RuntimeError("falha no meio")
+    except RuntimeError:
+        pass
+    assert store.buscar() == []
+    abertos = _descritores_abertos(path)
+    if abertos is not None:
+        assert abertos == []
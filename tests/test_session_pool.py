@@ -0,0 +1,73 @@
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+import core.session_pool as session_pool
+from core.session_pool import SessionPool, Job
+
+class AutomacaoFalsa:
+    def __init__(self, logger, stop_event, cfg, porta_debug=None, perfil_path=None):
+        self.driver = None
+
+class LoggerFalso:
+    def __init__(self):
+        self.erros = []
+    def error(self, msg, *args, **kwargs):
+        self.erros.append(msg)
+    def info(self, *args, **kwargs): pass
+    def warning(self, *args, **kwargs): pass
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(session_pool, "AutomationLogic", AutomacaoFalsa)
+    monkeypatch.setattr(SessionPool, "ESPERA_FILA", 0.05)
+    return SessionPool(LoggerFalso(), threading.Event(), None)
+
+def test_job_livre_sem_nenhum_navegador_falha(pool):
+    pool.criar_sessao(0)
+    pool.criar_sessao(1)
+    falhas = []
+    pool.enfileirar(Job("livre", lambda automation: None, ao_falhar=falhas.append))
+    assert falhas == ["Nenhuma sessão com navegador conectado."]
+    assert pool.fila_geral.empty()
+
+def test_job_livre_vai_para_a_sessao_com_navegador(pool):
+    pool.criar_sessao(0)
+    com_driver = pool.criar_sessao(1)
+    com_driver.automation.driver = object()
+    executou = threading.Event()
+    quem = []
+    def executar(automation):
+        quem.append(automation)
+        executou.set()
+    pool.enfileirar(Job("livre", executar))
+    assert executou.wait(2)
+    assert quem == [com_driver.automation]
+
+def test_sessoes_sem_navegador_nao_giram_em_falso(pool, monkeypatch):
+    chamadas = []
+    original = SessionPool._proximo_job
+    def contar(self, sessao):
+        if self is pool: # Threads de pools de outros testes continuam vivas
+            chamadas.append(sessao.indice)
+        return original(self, sessao)
+    monkeypatch.setattr(SessionPool, "_proximo_job", contar)
+    pool.criar_sessao(0)
+    pool.criar_sessao(1)
+    time.sleep(0.5)
+    # Espera bloqueante de 0.05s por volta: no máximo ~10 voltas por sessão em 0.5s
+    assert len(chamadas) <= 30
+
+def test_job_fixado_em_sessao_sem_navegador_avisa_a_falha(pool):
+    pool.criar_sessao(0)
+    falhou = threading.Event()
+    motivos = []
+    def ao_falhar(motivo):
+        motivos.append(motivo)
+        falhou.set()
+    pool.enfileirar(Job("fixado", lambda automation: None, 0, ao_falhar=ao_falhar))
+    assert falhou.wait(2)
+    assert "sessão 0" in motivos[0]
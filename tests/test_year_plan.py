@@ -0,0 +1,42 @@
+import pytest
+
+from core.year_plan import YearPlan
+
+MESES = ["Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho", "Julho",
+         "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"]
+
+def plano_12_meses():
+    producao = {m: {"dados": [["Tainha", "kg", "10", "12,50"]], "dias": "20"} for m in MESES[3:]}
+    return YearPlan("2024", MESES[:3], producao)
+
+def test_restrito_mantem_so_os_meses_pedidos():
+    plano = plano_12_meses().restrito(["Janeiro"], ["Maio", "Novembro"])
+    assert plano.defeso == ["Janeiro"]
+    assert list(plano.producao) == ["Maio", "Novembro"]
+    assert plano.mes("Maio") == ([("Tainha", "kg", "10", "12,50")], "20")
+    assert plano.mes("Junho") == (None, None)
+
+def test_checkpoint_de_12_meses_com_selecao_de_3(monkeypatch, tmp_path):
+    pytest.importorskip("selenium")
+    import logging
+    import threading
+    import core.automation as automation_mod
+    from services.config_manager import ConfigManager
+
+    class JournalFalso:
+        def __init__(self, plano):
+            self._plano = plano
+        def plano(self):
+            return self._plano
+
+    cfg = ConfigManager.__new__(ConfigManager)
+    cfg.data = dict(ConfigManager.DEFAULT_CONFIG, meses_defeso=MESES[:3], meses_producao=MESES[3:])
+    logic = automation_mod.AutomationLogic(logging.getLogger("teste"), threading.Event(), cfg)
+    logic.conf = cfg.snapshot()
+    logic.journal = JournalFalso(plano_12_meses().to_dict())
+    monkeypatch.setattr(logic, "obter_solver", lambda: pytest.fail("o plano salvo deveria ser reaproveitado"))
+
+    selecao = {"Fevereiro", "Maio", "Agosto"}
+    plano = logic.preparar_plano("2024", selecao)
+    assert plano.defeso == ["Fevereiro"]
+    assert list(plano.producao) == ["Maio", "Agosto"]
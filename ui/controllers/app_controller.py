@@ -1,13 +1,11 @@
-from PySide6.QtCore import QObject, Signal, QThread, QTimer
-from core.automation import AutomationLogic
+from PySide6.QtCore import QObject, Signal, QThread, QTimer, Qt
+from core.session_pool import SessionPool, Job
+from core.prewarm import obter_preaquecimento
 from services.config_manager import ConfigManager
 from services.logger import setup_logging
-from core.constants import LOG_FILE, VERSION, TODOS_MESES_ORDENADOS
+from core.constants import LOG_FILE, VERSION, TODOS_MESES_ORDENADOS, EVENTOS_DIR, EVENTOS_RETENCAO_MESES
 import threading
-import queue
 import time
-import re
-from selenium.webdriver.common.by import By
 
 class WorkerThread(QThread):
     def __init__(self, target, *args, **kwargs):
@@ -22,48 +20,84 @@ class WorkerThread(QThread):
         except Exception as e:
             print(f"Thread error: {e}")
 
+class BatchRun:
+    """Acompanha um lote de anos enfileirado no pool e consolida os resultados."""
+    def __init__(self, itens):
+        self.itens = itens # lista de (ano, sessao)
+        self.resultados = []
+        self.lock = threading.Lock()
+        self.encerrado = False
+
+    def registrar(self, ano, sessao, status, msg, duracao):
+        """Retorna True quando este registro fecha o lote."""
+        with self.lock:
+            if self.encerrado:
+                return False
+            self.resultados.append({'year': ano, 'session': sessao, 'status': status, 'msg': msg, 'duration': duracao})
+            if status == "interrompido" or len(self.resultados) == len(self.itens):
+                self.encerrar()
+                return True
+            return False
+
+    def encerrar(self):
+        feitos = {(r['year'], r['session']) for r in self.resultados}
+        for ano, sessao in self.itens:
+            if (ano, sessao) not in feitos:
+                self.resultados.append({'year': ano, 'session': sessao, 'status': "cancelado", 'msg': "", 'duration': 0.0})
+        self.encerrado = True
+
 class AppController(QObject):
-    log_signal = Signal(str, str) # msg, tag
+    log_batch = Signal(list) # [(msg, tag), ...] acumulados desde o último quadro
+    log_wakeup = Signal() # Emitido (de qualquer thread) quando chegam logs com o buffer vazio
     status_signal = Signal(str, str) # msg, color
     browser_connected = Signal()
-    search_result = Signal(list) # List of dicts: {index, year, status, text}
+    search_result = Signal(int, list) # sessao, List of dicts: {index, year, sent}
     search_error = Signal(str)
     year_finished = Signal(str) # year
+    batch_finished = Signal(list) # List of dicts: {year, session, status, msg, duration}
     execution_error = Signal(str)
     
     # NOVOS SINAIS PARA POPUPS UI
-    request_login = Signal() # Solicita que a UI mostre o popup de login
+    request_login = Signal(int) # Solicita que a UI mostre o popup de login (índice da sessão)
+    session_status = Signal(int, str, str) # sessao, msg, color
     show_success_popup = Signal(str, str) # Titulo, Mensagem
+    viability_checked = Signal(dict, str) # Relatório de viabilidade (ProductionSolver.analisar), origem
 
     def __init__(self):
         super().__init__()
         self.config_manager = ConfigManager()
-        self.logger, self.log_queue = setup_logging(LOG_FILE, VERSION)
+        self.logger, self.log_queue = setup_logging(LOG_FILE, VERSION, EVENTOS_DIR, EVENTOS_RETENCAO_MESES)
         self.stop_event = threading.Event()
-        self.automation = None
-        
+        self.automation = None # AutomationLogic da sessão 0 (navegador principal)
+
+        # Pool de sessões: cada sessão tem seu próprio Chrome e processa jobs em paralelo
+        self.session_pool = SessionPool(self.logger, self.stop_event, self.config_manager, on_status=self.session_status.emit)
+
         # Evento para pausar a thread enquanto o usuario dá OK no login
         self.login_confirmed_event = threading.Event()
+        self.login_lock = threading.Lock() # Um popup de login por vez entre sessões
 
-        # Timer to poll log queue
-        self.log_timer = QTimer()
-        self.log_timer.timeout.connect(self.process_log_queue)
-        self.log_timer.start(100)
+        # Logs: sem polling. O buffer avisa ao receber a primeira linha e a drenagem
+        # acontece uma vez por quadro (~16ms), entregando tudo o que acumulou
+        self.log_drain_scheduled = False
+        self.log_wakeup.connect(self.schedule_log_drain, Qt.QueuedConnection)
+        self.log_queue.definir_notificacao(self.log_wakeup.emit)
 
         self.current_worker = None
+        self.current_batch = None
+
+    def schedule_log_drain(self):
+        if not self.log_drain_scheduled:
+            self.log_drain_scheduled = True
+            QTimer.singleShot(16, self.process_log_queue)
 
     def process_log_queue(self):
-        try:
-            while True:
-                record = self.log_queue.get_nowait()
-                msg = self.logger.handlers[0].format(record)
-                tag = "INFO"
-                if hasattr(record, 'tags'): tag = record.tags
-                elif record.levelno == 30: tag = "WARNING"
-                elif record.levelno == 40: tag = "ERROR"
-                self.log_signal.emit(msg, tag)
-        except queue.Empty:
-            pass
+        self.log_drain_scheduled = False
+        itens, descartadas = self.log_queue.drenar()
+        if descartadas:
+            itens.insert(0, (f"... {descartadas} linhas de log omitidas (excesso de mensagens)", "WARNING"))
+        if itens:
+            self.log_batch.emit(itens)
             
     def confirm_login(self):
         """Chamado pela UI quando o usuário clica em OK no popup de login"""
@@ -71,52 +105,81 @@ class AppController(QObject):
 
     def start_browser(self):
         self.stop_event.clear()
-        self.login_confirmed_event.clear()
         self.status_signal.emit("Conectando Chrome...", "white")
+        self.current_worker = WorkerThread(self.boot_session, 0)
+        self.current_worker.start()
 
-        def boot_task():
-            self.logger.info("INICIANDO SISTEMA...", extra={'tags': 'DESTAK'})
-            self.automation = AutomationLogic(self.logger, self.stop_event, self.config_manager)
-            sucesso = self.automation.garantir_chrome_aberto()
-            if not sucesso:
-                self.logger.error("Falha crítica ao abrir navegador.")
-                self.execution_error.emit("Falha crítica ao abrir navegador.")
-                return
+    def add_session(self):
+        """Abre uma nova sessão paralela (Chrome próprio) para outro pescador."""
+        indice = self.session_pool.proximo_indice_livre()
+        if indice is None:
+            self.execution_error.emit("Limite de sessões paralelas atingido.")
+            return
+        self.stop_event.clear()
+        # Reserva o índice já aqui para que cliques repetidos não disputem a mesma sessão
+        sessao = self.session_pool.criar_sessao(indice)
+        threading.Thread(target=self.boot_session, args=(indice, sessao), daemon=True).start()
 
-            # Substituição do ctypes por Sinal UI + Wait
-            self.request_login.emit()
+    def boot_session(self, indice, sessao=None):
+        if indice == 0:
+            self.logger.info("INICIANDO SISTEMA...", extra={'tags': 'DESTAK'})
+        else:
+            self.logger.info(f"INICIANDO SESSÃO {indice}...", extra={'tags': 'DESTAK'})
+
+        if sessao is None:
+            sessao = self.session_pool.criar_sessao(indice)
+        automation = sessao.automation
+        if indice == 0:
+            self.automation = automation
+            # Se o Chrome ainda está subindo pelo pré-aquecimento, espera em vez de abrir outro
+            prewarmer = obter_preaquecimento()
+            if prewarmer:
+                prewarmer.aguardar_chrome()
+
+        sucesso = automation.garantir_chrome_aberto()
+        if not sucesso:
+            self.logger.error("Falha crítica ao abrir navegador.")
+            self.session_pool.definir_status(indice, "Falha ao abrir Chrome", "#EF4444")
+            self.execution_error.emit("Falha crítica ao abrir navegador.")
+            return
+
+        # Substituição do ctypes por Sinal UI + Wait
+        with self.login_lock:
+            self.login_confirmed_event.clear()
+            self.session_pool.definir_status(indice, "Aguardando login", "#FACC15")
+            self.request_login.emit(indice)
             self.login_confirmed_event.wait() # A thread para aqui e espera a UI chamar confirm_login()
 
-            self.logger.info("Login confirmado. Conectando Selenium...", extra={'tags': 'INFO'})
+        self.logger.info("Login confirmado. Conectando Selenium...", extra={'tags': 'INFO'})
 
-            driver = self.automation.conectar_selenium()
-            if driver:
-                self.logger.info("Navegador Conectado.", extra={'tags': 'SUCCESS'})
-                self.automation.garantir_acesso_manutencao()
+        driver = automation.conectar_selenium()
+        if driver:
+            self.logger.info("Navegador Conectado.", extra={'tags': 'SUCCESS'})
+            automation.garantir_acesso_manutencao()
+            self.session_pool.definir_status(indice, "Livre", "#10B981")
+            if indice == 0:
                 self.status_signal.emit("Navegador Conectado", "#10B981")
                 self.browser_connected.emit()
             else:
-                self.logger.error("Falha Selenium.")
-                self.execution_error.emit("Falha Selenium.")
-
-        self.current_worker = WorkerThread(boot_task)
-        self.current_worker.start()
+                self.run_search(sessao_id=indice)
+        else:
+            self.logger.error("Falha Selenium.")
+            self.session_pool.definir_status(indice, "Falha Selenium", "#EF4444")
+            self.execution_error.emit("Falha Selenium.")
 
     def stop_automation(self):
         self.stop_event.set()
         self.logger.error(">>> PARANDO... <<<", extra={'tags': 'ERROR'})
-        # Forçar parada do Selenium
-        if self.automation and self.automation.driver:
-            try:
-                self.automation.driver.execute_script("window.stop();")
-            except: pass
-            
-            try:
-                self.automation.driver.quit()
-                self.automation.driver = None
-                self.logger.info("Conexão Selenium encerrada.", extra={'tags': 'WARNING'})
-            except: pass
-            
+        # Descarta a fila e força parada do Selenium em todas as sessões
+        self.session_pool.limpar_filas()
+        lote = self.current_batch
+        if lote:
+            with lote.lock:
+                if not lote.encerrado:
+                    lote.encerrar()
+                    self.finish_batch(lote)
+        self.session_pool.encerrar_navegadores()
+        self.logger.info("Conexão Selenium encerrada.", extra={'tags': 'WARNING'})
         self.status_signal.emit("Parado", "#EF4444")
 
     def open_tabs(self):
@@ -125,126 +188,150 @@ class AppController(QObject):
                 self.automation.restaurar_abas_trabalho()
             threading.Thread(target=task, daemon=True).start()
 
-    def run_search(self, force_new=False):
+    def run_search(self, force_new=False, sessao_id=0):
+        if not self.session_pool.sessao(sessao_id):
+            return
         self.stop_event.clear()
         self.status_signal.emit("● Escaneando...", "#FACC15")
 
-        def search_task():
-            if not self.automation:
-                return
-            
+        def search_task(automation):
             # Reconectar se necessário
-            if not self.automation.driver:
+            if not automation.driver:
                 self.logger.info("Reconectando driver para busca...")
-                if not self.automation.obter_driver_robusto():
+                if not automation.obter_driver_robusto():
                      self.search_error.emit("Falha ao reconectar navegador.")
                      return
 
             self.logger.info("Iniciando varredura de pendências...", extra={'tags': 'INFO'})
             try:
                 if force_new:
-                    self.automation.garantir_acesso_manutencao()
-
-                driver = self.automation.driver
-                linhas = []
-                max_retries = 10
+                    automation.garantir_acesso_manutencao()
 
-                for i in range(max_retries):
-                    if self.stop_event.is_set(): break
-                    try:
-                        table = driver.find_elements(By.TAG_NAME, "table")
-                        if table:
-                            linhas = driver.find_elements(By.XPATH, "//table/tbody/tr")
-                            if linhas: break
-                    except: pass
+                results = automation.varrer_pendencias()
 
-                    time.sleep(2)
-
-                if self.stop_event.is_set(): return
-
-                if not linhas:
-                    self.logger.warning("Tabela não encontrada após 10 tentativas.")
+                if results is None:
+                    self.logger.warning("Tabela não encontrada dentro do tempo limite.")
                     self.status_signal.emit("● Erro", "#EF4444")
                     self.search_error.emit("Erro na varredura, tente usar o botão de atualizar lista na aba à esquerda.")
                     return
 
                 self.status_signal.emit("● Conectado", "#10B981")
 
-                results = []
-                for idx, row in enumerate(linhas):
-                    txt = row.text
-                    status_text = ""
-                    try:
-                        status_elem = row.find_element(By.XPATH, ".//td[contains(@class, 'status')]")
-                        status_text = status_elem.text
-                    except: pass
-
-                    is_enviado = "Enviado" in txt or "Enviado" in status_text
-                    is_pendente = "Pendente" in txt or "Rascunho" in txt
-
-                    if is_pendente or is_enviado:
-                        try:
-                            ano = "Desconhecido"
-                            colunas = row.find_elements(By.TAG_NAME, "td")
-                            for col in colunas:
-                                if re.match(r'20\d{2}', col.text.strip()):
-                                    ano = col.text.strip()
-                                    break
-
-                            results.append({
-                                'index': idx,
-                                'year': ano,
-                                'sent': is_enviado
-                            })
-                        except: pass
-
-                self.search_result.emit(results)
+                # Os WebElements dos botões ficam só do lado da automação
+                self.search_result.emit(sessao_id, [{k: v for k, v in r.items() if k != 'button'} for r in results])
                 if results:
                     self.logger.info("Lista Atualizada com Sucesso!", extra={'tags': 'SUCCESS'})
                 else:
                     self.logger.info("Nenhuma pendência encontrada.")
 
+            except InterruptedError:
+                return
             except Exception as e:
                 self.logger.error(f"Erro na varredura: {e}")
                 self.status_signal.emit("● Erro", "#EF4444")
                 self.search_error.emit(str(e))
 
-        self.current_worker = WorkerThread(search_task)
-        self.current_worker.start()
+        # A varredura entra na fila da sessão: não disputa o navegador com um ano em execução
+        self.session_pool.enfileirar(Job("Varredura", search_task, sessao_id, ao_falhar=self.search_error.emit))
+
+    def check_viability(self, origem="config"):
+        """
+        Analisa a viabilidade da configuração salva em segundo plano; resultado em viability_checked.
+        origem "nuvem": perfil recebido da licença, validado contra os meses selecionados e logado.
+        """
+        def task():
+            cm = self.config_manager
+            if origem == "nuvem":
+                meses = set(cm.data.get("meses_selecionados", TODOS_MESES_ORDENADOS))
+                analise = {"problemas": cm.problemas_do_plano(meses)}
+                for p in analise["problemas"]:
+                    self.logger.warning(f"Perfil da nuvem inviável: {p}")
+            else:
+                analise = cm.analisar_viabilidade()
+            self.viability_checked.emit(analise, origem)
+        threading.Thread(target=task, daemon=True).start()
+
+    def run_batch(self, itens):
+        """
+        Processa vários anos em sequência, sem popups por ano.
+        `itens`: lista de (ano, sessao). Cada sessão processa os seus anos em série;
+        sessões diferentes rodam em paralelo. Entre anos a sessão volta para a lista
+        e localiza a linha pelo ano (o índice da varredura pode ter mudado).
+        """
+        itens = [(ano, sessao) for ano, sessao in itens if self.session_pool.sessao(sessao)]
+        if not itens:
+            self.execution_error.emit("Nenhum ano pendente para processar.")
+            return
 
-    def run_year(self, index, ano):
+        self.stop_event.clear()
+        meses_selecionados = set(self.config_manager.data.get("meses_selecionados", TODOS_MESES_ORDENADOS))
+        lote = BatchRun(itens)
+        self.current_batch = lote
+        self.logger.info(f"Lote iniciado: {len(itens)} anos | Meses: {len(meses_selecionados)} selecionados", extra={'tags': 'DESTAK'})
+
+        def make_task(ano, sessao):
+            def batch_task(automation):
+                inicio = time.time()
+                status, msg = "erro", ""
+                try:
+                    if not automation.driver:
+                        raise RuntimeError("Navegador não conectado.")
+                    automation.voltar_lista_manutencao()
+                    if automation.executar_ano(None, ano, meses_selecionados):
+                        status = "concluido"
+                        self.logger.info(f"Fim {ano}.", extra={'tags': 'SUCCESS'})
+                        self.year_finished.emit(ano)
+                    else:
+                        status = automation.status_falha or "incompleto"
+                        msg = automation.motivo_falha
+                except InterruptedError:
+                    status = "interrompido"
+                except Exception as e:
+                    if "invalid session" in str(e).lower():
+                        status = "interrompido"
+                    else:
+                        msg = str(e)
+                        self.logger.error(f"Erro execução {ano}: {e}")
+
+                if lote.registrar(ano, sessao, status, msg, time.time() - inicio):
+                    self.finish_batch(lote)
+            return batch_task
+
+        def make_falha(ano, sessao):
+            def falha(motivo):
+                if lote.registrar(ano, sessao, "erro", motivo, 0.0):
+                    self.finish_batch(lote)
+            return falha
+
+        for ano, sessao in itens:
+            self.session_pool.enfileirar(Job(f"Ano {ano} (lote)", make_task(ano, sessao), sessao, ao_falhar=make_falha(ano, sessao)))
+
+    def finish_batch(self, lote):
+        if self.current_batch is lote:
+            self.current_batch = None
+        ok = sum(1 for r in lote.resultados if r['status'] == "concluido")
+        self.logger.info(f"Lote finalizado: {ok}/{len(lote.resultados)} anos concluídos.", extra={'tags': 'DESTAK'})
+        self.batch_finished.emit(lote.resultados)
+
+    def run_year(self, index, ano, sessao_id=0):
         self.stop_event.clear()
         meses_selecionados = set(self.config_manager.data.get("meses_selecionados", TODOS_MESES_ORDENADOS))
         self.logger.info(f"Iniciando {ano} | Meses: {len(meses_selecionados)} selecionados", extra={'tags': 'DESTAK'})
 
-        def run_task():
-            if not self.automation or not self.automation.driver:
+        def run_task(automation):
+            if not automation or not automation.driver:
                  self.execution_error.emit("Navegador não conectado.")
                  return
 
-            if self.automation:
-                self.automation.trazer_navegador_frente()
+            automation.trazer_navegador_frente()
 
             try:
-                driver = self.automation.driver
-                linhas = driver.find_elements(By.XPATH, "//table/tbody/tr")
-                if index >= len(linhas):
-                    self.logger.error("Tabela mudou.")
+                if not automation.executar_ano(index, ano, meses_selecionados):
+                    motivo = automation.motivo_falha or f"Preenchimento de {ano} não foi concluído."
+                    self.status_signal.emit(f"{ano}: não concluído", "#EF4444")
+                    self.execution_error.emit(motivo)
                     return
 
-                row = linhas[index]
-                btn = row.find_element(By.XPATH, ".//button[contains(@class, 'br-button') and @aria-label='editar']")
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
-                btn.click()
-
-                self.automation.processar_etapa_1()
-                if self.automation.avancar():
-                    self.automation.processar_etapa_2()
-                    if self.automation.avancar():
-                        self.automation.processar_etapa_3(meses_selecionados)
-                        if self.automation.avancar():
-                            self.automation.processar_etapa_4()
-
                 self.logger.info(f"Fim {ano}.", extra={'tags': 'SUCCESS'})
                 self.year_finished.emit(ano)
                 self.show_success_popup.emit("Sucesso", f"Preenchimento de {ano} CONCLUÍDO!\nRevise e clique em Enviar.")
@@ -260,12 +347,14 @@ class AppController(QObject):
                      self.logger.error(f"Erro execução: {e}")
                      self.execution_error.emit(str(e))
 
-        self.current_worker = WorkerThread(run_task)
-        self.current_worker.start()
+        if not self.session_pool.sessao(sessao_id):
+            self.execution_error.emit("Navegador não conectado.")
+            return
+        self.session_pool.enfileirar(Job(f"Ano {ano}", run_task, sessao_id, ao_falhar=self.execution_error.emit))
 
     def force_return_home(self):
         if self.automation:
              # Reconectar se stop matou a sessão
              if not self.automation.driver:
                  self.automation.obter_driver_robusto()
-             threading.Thread(target=self.automation.forcar_retorno_inicio, daemon=True).start()
\ No newline at end of file
+             threading.Thread(target=self.automation.forcar_retorno_inicio, daemon=True).start()
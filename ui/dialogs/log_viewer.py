@@ -0,0 +1,168 @@
+import os
+import json
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QLineEdit,
+    QCheckBox, QTableWidget, QTableWidgetItem, QHeaderView, QPlainTextEdit, QSplitter, QAbstractItemView
+)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QColor
+from services.event_log import EventIndex
+from core.constants import EVENTOS_DIR, LOG_FILE
+
+CORES_TAG = {"WARNING": "#FACC15", "ERROR": "#EF4444", "SUCCESS": "#10B981", "DESTAK": "#38BDF8"}
+
+class LogViewerDialog(QDialog):
+    """Filterable view over the structured event log (queries go to the SQLite index)."""
+    LIMITE = 2000
+    COLUNAS = ["Hora", "Sessão", "Ano", "Etapa", "Mês", "Mensagem"]
+
+    def __init__(self, parent=None, diretorio=EVENTOS_DIR):
+        super().__init__(parent)
+        self.setWindowTitle("Visualizador de Logs")
+        self.resize(1100, 700)
+        self.indice = EventIndex(diretorio)
+        self.linhas = []
+
+        self.setStyleSheet("""
+            QDialog { background-color: #0F172A; }
+            QLabel, QCheckBox { color: #E2E8F0; }
+            QLineEdit, QComboBox { background-color: #1E293B; color: #E2E8F0; border: 1px solid #334155; border-radius: 4px; padding: 4px; }
+            QTableWidget { background-color: #1E293B; color: #E2E8F0; gridline-color: #334155; border: none; }
+            QHeaderView::section { background-color: #0F172A; color: #94A3B8; border: none; padding: 4px; }
+            QPlainTextEdit { background-color: #020617; color: #CBD5E1; border: 1px solid #334155; font-family: Consolas, monospace; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(15, 15, 15, 15)
+
+        # Filters
+        filtros = QHBoxLayout()
+        filtros.addWidget(QLabel("Execução:"))
+        self.combo_execucao = QComboBox()
+        self.combo_execucao.setMinimumWidth(320)
+        filtros.addWidget(self.combo_execucao)
+
+        filtros.addWidget(QLabel("Ano:"))
+        self.entry_ano = QLineEdit()
+        self.entry_ano.setFixedWidth(70)
+        filtros.addWidget(self.entry_ano)
+
+        self.chk_erros = QCheckBox("Somente erros/avisos")
+        filtros.addWidget(self.chk_erros)
+
+        self.entry_busca = QLineEdit()
+        self.entry_busca.setPlaceholderText("Buscar na mensagem...")
+        filtros.addWidget(self.entry_busca, 1)
+
+        btn_atualizar = QPushButton("ATUALIZAR")
+        btn_atualizar.setCursor(Qt.PointingHandCursor)
+        btn_atualizar.setStyleSheet("QPushButton { background-color: #38BDF8; color: #000; font-weight: bold; padding: 6px 12px; border-radius: 4px; }")
+        btn_atualizar.clicked.connect(self.recarregar)
+        filtros.addWidget(btn_atualizar)
+
+        btn_texto = QPushButton("ABRIR LOG EM TEXTO")
+        btn_texto.setCursor(Qt.PointingHandCursor)
+        btn_texto.setStyleSheet("QPushButton { background-color: #334155; color: #E2E8F0; font-weight: bold; padding: 6px 12px; border-radius: 4px; }")
+        btn_texto.clicked.connect(self.abrir_texto)
+        filtros.addWidget(btn_texto)
+        layout.addLayout(filtros)
+
+        # Results + details
+        splitter = QSplitter(Qt.Vertical)
+        self.tabela = QTableWidget(0, len(self.COLUNAS))
+        self.tabela.setHorizontalHeaderLabels(self.COLUNAS)
+        self.tabela.verticalHeader().setVisible(False)
+        self.tabela.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabela.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        cabecalho = self.tabela.horizontalHeader()
+        for i in range(len(self.COLUNAS) - 1):
+            cabecalho.setSectionResizeMode(i, QHeaderView.ResizeToContents)
+        cabecalho.setSectionResizeMode(len(self.COLUNAS) - 1, QHeaderView.Stretch)
+        self.tabela.currentCellChanged.connect(self.mostrar_detalhe)
+        splitter.addWidget(self.tabela)
+
+        self.detalhe = QPlainTextEdit()
+        self.detalhe.setReadOnly(True)
+        splitter.addWidget(self.detalhe)
+        splitter.setSizes([500, 150])
+        layout.addWidget(splitter)
+
+        self.lbl_status = QLabel("")
+        self.lbl_status.setStyleSheet("color: #94A3B8;")
+        layout.addWidget(self.lbl_status)
+
+        # Text filters re-query after a short pause instead of on every keystroke
+        self.timer_busca = QTimer(self)
+        self.timer_busca.setSingleShot(True)
+        self.timer_busca.setInterval(300)
+        self.timer_busca.timeout.connect(self.recarregar)
+        self.entry_busca.textChanged.connect(self.timer_busca.start)
+        self.entry_ano.textChanged.connect(self.timer_busca.start)
+        self.chk_erros.toggled.connect(self.recarregar)
+
+        self.carregar_execucoes()
+        self.combo_execucao.currentIndexChanged.connect(self.recarregar)
+        self.recarregar()
+
+    def carregar_execucoes(self):
+        self.combo_execucao.clear()
+        self.combo_execucao.addItem("Todas", None)
+        try:
+            execucoes = self.indice.execucoes()
+        except Exception as e:
+            execucoes = []
+            self.lbl_status.setText(f"Erro ao ler o índice: {e}")
+        for ex in execucoes:
+            inicio = (ex["inicio"] or "").replace("T", " ")[:19]
+            perfil = f" | {ex['perfil']}" if ex["perfil"] else ""
+            erros = f" | {ex['erros']} alertas" if ex["erros"] else ""
+            self.combo_execucao.addItem(f"{inicio} | Ano {ex['ano'] or '?'}{perfil}{erros}", ex["execucao"])
+
+    def recarregar(self):
+        try:
+            self.linhas = self.indice.buscar(
+                execucao=self.combo_execucao.currentData(),
+                ano=self.entry_ano.text().strip() or None,
+                somente_erros=self.chk_erros.isChecked(),
+                texto=self.entry_busca.text().strip(),
+                limite=self.LIMITE,
+            )
+        except Exception as e:
+            self.linhas = []
+            self.lbl_status.setText(f"Erro ao consultar o índice: {e}")
+            return
+
+        self.tabela.setUpdatesEnabled(False)
+        self.tabela.setRowCount(len(self.linhas))
+        for r, ev in enumerate(self.linhas):
+            valores = [
+                (ev["ts"] or "").replace("T", " ")[:19],
+                "" if ev["sessao"] is None else f"S{ev['sessao']}",
+                ev["ano"] or "",
+                "" if ev["etapa"] is None else str(ev["etapa"]),
+                ev["mes"] or "",
+                ev["msg"] or "",
+            ]
+            cor = QColor(CORES_TAG.get(ev["tag"], "#E2E8F0"))
+            for c, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                item.setForeground(cor)
+                self.tabela.setItem(r, c, item)
+        self.tabela.setUpdatesEnabled(True)
+        self.detalhe.clear()
+        limite = f" (limite de {self.LIMITE}, refine os filtros)" if len(self.linhas) >= self.LIMITE else ""
+        self.lbl_status.setText(f"{len(self.linhas)} eventos{limite}")
+
+    def mostrar_detalhe(self, linha, *_):
+        if not (0 <= linha < len(self.linhas)):
+            self.detalhe.clear()
+            return
+        ev = self.linhas[linha]
+        completo = self.indice.ler_evento(ev["arquivo"], ev["offset"]) or ev
+        self.detalhe.setPlainText(json.dumps(completo, indent=2, ensure_ascii=False))
+
+    def abrir_texto(self):
+        try:
+            os.startfile(LOG_FILE)
+        except Exception as e:
+            self.lbl_status.setText(f"Não foi possível abrir o log: {e}")
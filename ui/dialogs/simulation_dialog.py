@@ -1,15 +1,55 @@
 import logging
 import threading
 from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QScrollArea, QWidget, QFrame, QHBoxLayout, QSizePolicy
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal
 from core.automation import AutomationLogic
+from core.monte_carlo import simular_anos, PERCENTIS
+
+class MonteCarloWorker(QThread):
+    """Runs the statistics batch off the UI thread."""
+    progress = Signal(int, int) # done, total
+    finished_stats = Signal(dict)
+
+    def __init__(self, config_data, n_anos):
+        super().__init__()
+        self.config_data = config_data
+        self.n_anos = n_anos
+        self.stop_event = threading.Event()
+
+    def run(self):
+        try:
+            stats = simular_anos(self.config_data, self.n_anos, parar=self.stop_event.is_set, progresso=self.progress.emit)
+        except Exception as e:
+            stats = {"erro": str(e)}
+        self.finished_stats.emit(stats)
+
+class PlanWorker(QThread):
+    """Builds the annual plan off the UI thread (a cold solver enumerates every feasible subset)."""
+    plan_ready = Signal(object) # YearPlan (core.year_plan), or the exception raised while planning
+
+    def __init__(self, logic, meses):
+        super().__init__()
+        self.logic = logic
+        self.meses = meses
+
+    def run(self):
+        try:
+            plano = self.logic.preparar_plano("Simulação", set(self.meses))
+        except Exception as e:
+            plano = e
+        self.plan_ready.emit(plano)
 
 class SimulationDialog(QDialog):
+    MC_ANOS = 2000
+
     def __init__(self, config_manager, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Simulação Interativa de Valores")
         self.resize(600, 800) # Tamanho inicial maior
         self.cfg = config_manager
+        self.logic = None
+        self.mc_worker = None
+        self.plan_worker = None
         
         # Estilo janela
         self.setStyleSheet("""
@@ -37,14 +77,25 @@ class SimulationDialog(QDialog):
             lbl_sps.setStyleSheet("color: #94A3B8; font-size: 12px; margin-bottom: 10px;")
             h_layout.addWidget(lbl_sps)
 
-        btn_reroll = QPushButton("RESORTEAR SIMULAÇÃO")
-        btn_reroll.setCursor(Qt.PointingHandCursor)
-        btn_reroll.setStyleSheet("""
+        self.btn_reroll = QPushButton("RESORTEAR SIMULAÇÃO")
+        self.btn_reroll.setCursor(Qt.PointingHandCursor)
+        self.btn_reroll.setStyleSheet("""
             QPushButton { background-color: #F59E0B; color: #000; font-weight: bold; padding: 12px; border-radius: 6px; }
             QPushButton:hover { background-color: #D97706; }
+            QPushButton:disabled { background-color: #334155; color: #94A3B8; }
+        """)
+        self.btn_reroll.clicked.connect(self.run_simulation)
+        h_layout.addWidget(self.btn_reroll)
+
+        self.btn_stats = QPushButton(f"ESTATÍSTICAS ({self.MC_ANOS} ANOS SIMULADOS)")
+        self.btn_stats.setCursor(Qt.PointingHandCursor)
+        self.btn_stats.setStyleSheet("""
+            QPushButton { background-color: #38BDF8; color: #000; font-weight: bold; padding: 12px; border-radius: 6px; }
+            QPushButton:hover { background-color: #0EA5E9; }
+            QPushButton:disabled { background-color: #334155; color: #94A3B8; }
         """)
-        btn_reroll.clicked.connect(self.run_simulation)
-        h_layout.addWidget(btn_reroll)
+        self.btn_stats.clicked.connect(self.run_statistics)
+        h_layout.addWidget(self.btn_stats)
         layout.addWidget(header)
 
         # Total Label
@@ -73,24 +124,40 @@ class SimulationDialog(QDialog):
 
         self.run_simulation()
 
-    def run_simulation(self):
-        # Clear previous
+    def clear_results(self):
         while self.results_layout.count():
             child = self.results_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
-        # Instantiate Logic with dummy logger
-        logger = logging.getLogger("REAP_SIMULATION")
-        stop_event = threading.Event()
+    def run_simulation(self):
+        if self.plan_worker and self.plan_worker.isRunning():
+            return
+        self.clear_results()
+
+        # Instantiate Logic with dummy logger (reused across rerolls: solver and combination cache stay warm)
+        if self.logic is None:
+            logger = logging.getLogger("REAP_SIMULATION")
+            stop_event = threading.Event()
+            self.logic = AutomationLogic(logger, stop_event, self.cfg)
 
-        logic = AutomationLogic(logger, stop_event, self.cfg)
+        # Same annual plan the automation replays (respects the annual-total / variety constraints)
+        self.btn_reroll.setEnabled(False)
+        self.total_lbl.setText("Planejando o ano...")
+        self.plan_worker = PlanWorker(self.logic, self.cfg.data.get("meses_producao", []))
+        self.plan_worker.plan_ready.connect(self.on_plan_ready)
+        self.plan_worker.start()
 
-        meses_prod = self.cfg.data.get("meses_producao", [])
-        total_ano = 0.0
+    def on_plan_ready(self, plano):
+        self.btn_reroll.setEnabled(True)
+        if isinstance(plano, Exception):
+            self.total_lbl.setText(f"Erro na simulação: {plano}")
+            return
 
+        meses_prod = self.plan_worker.meses
+        total_ano = 0.0
         for mes in meses_prod:
-            dados = logic.gerar_dados_mes(mes)
+            dados, _ = plano.mes(mes)
             total_mes = 0.0
             detalhes_str = ""
             for item in dados:
@@ -161,4 +228,59 @@ class SimulationDialog(QDialog):
 
             self.results_layout.addWidget(card)
 
-        self.total_lbl.setText(f"TOTAL PREVISTO: R$ {total_ano:.2f}")
\ No newline at end of file
+        self.total_lbl.setText(f"TOTAL PREVISTO: R$ {total_ano:.2f}")
+
+    # --- MONTE CARLO ---
+    def run_statistics(self):
+        if (self.mc_worker and self.mc_worker.isRunning()) or (self.plan_worker and self.plan_worker.isRunning()):
+            return
+        self.btn_stats.setEnabled(False)
+        self.btn_stats.setText("SIMULANDO... 0%")
+        self.mc_worker = MonteCarloWorker(dict(self.cfg.data), self.MC_ANOS)
+        self.mc_worker.progress.connect(self.on_statistics_progress)
+        self.mc_worker.finished_stats.connect(self.on_statistics_finished)
+        self.mc_worker.start()
+
+    def on_statistics_progress(self, done, total):
+        self.btn_stats.setText(f"SIMULANDO... {int(done * 100 / max(total, 1))}%")
+
+    def on_statistics_finished(self, stats):
+        self.btn_stats.setEnabled(True)
+        self.btn_stats.setText(f"ESTATÍSTICAS ({self.MC_ANOS} ANOS SIMULADOS)")
+        self.clear_results()
+
+        if "erro" in stats:
+            self.total_lbl.setText(f"Erro na simulação: {stats['erro']}")
+            return
+
+        anual = stats["anual"]
+        self.total_lbl.setText(f"ANUAL (mediana): R$ {anual['percentis'][50]:.2f} | fora da meta: {stats['taxa_fora_faixa'] * 100:.2f}% dos meses")
+
+        def fmt_dist(titulo, dist):
+            linhas = [f"{titulo}", f"  mín R$ {dist['min']:.2f} | média R$ {dist['media']:.2f} | máx R$ {dist['max']:.2f}"]
+            linhas.append("  " + " | ".join(f"P{p}: R$ {dist['percentis'][p]:.2f}" for p in PERCENTIS))
+            pico = max((c for _, _, c in dist["histograma"]), default=0) or 1
+            for ini, fim, c in dist["histograma"]:
+                linhas.append(f"  {ini:9.2f} - {fim:9.2f} {'█' * int(30 * c / pico)} {c}")
+            return "\n".join(linhas)
+
+        freq = sorted(stats["frequencia_especies"].items(), key=lambda kv: -kv[1])
+        secoes = [
+            f"{stats['anos']} anos / {stats['meses']} meses simulados",
+            f"Meses fora da meta: {stats['taxa_fora_faixa'] * 100:.2f}% | Anos fora das metas anuais: {stats['taxa_anos_invalidos'] * 100:.2f}%",
+            fmt_dist("TOTAL MENSAL", stats["mensal"]),
+            fmt_dist("TOTAL ANUAL", anual),
+            "FREQUÊNCIA DAS ESPÉCIES (meses em que aparece)\n" + "\n".join(f"  {nome[:28]:28s} {f * 100:6.2f}%" for nome, f in freq),
+        ]
+        for texto in secoes:
+            lbl = QLabel(texto)
+            lbl.setStyleSheet("color: #94A3B8; font-family: Consolas; padding: 10px; background-color: #1E293B; border: 1px solid #334155; border-radius: 6px;")
+            self.results_layout.addWidget(lbl)
+
+    def closeEvent(self, event):
+        if self.mc_worker and self.mc_worker.isRunning():
+            self.mc_worker.stop_event.set()
+            self.mc_worker.wait(2000)
+        if self.plan_worker and self.plan_worker.isRunning():
+            self.plan_worker.wait(5000)
+        super().closeEvent(event)
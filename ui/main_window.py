@@ -1,7 +1,8 @@
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QTabWidget, QScrollArea, QFrame, QLineEdit, QTextEdit, QMessageBox,
-    QGridLayout, QGroupBox, QCheckBox, QApplication, QSizePolicy, QSpacerItem
+    QGridLayout, QGroupBox, QCheckBox, QApplication, QSizePolicy, QSpacerItem,
+    QListWidget, QListWidgetItem, QInputDialog
 )
 from PySide6.QtCore import Qt, Slot, QSize, QTimer
 from PySide6.QtGui import QIcon, QAction
@@ -10,12 +11,17 @@ from ui.controllers.app_controller import AppController
 from ui.widgets.custom_widgets import NoWheelComboBox, NoWheelSpinBox, NoWheelDoubleSpinBox, ModernMessageBox
 from ui.dialogs.month_selector import MonthSelectorDialog
 from ui.dialogs.simulation_dialog import SimulationDialog
+from ui.dialogs.log_viewer import LogViewerDialog
 from services.license_manager import LicenseManager
-from core.constants import VERSION, LOG_FILE, IMG_DIR
+from core.constants import VERSION, IMG_DIR
 
 import os
+from datetime import datetime
+from html import escape
 
 class MainWindow(QMainWindow):
+    MINI_LOG_MAX_LINHAS = 500
+
     def __init__(self, license_data=None):
         super().__init__()
         self.setWindowTitle(f"AutoREAPv2 - v{VERSION}")
@@ -24,16 +30,21 @@ class MainWindow(QMainWindow):
         # Guarda os dados da licença recebidos no boot
         self.license_data = license_data or {}
 
+        # Última varredura de cada sessão do pool (sessao -> lista de anos)
+        self.results_by_session = {}
+        self.batch_checks = [] # (ano, sessao, QCheckBox) das linhas pendentes
+
         # Controller
         self.controller = AppController()
         
         # --- INJEÇÃO AUTOMÁTICA (BOOT) ---
         # Se a licença tiver um perfil personalizado, aplica agora antes de criar a UI
-        if self.license_data:
-            self.controller.config_manager.apply_cloud_overrides(self.license_data)
+        nuvem_alterada = bool(self.license_data) and self.controller.config_manager.apply_cloud_overrides(self.license_data)
         # ---------------------------------
 
         self.connect_signals()
+        if nuvem_alterada:
+            self.controller.check_viability("nuvem")
 
         # Central Widget
         central_widget = QWidget()
@@ -52,6 +63,7 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.setup_main_tab()
         self.setup_config_tab()
+        self.setup_profiles_tab()
 
         main_layout.addWidget(self.tabs)
 
@@ -59,7 +71,7 @@ class MainWindow(QMainWindow):
         QTimer.singleShot(500, self.controller.start_browser)
 
     def connect_signals(self):
-        self.controller.log_signal.connect(self.append_log)
+        self.controller.log_batch.connect(self.append_log_batch)
         self.controller.status_signal.connect(self.update_status)
         self.controller.browser_connected.connect(self.on_browser_connected)
         self.controller.search_result.connect(self.update_task_list)
@@ -67,7 +79,10 @@ class MainWindow(QMainWindow):
         self.controller.year_finished.connect(self.on_year_finished)
         self.controller.execution_error.connect(self.on_execution_error)
         self.controller.request_login.connect(self.show_login_popup)
+        self.controller.session_status.connect(self.update_session_status)
         self.controller.show_success_popup.connect(self.show_success_message)
+        self.controller.batch_finished.connect(self.on_batch_finished)
+        self.controller.viability_checked.connect(self.on_viability_checked)
 
     def create_sidebar(self):
         sidebar = QFrame()
@@ -122,10 +137,21 @@ class MainWindow(QMainWindow):
         self.btn_search.setEnabled(False)
         layout.addWidget(self.btn_search)
 
+        self.btn_new_session = create_btn(" NOVA SESSÃO", "img_chrome.png", obj_name="BoldButton")
+        self.btn_new_session.clicked.connect(self.controller.add_session)
+        layout.addWidget(self.btn_new_session)
+
         self.btn_logs = create_btn(" VER LOGS COMPLETO", "img_log.png", obj_name="BoldButton")
         self.btn_logs.clicked.connect(self.open_logs)
         layout.addWidget(self.btn_logs)
 
+        # Status por sessão do pool (S0 = navegador principal)
+        self.session_states = {}
+        self.lbl_sessions = QLabel("")
+        self.lbl_sessions.setWordWrap(True)
+        self.lbl_sessions.setStyleSheet("color: #94A3B8; font-size: 12px; border: none; background: transparent;")
+        layout.addWidget(self.lbl_sessions)
+
         layout.addStretch()
 
         # PARAR TUDO
@@ -191,6 +217,15 @@ class MainWindow(QMainWindow):
         list_layout.addWidget(list_scroll)
         
         self.update_list_msg("Aguardando Login...")
+
+        self.btn_batch = QPushButton("PROCESSAR PENDENTES EM LOTE")
+        self.btn_batch.setObjectName("BoldButton")
+        self.btn_batch.setToolTip("Processa os anos marcados (ou todos os pendentes, se nenhum estiver marcado) em sequência.")
+        self.btn_batch.setStyleSheet("min-height: 35px; font-size: 12px;")
+        self.btn_batch.clicked.connect(self.run_batch_selected)
+        self.btn_batch.setEnabled(False)
+        list_layout.addWidget(self.btn_batch)
+
         layout.addWidget(list_container_frame)
 
         # 2. MUNICÍPIO
@@ -283,6 +318,7 @@ class MainWindow(QMainWindow):
         self.mini_log.setObjectName("LogBox")
         self.mini_log.setReadOnly(True)
         self.mini_log.setFixedHeight(70) 
+        self.mini_log.document().setMaximumBlockCount(self.MINI_LOG_MAX_LINHAS)
         layout.addWidget(self.mini_log)
 
     def setup_config_tab(self):
@@ -358,6 +394,10 @@ class MainWindow(QMainWindow):
                     val_init = int(float(val_init) * 100)
                 except: pass
 
+            # Listas de padrões são editadas separadas por vírgula
+            if key == "urls_bloqueadas" and isinstance(val_init, list):
+                val_init = ", ".join(val_init)
+
             widget = None
             if kind == "entry":
                 widget = QLineEdit(str(val_init))
@@ -416,8 +456,19 @@ class MainWindow(QMainWindow):
         r = add_field(s4_grid, r, "Variação Peso (%):", "variacao_peso_pct", "entry")
         r = add_field(s4_grid, r, "Dias Trab. Mín:", "dias_min", "entry")
         r = add_field(s4_grid, r, "Dias Trab. Máx:", "dias_max", "entry")
+        r = add_field(s4_grid, r, "Total Anual Mín (R$, 0=livre):", "meta_anual_min", "entry")
+        r = add_field(s4_grid, r, "Total Anual Máx (R$, 0=livre):", "meta_anual_max", "entry")
+        r = add_field(s4_grid, r, "Mín. Espécies no Ano (0=livre):", "min_especies_ano", "entry")
         self.cfg_layout.addWidget(s4_frame)
 
+        s6_frame, s6_layout, s6_grid = create_section_container("DESEMPENHO")
+        self.chk_modo_leve = QCheckBox("Modo leve (bloqueia fontes, imagens e analytics na aba do PesqBrasil)")
+        self.chk_modo_leve.setChecked(bool(self.controller.config_manager.data.get("modo_leve", False)))
+        s6_grid.addWidget(self.chk_modo_leve, 0, 0, 1, 2)
+        self.config_widgets["modo_leve"] = self.chk_modo_leve
+        add_field(s6_grid, 1, "URLs Bloqueadas:", "urls_bloqueadas", "entry")
+        self.cfg_layout.addWidget(s6_frame)
+
         s5_frame, s5_layout, _ = create_section_container("CATÁLOGO DE ESPÉCIES")
         
         # --- CABEÇALHO PARA O CATÁLOGO ---
@@ -480,11 +531,142 @@ class MainWindow(QMainWindow):
         btn_reset.clicked.connect(self.reset_config)
         self.cfg_layout.addWidget(btn_reset)
 
+        btn_rollback = QPushButton(" VOLTAR PARA VERSÃO ANTERIOR")
+        btn_rollback.setObjectName("BoldButton")
+        btn_rollback.clicked.connect(self.rollback_config)
+        self.cfg_layout.addWidget(btn_rollback)
+
         self.cfg_layout.addStretch() # Empurra tudo para cima
 
         scroll.setWidget(content)
         main_tab_layout.addWidget(scroll)
 
+    def setup_profiles_tab(self):
+        tab = QWidget()
+        self.tabs.addTab(tab, "PERFIS")
+        layout = QVBoxLayout(tab)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        self.lbl_active_profile = QLabel()
+        self.lbl_active_profile.setStyleSheet("color: #38BDF8; font-weight: 900; font-size: 14px; background: transparent;")
+        layout.addWidget(self.lbl_active_profile)
+
+        layout.addWidget(QLabel("Na execução, o perfil cujo CPF é o do pescador logado é usado automaticamente.", styleSheet="color: #64748B; font-size: 11px; background: transparent;"))
+
+        self.entry_profile_search = QLineEdit()
+        self.entry_profile_search.setPlaceholderText("Buscar por nome, município ou CPF...")
+        self.entry_profile_search.textChanged.connect(self.refresh_profile_list)
+        layout.addWidget(self.entry_profile_search)
+
+        self.list_profiles = QListWidget()
+        self.list_profiles.currentItemChanged.connect(self.on_profile_selected)
+        self.list_profiles.itemDoubleClicked.connect(lambda _: self.activate_selected_profile())
+        layout.addWidget(self.list_profiles, 1)
+
+        btn_row = QHBoxLayout()
+        for text, slot in [
+            ("ATIVAR", self.activate_selected_profile),
+            ("SALVAR ATUAL COMO PERFIL", self.save_current_as_profile),
+            ("USAR PADRÃO DA MÁQUINA", self.deactivate_profile),
+            ("REMOVER", self.remove_selected_profile),
+        ]:
+            btn = QPushButton(text)
+            btn.setObjectName("BoldButton")
+            btn.setStyleSheet("min-height: 35px; font-size: 12px;")
+            btn.clicked.connect(slot)
+            btn_row.addWidget(btn)
+        layout.addLayout(btn_row)
+
+        layout.addWidget(QLabel("HISTÓRICO DE EXECUÇÕES", styleSheet="color: #E2E8F0; font-weight: 900; font-size: 13px; background: transparent;"))
+        self.profile_history = QTextEdit()
+        self.profile_history.setObjectName("LogBox")
+        self.profile_history.setReadOnly(True)
+        self.profile_history.setFixedHeight(160)
+        layout.addWidget(self.profile_history)
+
+        self.refresh_profile_list()
+        self.update_active_profile_label()
+
+    def update_active_profile_label(self):
+        ativo = self.controller.config_manager.perfil_ativo
+        self.lbl_active_profile.setText(f"PERFIL ATIVO: {ativo['nome']}" if ativo else "PERFIL ATIVO: padrão da máquina")
+
+    def refresh_profile_list(self, *_):
+        store = self.controller.config_manager.perfis
+        self.list_profiles.clear()
+        if not store:
+            self.list_profiles.addItem("Banco de perfis indisponível.")
+            return
+        try:
+            perfis = store.buscar(self.entry_profile_search.text())
+        except Exception as e:
+            self.list_profiles.addItem(f"Erro na busca: {e}")
+            return
+        for p in perfis:
+            cpf = f" | CPF {p['cpf']}" if p['cpf'] else ""
+            item = QListWidgetItem(f"{p['nome']}  —  {p['municipio'] or '-'}{cpf}")
+            item.setData(Qt.UserRole, p['id'])
+            self.list_profiles.addItem(item)
+
+    def selected_profile_id(self):
+        item = self.list_profiles.currentItem()
+        return item.data(Qt.UserRole) if item else None
+
+    def on_profile_selected(self, current, _previous=None):
+        store = self.controller.config_manager.perfis
+        perfil_id = current.data(Qt.UserRole) if current else None
+        if not store or perfil_id is None:
+            self.profile_history.clear()
+            return
+        linhas = []
+        for h in store.historico(perfil_id):
+            linhas.append(f"{h['registrado_em']}  {h['ano']}  {h['status'].upper()}  ({h['duracao']:.0f}s) {h['mensagem'] or ''}")
+        self.profile_history.setPlainText("\n".join(linhas) or "Nenhuma execução registrada.")
+
+    def activate_selected_profile(self):
+        perfil_id = self.selected_profile_id()
+        if perfil_id is None:
+            return
+        if self.controller.config_manager.ativar_perfil(perfil_id):
+            self.refresh_config_tab()
+            self.update_active_profile_label()
+            self.append_log(f"Perfil ativado: {self.controller.config_manager.perfil_ativo['nome']}", "DESTAK")
+
+    def save_current_as_profile(self):
+        cm = self.controller.config_manager
+        ativo = cm.perfil_ativo or {}
+        nome, ok = QInputDialog.getText(self, "Salvar perfil", "Nome do perfil:", text=ativo.get("nome", ""))
+        if not ok or not nome.strip():
+            return
+        cpf, ok = QInputDialog.getText(self, "Salvar perfil", "CPF do pescador (opcional):", text=ativo.get("cpf") or "")
+        if not ok:
+            return
+        if cm.salvar_como_perfil(nome, cpf) is None:
+            ModernMessageBox("ERRO", "Banco de perfis indisponível.", "ERROR", self).exec()
+            return
+        self.refresh_profile_list()
+        self.update_active_profile_label()
+
+    def deactivate_profile(self):
+        self.controller.config_manager.desativar_perfil()
+        self.refresh_config_tab()
+        self.update_active_profile_label()
+
+    def remove_selected_profile(self):
+        cm = self.controller.config_manager
+        perfil_id = self.selected_profile_id()
+        if perfil_id is None or not cm.perfis:
+            return
+        dlg = ModernMessageBox("CONFIRMAÇÃO", "Remover o perfil selecionado? O histórico de execuções é mantido.", "WARNING", self)
+        dlg.btn_ok.setText("SIM, REMOVER")
+        if not dlg.exec():
+            return
+        cm.perfis.remover(perfil_id)
+        if cm.perfil_ativo and cm.perfil_ativo["id"] == perfil_id:
+            self.deactivate_profile()
+        self.refresh_profile_list()
+
     def download_cloud_config(self):
         """Baixa as configurações da nuvem manualmente e atualiza a UI."""
         mgr = LicenseManager()
@@ -494,10 +676,11 @@ class MainWindow(QMainWindow):
         QApplication.processEvents()
 
         try:
-            valido, msg, data = mgr.validate()
+            valido, msg, data = mgr.validate(forcar=True) # Condicional: 304 quando nada mudou
             if valido and data:
                 # 1. Aplica no Manager
-                self.controller.config_manager.apply_cloud_overrides(data)
+                if self.controller.config_manager.apply_cloud_overrides(data):
+                    self.controller.check_viability("nuvem")
                 # 2. Atualiza memória local da Window (importante para lista de municípios custom)
                 self.license_data = data 
                 # 3. Recarrega os campos visuais
@@ -588,7 +771,7 @@ class MainWindow(QMainWindow):
                 val = widget.text()
                 
                 # Conversão Numérica
-                if key in ["dias_min", "dias_max", "meta_financeira_min", "meta_financeira_max"]:
+                if key in ["dias_min", "dias_max", "meta_financeira_min", "meta_financeira_max", "meta_anual_min", "meta_anual_max", "min_especies_ano"]:
                     try: val = float(val) if '.' in val else int(val)
                     except: pass
                 
@@ -598,8 +781,14 @@ class MainWindow(QMainWindow):
                         val = float(val) / 100.0
                     except: pass
 
+                if key == "urls_bloqueadas":
+                    val = [u.strip() for u in val.split(",") if u.strip()]
+
                 self.controller.config_manager.data[key] = val
 
+            elif isinstance(widget, QCheckBox):
+                self.controller.config_manager.data[key] = widget.isChecked()
+
             elif isinstance(widget, NoWheelComboBox):
                 self.controller.config_manager.data[key] = widget.currentText()
         
@@ -618,6 +807,20 @@ class MainWindow(QMainWindow):
             except: pass
         self.controller.config_manager.data["catalogo_especies"] = new_species
         self.controller.config_manager.save()
+        # A análise de viabilidade roda fora da UI; o popup sai em on_viability_checked
+        self.controller.check_viability()
+
+    @Slot(dict, str)
+    def on_viability_checked(self, analise, origem):
+        if origem == "nuvem":
+            if analise["problemas"]:
+                texto = "O perfil recebido da nuvem não fecha a meta nos meses selecionados:\n\n" + "\n".join(f"• {p}" for p in analise["problemas"])
+                ModernMessageBox("ATENÇÃO", texto, "WARNING", self).exec()
+            return
+        if analise["problemas"]:
+            texto = "Configurações salvas, mas a produção não fecha a meta:\n\n" + "\n".join(f"• {p}" for p in analise["problemas"])
+            ModernMessageBox("ATENÇÃO", texto, "WARNING", self).exec()
+            return
         ModernMessageBox("SUCESSO", "Todas as configurações foram salvas!", "SUCCESS", self).exec()
 
     def reset_config(self):
@@ -627,6 +830,26 @@ class MainWindow(QMainWindow):
             self.controller.config_manager.reset_to_defaults()
             self.refresh_config_tab()
 
+    def rollback_config(self):
+        cm = self.controller.config_manager
+        backups = cm.listar_backups()
+        if not backups:
+            ModernMessageBox("AVISO", "Nenhuma versão anterior da configuração foi encontrada.", "WARNING", self).exec()
+            return
+        rotulos = []
+        for path in backups:
+            try: rotulos.append(datetime.fromtimestamp(os.path.getmtime(path)).strftime("%d/%m/%Y %H:%M:%S"))
+            except: rotulos.append(os.path.basename(path))
+        escolha, ok = QInputDialog.getItem(self, "Versões anteriores", "Restaurar a configuração salva em:", rotulos, 0, False)
+        if not ok:
+            return
+        if cm.restaurar_backup(backups[rotulos.index(escolha)]):
+            self.refresh_config_tab()
+            self.update_active_profile_label()
+            ModernMessageBox("SUCESSO", f"Configuração de {escolha} restaurada!", "SUCCESS", self).exec()
+        else:
+            ModernMessageBox("ERRO", "Não foi possível ler essa versão.", "ERROR", self).exec()
+
     def refresh_config_tab(self):
         for key, widget in self.config_widgets.items():
             val = self.controller.config_manager.data.get(key, "")
@@ -637,7 +860,12 @@ class MainWindow(QMainWindow):
                     val = int(float(val) * 100)
                 except: pass
 
-            if isinstance(widget, QLineEdit):
+            if key == "urls_bloqueadas" and isinstance(val, list):
+                val = ", ".join(val)
+
+            if isinstance(widget, QCheckBox):
+                widget.setChecked(bool(val))
+            elif isinstance(widget, QLineEdit):
                 widget.setText(str(val))
             elif isinstance(widget, NoWheelComboBox):
                 widget.setCurrentText(str(val))
@@ -681,18 +909,24 @@ class MainWindow(QMainWindow):
 
     def open_logs(self):
         try:
-            os.startfile(LOG_FILE)
+            dlg = LogViewerDialog(self)
         except Exception as e:
-            ModernMessageBox("ERRO", f"Não foi possível abrir o log:\n{e}", "ERROR", self).exec()
+            ModernMessageBox("ERRO", f"Não foi possível abrir o visualizador de logs:\n{e}", "ERROR", self).exec()
+            return
+        dlg.exec()
 
     @Slot(str, str)
     def append_log(self, msg, tag):
-        color = "#94A3B8"
-        if tag == "WARNING": color = "#FACC15"
-        elif tag == "ERROR": color = "#EF4444"
-        elif tag == "SUCCESS": color = "#10B981"
-        elif tag == "DESTAK": color = "#38BDF8"
-        html = f"<span style='color:{color}'>{msg}</span>"
+        self.append_log_batch([(msg, tag)])
+
+    @Slot(list)
+    def append_log_batch(self, itens):
+        # Um único append por quadro; cada linha é um bloco, e o documento mantém só as últimas MINI_LOG_MAX_LINHAS
+        cores = {"WARNING": "#FACC15", "ERROR": "#EF4444", "SUCCESS": "#10B981", "DESTAK": "#38BDF8"}
+        html = "".join(
+            f"<p style='margin:0'><span style='color:{cores.get(tag, '#94A3B8')}'>{escape(msg)}</span></p>"
+            for msg, tag in itens
+        )
         self.mini_log.append(html)
 
     @Slot(str, str)
@@ -732,9 +966,10 @@ class MainWindow(QMainWindow):
              if dlg.exec():
                  self.controller.force_return_home()
                  
-    @Slot()
-    def show_login_popup(self):
-        dlg = ModernMessageBox("LOGIN NECESSÁRIO", "O Chrome foi aberto.\n\nPor favor, faça o LOGIN no Gov.br.\n\nQuando estiver logado, clique abaixo.", "INFO", self)
+    @Slot(int)
+    def show_login_popup(self, sessao=0):
+        origem = "O Chrome foi aberto." if sessao == 0 else f"O Chrome da SESSÃO {sessao} foi aberto."
+        dlg = ModernMessageBox("LOGIN NECESSÁRIO", f"{origem}\n\nPor favor, faça o LOGIN no Gov.br.\n\nQuando estiver logado, clique abaixo.", "INFO", self)
         dlg.btn_ok.setText("JÁ ESTOU LOGADO")
         dlg.exec()
         self.controller.confirm_login()
@@ -747,15 +982,34 @@ class MainWindow(QMainWindow):
     def on_year_finished(self, year):
         pass
 
-    @Slot(list)
-    def update_task_list(self, results):
+    @Slot(int, str, str)
+    def update_session_status(self, sessao, msg, color_code):
+        self.session_states[sessao] = (msg, color_code)
+        linhas = [
+            f"<span style='color:{cor}'>S{i}: {texto}</span>"
+            for i, (texto, cor) in sorted(self.session_states.items())
+        ]
+        self.lbl_sessions.setText("<br>".join(linhas))
+
+    @Slot(int, list)
+    def update_task_list(self, sessao, results):
+        # Mantém a lista de cada sessão; o painel mostra todas juntas
+        self.results_by_session[sessao] = results
+        results = [
+            dict(item, session=s)
+            for s, itens in sorted(self.results_by_session.items())
+            for item in itens
+        ]
+
         while self.dynamic_list_layout.count():
             child = self.dynamic_list_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
             elif child.spacerItem():
                 pass 
+        self.batch_checks = []
         if not results:
+            self.btn_batch.setEnabled(False)
             self.update_list_msg("Nenhuma pendência encontrada.")
             return
         self.dynamic_list_layout.setAlignment(Qt.AlignTop)
@@ -763,6 +1017,8 @@ class MainWindow(QMainWindow):
             idx = item['index']
             year = item['year']
             sent = item['sent']
+            session = item['session']
+            label = year if session == 0 else f"{year} [S{session}]"
             btn = QPushButton()
             btn.setFixedHeight(55) 
             btn.setCursor(Qt.PointingHandCursor)
@@ -772,18 +1028,60 @@ class MainWindow(QMainWindow):
                     btn.setIcon(QIcon(icon_path))
                     btn.setIconSize(QSize(28, 28))
             if sent:
-                btn.setText(f"{year} (JÁ ENVIADO)")
+                btn.setText(f"{label} (JÁ ENVIADO)")
                 btn.setEnabled(False)
                 btn.setStyleSheet("background-color: #1E293B; color: #64748B; border: 1px solid #334155;")
             else:
-                btn.setText(f"  PROCESSAR {year}")
+                btn.setText(f"  PROCESSAR {label}")
                 btn.setStyleSheet("""
                     QPushButton { background-color: #0284C7; font-size: 15px; text-align: left; padding-left: 20px; font-weight: 900; }
                     QPushButton:hover { background-color: #0369A1; }
                 """)
-                btn.clicked.connect(lambda checked=False, i=idx, y=year: self.controller.run_year(i, y))
+                btn.clicked.connect(lambda checked=False, i=idx, y=year, s=session: self.controller.run_year(i, y, s))
+
+                # Linha pendente: checkbox de seleção para o lote + botão individual
+                row = QWidget()
+                row_layout = QHBoxLayout(row)
+                row_layout.setContentsMargins(0, 0, 0, 0)
+                chk = QCheckBox()
+                chk.setToolTip("Incluir no lote")
+                row_layout.addWidget(chk)
+                row_layout.addWidget(btn, stretch=1)
+                self.batch_checks.append((year, session, chk))
+                self.dynamic_list_layout.addWidget(row)
+                continue
             self.dynamic_list_layout.addWidget(btn)
         self.dynamic_list_layout.addStretch()
+        self.btn_batch.setEnabled(bool(self.batch_checks))
+
+    def run_batch_selected(self):
+        marcados = [(ano, sessao) for ano, sessao, chk in self.batch_checks if chk.isChecked()]
+        if not marcados:
+            marcados = [(ano, sessao) for ano, sessao, _ in self.batch_checks]
+        self.controller.run_batch(marcados)
+
+    @Slot(list)
+    def on_batch_finished(self, resultados):
+        nomes = {
+            "concluido": "CONCLUÍDO",
+            "incompleto": "INCOMPLETO",
+            "inviavel": "PLANO INVIÁVEL",
+            "erro": "ERRO",
+            "interrompido": "INTERROMPIDO",
+            "cancelado": "NÃO EXECUTADO"
+        }
+        linhas = []
+        for r in resultados:
+            label = r['year'] if r['session'] == 0 else f"{r['year']} [S{r['session']}]"
+            linha = f"{label}: {nomes.get(r['status'], r['status'])}"
+            if r['duration']:
+                linha += f" ({r['duration']:.0f}s)"
+            if r['msg']:
+                linha += f" - {r['msg']}"
+            linhas.append(linha)
+        ok = all(r['status'] == "concluido" for r in resultados)
+        texto = "\n".join(linhas) + ("\n\nRevise e clique em Enviar em cada ano." if ok else "")
+        ModernMessageBox("LOTE FINALIZADO", texto, "SUCCESS" if ok else "WARNING", self).exec()
 
     def update_list_msg(self, msg, color="#94A3B8"):
         while self.dynamic_list_layout.count():